@@ -5,8 +5,17 @@ procesarlos en orden de llegada y mostrar cuál es el documento que se está imp
 actualmente. Analice con los estudiantes cómo se evita el desorden en el uso compartido de
 un recurso limitado.'''
 
-from collections import deque
-from datetime import datetime
+import copy
+import heapq
+import itertools
+import random
+import sys
+
+from motor_colas import (ColaFIFO, ColaHeap, Historial, Metricas, MotorEventos, TiempoRegistrado,
+                         TiempoSegunElemento, campo_traza, formatear_hora, internar, leer_traza,
+                         marca_actual, ver_elementos)
+from generador_carga import GeneradorCarga
+from registro_persistente import abrir_persistencia
 
 # =============================
 # MODELO DE DATOS
@@ -14,61 +23,547 @@ from datetime import datetime
 
 class Documento:
     # Representa un documento a imprimir
-    def __init__(self, nombre, usuario, paginas):
+    __slots__ = ("nombre", "usuario", "paginas", "prioridad", "fecha_envio", "llegada_s",
+                 "inicio_s", "fin_s", "impresora", "partes_pendientes", "duracion_s")
+
+    def __init__(self, nombre, usuario, paginas, prioridad=0):
         self.nombre = nombre              # Nombre del documento
-        self.usuario = usuario            # Usuario que envió el documento
+        self.usuario = internar(usuario)  # Usuario que envió el documento
         self.paginas = paginas            # Número de páginas
-        self.fecha_envio = datetime.now() # Fecha y hora de envío
+        self.prioridad = prioridad        # Prioridad explícita (menor número = más urgente)
+        self.fecha_envio = marca_actual() # Fecha y hora de envío (segundos desde la época)
+        self.llegada_s = None             # Instante simulado en que entró a la cola
+        self.inicio_s = None              # Instante simulado en que empezó a imprimirse
+        self.fin_s = None                 # Instante simulado en que terminó de imprimirse
+        self.impresora = None             # Nombre de la impresora que lo imprimió
+        self.partes_pendientes = 1        # Trabajos de impresión que faltan para completarlo
+        self.duracion_s = None            # Segundos de impresión ya conocidos (por ejemplo, de una traza)
+
+    @property
+    def espera_s(self):
+        # Segundos simulados que el documento esperó en la cola
+        if self.inicio_s is None:
+            return None
+        return self.inicio_s - self.llegada_s
 
     def __str__(self):
         # Representación en texto del documento
-        return (f"{self.fecha_envio.strftime('%Y-%m-%d %H:%M:%S')} | "
+        return (f"{formatear_hora(self.fecha_envio, '%Y-%m-%d %H:%M:%S')} | "
                 f"Documento: {self.nombre} | Usuario: {self.usuario} | Páginas: {self.paginas}")
 
+# Columnas para guardar el historial de documentos en un HistorialColumnar
+CAMPOS_DOCUMENTO = {"nombre": "texto", "usuario": "texto", "paginas": "i", "prioridad": "i",
+                    "fecha_envio": "f", "llegada_s": "f", "inicio_s": "f", "fin_s": "f",
+                    "impresora": "texto", "partes_pendientes": "i", "duracion_s": "f"}
+
+class Trabajo:
+    # Unidad que entra a la cola cuando se dividen o agrupan documentos: un trozo de un
+    # documento grande o un lote de documentos pequeños de un mismo usuario
+    __slots__ = ("nombre", "usuario", "partes", "paginas", "prioridad", "fecha_envio",
+                 "llegada_s", "inicio_s", "fin_s", "impresora", "duracion_s")
+
+    def __init__(self, nombre, usuario, partes, prioridad=0):
+        self.nombre = nombre              # Descripción del trabajo
+        self.usuario = usuario            # Usuario dueño de los documentos
+        self.partes = partes              # Lista de (documento original, páginas de ese documento)
+        self.paginas = sum(paginas for _, paginas in partes)
+        self.prioridad = prioridad
+        self.fecha_envio = partes[0][0].fecha_envio
+        self.llegada_s = None
+        self.inicio_s = None
+        self.fin_s = None
+        self.impresora = None
+        # Si todos los documentos traen su duración, el trabajo dura la parte que le toca
+        duraciones = [d.duracion_s * paginas / d.paginas for d, paginas in partes
+                      if d.duracion_s is not None and d.paginas]
+        self.duracion_s = sum(duraciones) if len(duraciones) == len(partes) else None
+
+    @property
+    def espera_s(self):
+        if self.inicio_s is None:
+            return None
+        return self.inicio_s - self.llegada_s
+
+    def __str__(self):
+        return (f"{formatear_hora(self.fecha_envio, '%Y-%m-%d %H:%M:%S')} | "
+                f"Trabajo: {self.nombre} | Usuario: {self.usuario} | Páginas: {self.paginas}")
+
+
+class PreparadorTrabajos:
+    # Etapa previa a la cola: divide los documentos grandes en trozos que pueden intercalarse
+    # con los de otros usuarios y junta documentos pequeños seguidos del mismo usuario en
+    # un solo lote, para pagar una sola vez la preparación de la impresora
+    def __init__(self, umbral_division=50, tamano_trozo=20, umbral_lote=5, maximo_lote=20):
+        self.umbral_division = umbral_division  # Más páginas que esto: se divide
+        self.tamano_trozo = tamano_trozo        # Páginas de cada trozo
+        self.umbral_lote = umbral_lote          # Hasta estas páginas: se puede agrupar
+        self.maximo_lote = maximo_lote          # Páginas máximas de un lote
+        self.lote = []                          # Documentos pequeños esperando completar lote
+
+    def recibir(self, documento):
+        # Devuelve los trabajos que ya pueden entrar a la cola
+        listos = []
+        if documento.paginas > self.umbral_division:
+            listos.extend(self.vaciar())
+            trozos = -(-documento.paginas // self.tamano_trozo)
+            documento.partes_pendientes = trozos
+            for i in range(trozos):
+                paginas = min(self.tamano_trozo, documento.paginas - i * self.tamano_trozo)
+                listos.append(Trabajo(f"{documento.nombre} ({i + 1}/{trozos})", documento.usuario,
+                                      [(documento, paginas)], documento.prioridad))
+        elif documento.paginas <= self.umbral_lote:
+            paginas_lote = sum(d.paginas for d in self.lote)
+            if self.lote and (self.lote[0].usuario != documento.usuario
+                              or paginas_lote + documento.paginas > self.maximo_lote):
+                listos.extend(self.vaciar())
+            documento.partes_pendientes = 1
+            self.lote.append(documento)
+        else:
+            listos.extend(self.vaciar())
+            documento.partes_pendientes = 1
+            listos.append(Trabajo(documento.nombre, documento.usuario, [(documento, documento.paginas)],
+                                  documento.prioridad))
+        return listos
+
+    def vaciar(self):
+        # Entrega el lote en formación (si lo hay) como un único trabajo
+        if not self.lote:
+            return []
+        lote, self.lote = self.lote, []
+        nombre = lote[0].nombre if len(lote) == 1 else f"Lote de {len(lote)} documentos"
+        return [Trabajo(nombre, lote[0].usuario, [(d, d.paginas) for d in lote],
+                        min(d.prioridad for d in lote))]
+
+# =============================
+# POLÍTICAS DE IMPRESIÓN
+# =============================
+
+class PoliticaFIFO(ColaFIFO):
+    # Imprime en orden de llegada
+    nombre = "FIFO"
+
+
+class PoliticaHeap(ColaHeap):
+    # Base para políticas que imprimen primero el documento con menor clave (heap: O(log n))
+    nombre = "Heap"
+
+
+class PoliticaSJF(PoliticaHeap):
+    # Trabajo más corto primero: imprime antes los documentos con menos páginas
+    nombre = "SJF"
+
+    def clave(self, documento, ahora):
+        return documento.paginas
+
+
+class PoliticaPrioridad(PoliticaHeap):
+    # Prioridad explícita con envejecimiento: cada segundo de espera resta "envejecimiento"
+    # a la prioridad efectiva. Como todos envejecen al mismo ritmo, el orden entre dos
+    # documentos no cambia con el tiempo y basta una clave fija: prioridad + envejecimiento * llegada
+    nombre = "Prioridad"
+
+    def __init__(self, envejecimiento=0.01):
+        super().__init__()
+        self.envejecimiento = envejecimiento
+
+    def clave(self, documento, ahora):
+        return documento.prioridad + self.envejecimiento * ahora
+
+
+class PoliticaJustaPorUsuario(PoliticaHeap):
+    # Reparto justo ponderado entre usuarios (self-clocked fair queuing): cada documento
+    # recibe una marca de fin virtual según las páginas que su usuario ya tiene en cola,
+    # así quien envía 500 páginas no bloquea a los demás
+    nombre = "Justa por usuario"
+
+    def __init__(self, pesos=None):
+        super().__init__()
+        self.pesos = pesos or {}    # usuario -> peso (por defecto 1)
+        self.ultimo_fin = {}        # usuario -> marca de fin virtual de su último documento
+        self.virtual = 0.0          # Marca del último documento que salió de la cola
+
+    def clave(self, documento, ahora):
+        inicio = max(self.virtual, self.ultimo_fin.get(documento.usuario, 0.0))
+        fin = inicio + documento.paginas / self.pesos.get(documento.usuario, 1)
+        self.ultimo_fin[documento.usuario] = fin
+        return fin
+
+    def siguiente(self):
+        marca, _, documento = heapq.heappop(self.heap)
+        self.virtual = marca
+        return documento
+
+
+POLITICAS = {
+    "FIFO": PoliticaFIFO,
+    "SJF": PoliticaSJF,
+    "Prioridad": PoliticaPrioridad,
+    "Justa por usuario": PoliticaJustaPorUsuario,
+}
+
 # =============================
 # LÓGICA DE NEGOCIO
 # =============================
 
+class Impresora:
+    # Impresora del grupo, con su velocidad en páginas por minuto
+    def __init__(self, nombre, paginas_por_minuto=20, preparacion_s=0.0):
+        self.nombre = nombre
+        self.paginas_por_minuto = paginas_por_minuto
+        self.preparacion_s = preparacion_s  # Segundos fijos por trabajo (cola de red, calentamiento)
+        self.libre_en_s = 0.0      # Instante simulado en que termina su último trabajo
+        self.ocupado_s = 0.0       # Segundos simulados imprimiendo
+        self.documentos = 0        # Documentos impresos
+        self.actual = None         # Último documento asignado
+        # Segundos de impresión: los que el documento ya trae registrados o los de sus páginas
+        self.modelo = TiempoRegistrado("duracion_s", TiempoSegunElemento(self._segun_paginas))
+
+    def _segun_paginas(self, documento):
+        return self.preparacion_s + documento.paginas * 60.0 / self.paginas_por_minuto
+
+    def duracion(self, documento):
+        # Segundos que tarda en imprimir un documento
+        return self.modelo(documento, None)
+
+
 class ColaImpresion:
-    # Maneja la cola de impresión y el historial
-    def __init__(self):
-        self.cola = deque()    # Cola de documentos por imprimir
-        self.historial = []    # Historial de documentos impresos
-
-    def agregar_documento(self, documento):
-        # Agrega un documento a la cola
-        self.cola.append(documento)
+    # Maneja la cola de impresión y el historial. El orden de impresión lo decide la
+    # política elegida; cada documento va a la impresora del grupo que lo terminaría antes,
+    # y el tiempo de impresión se simula según las páginas por minuto de cada una.
+    # Con un preparador, los documentos pasan antes por la etapa de división y agrupación;
+    # el historial y las esperas se siguen registrando por documento original.
+    # El historial puede ser cualquier almacén con append (por ejemplo un HistorialColumnar
+    # con retención, para corridas muy largas). Con un RegistroPersistente, cada documento
+    # que entra o termina queda en disco y al crear la cola se recupera lo pendiente.
+    def __init__(self, politica=None, paginas_por_minuto=20, impresoras=None, preparador=None,
+                 historial=None, persistencia=None):
+        if politica is None:
+            politica = PoliticaFIFO()
+        if impresoras is None:
+            impresoras = [Impresora("Impresora 1", paginas_por_minuto)]
+        self.cola = politica   # Cola de documentos por imprimir
+        self.historial = historial if historial is not None else Historial()  # Documentos impresos
+        self.impresoras = impresoras
+        self.paginas_por_minuto = paginas_por_minuto
+        self.reloj_s = 0.0     # Tiempo simulado en segundos
+        self.motor = MotorEventos()  # Documentos con llegada futura
+        self.espera_usuario = {}  # usuario -> [segundos de espera acumulados, documentos]
+        self.preparador = preparador
+        self.metricas = Metricas(len(impresoras))  # Esperas, ocupación y largo de la cola
+        self.fin_s = 0.0       # Fin del último documento impreso
+        self.persistencia = persistencia
+        if persistencia is not None:
+            self._restaurar(*persistencia.restaurar())
+
+    def _restaurar(self, pendientes, impresos):
+        # El reloj sigue desde el último instante guardado; los impresos vuelven a las
+        # métricas y a sus impresoras, y los pendientes entran directo a la cola con su
+        # llegada original (todas son anteriores al reloj restaurado)
+        instantes = [d.fin_s for d in impresos] + [d.llegada_s for d in pendientes + impresos]
+        self.reloj_s = max((t for t in instantes if t is not None), default=0.0)
+        por_nombre = {impresora.nombre: impresora for impresora in self.impresoras}
+        self.historial.extend(impresos)
+        for documento in impresos:
+            self.metricas.llegada(documento.llegada_s)
+            self.metricas.inicio(documento.inicio_s, documento.espera_s)
+            self.metricas.fin(documento.fin_s)
+            acumulado = self.espera_usuario.setdefault(documento.usuario, [0.0, 0])
+            acumulado[0] += documento.espera_s
+            acumulado[1] += 1
+            self.fin_s = max(self.fin_s, documento.fin_s)
+            impresora = por_nombre.get(documento.impresora)
+            if impresora is not None:
+                # Aproximado si un preparador repartió el documento entre varias impresoras
+                impresora.ocupado_s += documento.fin_s - documento.inicio_s
+                impresora.documentos += 1
+                self.metricas.ocupacion(documento.fin_s - documento.inicio_s)
+        for documento in pendientes:
+            self.metricas.llegada(documento.llegada_s)
+            if self.preparador is None:
+                self.cola.agregar(documento, documento.llegada_s)
+            else:
+                self._encolar_trabajos(self.preparador.recibir(documento))
+        self.metricas.cola(self.reloj_s, len(self.cola))
+
+    def _encolar(self, trabajo, llegada_s):
+        # Pone un documento o trabajo en la cola, o lo programa si su llegada es futura
+        if llegada_s <= self.reloj_s:
+            trabajo.llegada_s = self.reloj_s
+            self.cola.agregar(trabajo, self.reloj_s)
+        else:
+            trabajo.llegada_s = llegada_s
+            self.motor.programar(llegada_s, MotorEventos.LLEGADA, trabajo)
+
+    def _encolar_trabajos(self, trabajos):
+        # Un trabajo llega cuando llegó el último de sus documentos
+        for trabajo in trabajos:
+            self._encolar(trabajo, max(d.llegada_s for d, _ in trabajo.partes))
+
+    def agregar_documento(self, documento, llegada_s=None):
+        # Agrega un documento a la cola. Con llegada_s se programa su llegada en el
+        # tiempo simulado.
+        if llegada_s is None or llegada_s < self.reloj_s:
+            llegada_s = self.reloj_s
+        self.metricas.llegada(llegada_s)
+        if self.preparador is None:
+            self._encolar(documento, llegada_s)
+        else:
+            documento.llegada_s = llegada_s
+            self._encolar_trabajos(self.preparador.recibir(documento))
+        if self.persistencia is not None:
+            self.persistencia.alta(documento)
         return f"Documento agregado a la cola: {documento}"
 
+    def _vaciar_preparador(self):
+        # Envía a la cola el lote que el preparador aún estaba formando
+        if self.preparador is not None:
+            self._encolar_trabajos(self.preparador.vaciar())
+
+    def _recibir_llegadas(self):
+        # Pasa a la cola los documentos que ya llegaron según el reloj
+        for llegada_s, _, documento in self.motor.vencidos(self.reloj_s):
+            self.cola.agregar(documento, llegada_s)
+            self.metricas.cola(self.reloj_s, len(self.cola))
+
+    def _asignar(self, trabajo):
+        # Envía el documento (o trabajo) a la impresora que lo terminaría antes
+        impresora = min(self.impresoras,
+                        key=lambda i: max(i.libre_en_s, self.reloj_s) + i.duracion(trabajo))
+        trabajo.inicio_s = max(impresora.libre_en_s, self.reloj_s)
+        trabajo.fin_s = trabajo.inicio_s + impresora.duracion(trabajo)
+        trabajo.impresora = impresora.nombre
+        impresora.libre_en_s = trabajo.fin_s
+        impresora.ocupado_s += trabajo.fin_s - trabajo.inicio_s
+        self.metricas.ocupacion(trabajo.fin_s - trabajo.inicio_s)
+        impresora.documentos += 1
+        impresora.actual = trabajo
+        partes = getattr(trabajo, "partes", None)
+        if partes is None:
+            self._completar(trabajo)
+            return
+        # Se traslada el avance del trabajo a cada documento original
+        for documento, _ in partes:
+            if documento.inicio_s is None:
+                documento.inicio_s = trabajo.inicio_s
+                documento.impresora = trabajo.impresora
+            documento.fin_s = max(documento.fin_s or 0.0, trabajo.fin_s)
+            documento.partes_pendientes -= 1
+            if documento.partes_pendientes == 0:
+                self._completar(documento)
+
+    def _completar(self, documento):
+        # Registra un documento original completamente enviado a imprimir
+        acumulado = self.espera_usuario.setdefault(documento.usuario, [0.0, 0])
+        acumulado[0] += documento.espera_s
+        acumulado[1] += 1
+        self.metricas.inicio(documento.inicio_s, documento.espera_s)
+        self.metricas.fin(documento.fin_s)
+        self.fin_s = max(self.fin_s, documento.fin_s)
+        self.historial.append(documento)
+        if self.persistencia is not None:
+            self.persistencia.baja(documento)
+
     def procesar_siguiente(self):
         # Imprime el siguiente documento en la cola
+        self._vaciar_preparador()
+        self._recibir_llegadas()
+        if not self.cola and self.motor:
+            self.reloj_s = self.motor.proximo_tiempo()
+            self._recibir_llegadas()
         if not self.cola:
             return "No hay documentos en la cola para imprimir."
-        documento = self.cola.popleft()
-        self.historial.append(documento)
-        return f"Imprimiendo... {documento}"
+        documento = self.cola.siguiente()
+        self._asignar(documento)
+        self.reloj_s = max(self.reloj_s, documento.inicio_s)
+        return f"Imprimiendo en {documento.impresora}... {documento}"
+
+    def simular(self):
+        # Imprime todo lo pendiente (incluidas las llegadas futuras) sobre el reloj simulado:
+        # cada vez que una impresora queda libre se elige el siguiente documento
+        self._vaciar_preparador()
+        self._avanzar()
+        return self.resumen()
+
+    def _avanzar(self, hasta_s=None):
+        # Avanza el reloj simulado asignando documentos; con hasta_s se detiene antes de
+        # ese instante, para que puedan llegar más documentos
+        while self.cola or self.motor:
+            self._recibir_llegadas()
+            libre_s = min(i.libre_en_s for i in self.impresoras)
+            if self.cola and libre_s <= self.reloj_s:
+                self._asignar(self.cola.siguiente())
+                self.metricas.cola(self.reloj_s, len(self.cola))
+                continue
+            proximos = [libre_s] if self.cola else []
+            if self.motor:
+                proximos.append(self.motor.proximo_tiempo())
+            if hasta_s is not None and min(proximos) >= hasta_s:
+                return
+            self.reloj_s = min(proximos)
+
+    def reproducir(self, documentos):
+        # Recibe pares (documento, llegada_s) en orden de llegada y simula a medida que los
+        # lee, así una traza larga se recorre con memoria constante. Con un preparador, un
+        # lote entra a la cola cuando se cierra (al llegar el documento siguiente).
+        for documento, llegada_s in documentos:
+            self._avanzar(llegada_s)
+            self.agregar_documento(documento, llegada_s)
+        return self.simular()
+
+    def resumen(self):
+        # Tiempo total, espera media y percentiles, largo de la cola y uso de cada impresora.
+        # Todo sale de acumulados, sin recorrer el historial.
+        if not self.historial.total:
+            return {"documentos": 0, "impresoras": len(self.impresoras)}
+        fin_s = self.fin_s
+        metricas = self.metricas.resumen()
+        return {
+            "documentos": self.historial.total,
+            "impresoras": len(self.impresoras),
+            "fin_s": fin_s,
+            "espera_media_s": metricas["espera_media"],
+            "espera_p50_s": metricas["espera_p50"],
+            "espera_p95_s": metricas["espera_p95"],
+            "espera_p99_s": metricas["espera_p99"],
+            "cola_media": metricas["cola_media"],
+            "cola_maxima": metricas["cola_maxima"],
+            "utilizacion": {i.nombre: i.ocupado_s / fin_s if fin_s else 0.0 for i in self.impresoras},
+        }
+
+    def documentos(self):
+        # Documentos originales impresos y pendientes (en la cola, por llegar o en el lote del
+        # preparador), sin repetir. Los trabajos se deshacen en sus documentos y no se tocan,
+        # así una comparación hecha con copias no altera la cola real.
+        vistos = set()
+        pendientes = list(self.cola) + [dato for _, _, _, dato in self.motor.eventos]
+        if self.preparador is not None:
+            pendientes += self.preparador.lote
+        for elemento in itertools.chain(self.historial, pendientes):
+            partes = getattr(elemento, "partes", None)
+            for documento in ([d for d, _ in partes] if partes is not None else [elemento]):
+                if id(documento) not in vistos:
+                    vistos.add(id(documento))
+                    yield documento
+
+    def ver_impresoras(self):
+        # Estado de cada impresora en el instante simulado actual
+        estado = []
+        for impresora in self.impresoras:
+            actual = impresora.actual
+            if actual is not None and actual.fin_s > self.reloj_s:
+                estado.append(f"{impresora.nombre} ({impresora.paginas_por_minuto} ppm): imprimiendo {actual.nombre} "
+                              f"hasta t={actual.fin_s:.0f} s")
+            else:
+                estado.append(f"{impresora.nombre} ({impresora.paginas_por_minuto} ppm): libre")
+        return estado
+
+    def espera_por_usuario(self):
+        # Espera media (segundos simulados) de cada usuario
+        return {usuario: total / cantidad for usuario, (total, cantidad) in self.espera_usuario.items()}
 
     def ver_documento_actual(self):
-        # Muestra el documento que está primero en la cola
+        # Muestra el documento que se imprimirá a continuación
         if self.cola:
-            return f"Documento en espera: {self.cola[0]}"
+            return f"Documento en espera: {self.cola.primero()}"
         else:
             return "No hay documentos en proceso."
 
-    def ver_cola(self):
-        # Devuelve la lista de documentos en la cola
-        if self.cola:
-            # str() se usa para convertir cada documento a su representación en texto
-            return [str(doc) for doc in self.cola]
-        else:
-            return ["La cola está vacía."]
+    def ver_cola(self, desde=0, limite=None, filtro=None, recientes=False):
+        # Genera los documentos en la cola, en el orden en que se imprimirán. desde/limite
+        # eligen una página, filtro(documento) los selecciona y recientes empieza por el final.
+        return ver_elementos(self.cola, "La cola está vacía.", desde, limite, filtro, recientes)
 
-    def ver_historial(self):
-        # Devuelve la lista de documentos ya impresos
-        if self.historial:
-            return [str(doc) for doc in self.historial]
-        else:
-            return ["No hay historial aún."]
+    def ver_historial(self, desde=0, limite=None, filtro=None, recientes=False):
+        # Genera los documentos ya impresos (con recientes=True, del último al primero)
+        return ver_elementos(self.historial, "No hay historial aún.", desde, limite, filtro, recientes)
+
+def _documentos_de_traza(ruta):
+    # Convierte cada registro de la traza en (documento, llegada_s)
+    for registro in leer_traza(ruta):
+        documento = Documento(campo_traza(registro, "nombre", defecto=""),
+                              campo_traza(registro, "usuario", defecto=""),
+                              campo_traza(registro, "paginas", int, 1),
+                              campo_traza(registro, "prioridad", int, 0))
+        documento.duracion_s = campo_traza(registro, "duracion", float)
+        yield documento, campo_traza(registro, "llegada", float, 0.0)
+
+
+def reproducir_traza(ruta, politica=None, impresoras=None, preparador=None, retencion=1000):
+    # Reproduce una traza JSONL o CSV con un documento por registro: llegada (segundos),
+    # nombre, usuario, paginas, prioridad y, opcional, duracion (segundos). Se lee de a una
+    # línea y el historial conserva solo los últimos documentos.
+    cola = ColaImpresion(politica, impresoras=impresoras, preparador=preparador,
+                         historial=Historial(retencion))
+    return cola.reproducir(_documentos_de_traza(ruta))
+
+
+def simular_carga(cantidad, tasa, politica=None, impresoras=None, preparador=None, perfil="poisson",
+                  servicio=None, paginas=(1, 20), usuarios=10, semilla=None, retencion=1000, **parametros):
+    # Somete la cola a una carga sintética de GeneradorCarga: cantidad documentos a tasa
+    # documentos por segundo, de usuarios y páginas (rango) al azar. Con un modelo de
+    # servicio, cada documento trae su duración en segundos en lugar de calcularla por páginas.
+    generador = GeneradorCarga(tasa, perfil, servicio, semilla, **parametros)
+    azar = random.Random(semilla)
+
+    def crear(i, duracion):
+        documento = Documento(f"Documento {i + 1}", f"usuario{azar.randrange(usuarios) + 1}",
+                              azar.randint(*paginas))
+        documento.duracion_s = duracion
+        return documento
+
+    cola = ColaImpresion(politica, impresoras=impresoras, preparador=preparador,
+                         historial=Historial(retencion))
+    return cola.reproducir((documento, llegada) for llegada, documento in generador.llegadas(cantidad, crear))
+
+
+def _copia_nueva(documento):
+    # Copia de un documento lista para volver a simularse
+    copia = copy.copy(documento)
+    copia.inicio_s = copia.fin_s = copia.impresora = None
+    copia.partes_pendientes = 1
+    return copia
+
+def _grupo(velocidades, cantidad):
+    # cantidad impresoras nuevas que repiten, en orden, las velocidades dadas
+    return [Impresora(f"Impresora {i + 1}", velocidades[i % len(velocidades)]) for i in range(cantidad)]
+
+def comparar_politicas(documentos, paginas_por_minuto=20, velocidades=None):
+    # Imprime copias de los mismos documentos con cada política y devuelve la espera
+    # media por usuario de cada una. Con velocidades, cada corrida usa un grupo de
+    # impresoras con esas páginas por minuto (por ejemplo, las configuradas en la cola).
+    velocidades = velocidades or [paginas_por_minuto]
+    resultados = {}
+    for nombre, clase in POLITICAS.items():
+        cola = ColaImpresion(clase(), impresoras=_grupo(velocidades, len(velocidades)))
+        for documento in documentos:
+            cola.agregar_documento(_copia_nueva(documento), documento.llegada_s)
+        cola.simular()
+        resultados[nombre] = cola.espera_por_usuario()
+    return resultados
+
+def dimensionar_flota(documentos, paginas_por_minuto=20, maximo=10, mejora_minima=0.05, politica=PoliticaFIFO,
+                      velocidades=None):
+    # Simula los mismos documentos con 1, 2, ... impresoras y se detiene cuando una
+    # impresora más ahorra menos de mejora_minima del tiempo medio de impresión de un
+    # documento en la espera media. Devuelve las filas simuladas y la cantidad recomendada.
+    # Sin velocidades las impresoras son iguales; con ellas (por ejemplo, las del grupo
+    # configurado) la flota de n impresoras repite esas velocidades en orden.
+    if not documentos:
+        return [], 0
+    velocidades = velocidades or [paginas_por_minuto]
+    paginas_media = sum(d.paginas for d in documentos) / len(documentos)
+    impresion_media_s = sum(paginas_media * 60.0 / ppm for ppm in velocidades) / len(velocidades)
+    filas = []
+    for cantidad in range(1, maximo + 1):
+        cola = ColaImpresion(politica(), impresoras=_grupo(velocidades, cantidad))
+        for documento in documentos:
+            cola.agregar_documento(_copia_nueva(documento), documento.llegada_s)
+        filas.append(cola.simular())
+        if len(filas) > 1:
+            ahorro_s = filas[-2]["espera_media_s"] - filas[-1]["espera_media_s"]
+            if ahorro_s < mejora_minima * impresion_media_s:
+                return filas, cantidad - 1
+    return filas, maximo
 
 # =============================
 # INTERFAZ DE CONSOLA
@@ -84,7 +579,21 @@ def mostrar_menu():
     print("3. Imprimir siguiente documento")
     print("4. Ver cola de impresión")
     print("5. Ver historial de impresiones")
-    print("6. Salir")
+    print("6. Comparar políticas (espera media por usuario)")
+    print("7. Ver estado de las impresoras")
+    print("8. Dimensionar la cantidad de impresoras")
+    print("9. Salir")
+
+def elegir_politica():
+    # Permite al usuario elegir en qué orden se imprimen los documentos
+    nombres = list(POLITICAS)
+    print("\nSeleccione la política de impresión:")
+    for i, nombre in enumerate(nombres, start=1):
+        print(f"{i}. {nombre}")
+    opcion = input(f"Opción (1-{len(nombres)}, Enter = FIFO): ").strip()
+    if opcion.isdigit() and 1 <= int(opcion) <= len(nombres):
+        return POLITICAS[nombres[int(opcion) - 1]]()
+    return PoliticaFIFO()
 
 def solicitar_documento():
     # Solicita los datos de un documento al usuario
@@ -92,15 +601,16 @@ def solicitar_documento():
         nombre = input("Ingrese el nombre del documento: ").strip()
         usuario = input("Ingrese el nombre del usuario: ").strip()
         paginas = int(input("Ingrese el número de páginas: ").strip())
+        prioridad = int(input("Prioridad (0 = normal, menor = más urgente): ").strip() or 0)
         if not nombre or not usuario:
             print("El nombre del documento y el usuario no pueden estar vacíos.")
             return None
         if paginas <= 0:
             print("El número de páginas debe ser mayor que cero.")
             return None
-        return Documento(nombre, usuario, paginas)
+        return Documento(nombre, usuario, paginas, prioridad)
     except ValueError:
-        print("Error: Ingrese un número entero válido para las páginas.")
+        print("Error: Ingrese un número entero válido para las páginas y la prioridad.")
         return None
     except Exception as e:
         print(f"Ocurrió un error inesperado: {e}")
@@ -110,12 +620,31 @@ def solicitar_documento():
 # FUNCIÓN PRINCIPAL
 # =============================
 
+def configurar_impresoras():
+    # Pregunta la velocidad de cada impresora del grupo (Enter = una de 20 ppm)
+    velocidades = input("Páginas por minuto de cada impresora, separadas por comas (Enter = 20): ").strip()
+    try:
+        lista = [int(v) for v in velocidades.split(",") if v.strip()] or [20]
+    except ValueError:
+        print("Velocidades inválidas, se usará una impresora de 20 ppm.")
+        lista = [20]
+    return [Impresora(f"Impresora {i + 1}", ppm) for i, ppm in enumerate(lista) if ppm > 0] or [Impresora("Impresora 1")]
+
 def main():
     # Función principal del programa
-    cola_impresion = ColaImpresion()
+    politica = elegir_politica()
+    impresoras = configurar_impresoras()
+    preparador = None
+    if input("¿Dividir documentos grandes y agrupar los pequeños? (s/N): ").strip().lower() == "s":
+        preparador = PreparadorTrabajos()
+    # Con la variable de entorno COLAS_DATOS la cola sobrevive a un reinicio
+    persistencia = abrir_persistencia("impresion", Documento, CAMPOS_DOCUMENTO)
+    cola_impresion = ColaImpresion(politica, impresoras=impresoras, preparador=preparador,
+                                   persistencia=persistencia)
+    velocidades = [impresora.paginas_por_minuto for impresora in impresoras]  # Para comparar y dimensionar
     while True:
         mostrar_menu()
-        opcion = input("Seleccione una opción (1-6): ").strip()
+        opcion = input("Seleccione una opción (1-9): ").strip()
         match opcion:
             case '1':
                 documento = solicitar_documento()
@@ -134,7 +663,30 @@ def main():
                 for doc in cola_impresion.ver_historial():
                     print(f"- {doc}")
             case '6':
+                documentos = list(cola_impresion.documentos())
+                if not documentos:
+                    print("Aún no hay documentos para comparar.")
+                for politica, esperas in comparar_politicas(documentos, velocidades=velocidades).items():
+                    print(f"\n{politica}:")
+                    for usuario, espera in esperas.items():
+                        print(f"- {usuario}: {espera:.1f} s de espera media")
+            case '7':
+                for estado in cola_impresion.ver_impresoras():
+                    print(f"- {estado}")
+            case '8':
+                documentos = list(cola_impresion.documentos())
+                if not documentos:
+                    print("Aún no hay documentos para simular.")
+                else:
+                    filas, recomendadas = dimensionar_flota(documentos, velocidades=velocidades)
+                    for fila in filas:
+                        print(f"- {fila['impresoras']} impresora(s): espera media {fila['espera_media_s']:.1f} s, "
+                              f"todo impreso en {fila['fin_s']:.1f} s")
+                    print(f"Agregar más de {recomendadas} impresora(s) ya casi no reduce la espera.")
+            case '9':
                 print("\nCerrando el sistema de impresión. ¡Hasta pronto!")
+                if persistencia is not None:
+                    persistencia.cerrar()
                 break
             case _:
                 print("Opción no válida. Intente nuevamente.")
@@ -144,4 +696,9 @@ def main():
 # =============================
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1:
+        # Modo sin menú: python Ejercicio1.py traza.csv
+        for clave, valor in reproducir_traza(sys.argv[1]).items():
+            print(f"- {clave}: {valor}")
+    else:
+        main()
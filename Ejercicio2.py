@@ -1,103 +1,420 @@
 import time
 import threading
 import random
+import queue
+import asyncio
+import heapq
+import itertools
+import sys
 from collections import deque
-from datetime import datetime
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 
+from motor_colas import (Historial, Metricas, SimuladorColas, TiempoRegistrado, TiempoUniforme,
+                         campo_traza, formatear_hora, internar, leer_traza, marca_actual, pagina,
+                         ver_elementos)
+from generador_carga import GeneradorCarga
+from registro_persistente import abrir_persistencia
+
+DURACION_LLAMADA = (7, 20)  # Rango de segundos que dura cada llamada
+
 # =============================
 # MODELO DE DATOS
 # =============================
 
 class Llamada:
+    # Las horas son marcas en segundos desde la época (float), más livianas que un datetime
+    __slots__ = ("nombre_cliente", "motivo", "hora_entrada", "hora_atencion", "hora_salida",
+                 "duracion_s")
+
     def __init__(self, nombre_cliente, motivo):
         self.nombre_cliente = nombre_cliente
-        self.motivo = motivo
-        self.hora_entrada = datetime.now()
+        self.motivo = internar(motivo)
+        self.hora_entrada = marca_actual()
+        self.hora_atencion = None
         self.hora_salida = None
+        self.duracion_s = None      # Duración conocida de antemano (por ejemplo, de una traza)
 
     def __str__(self):
-        texto = (f"{self.hora_entrada.strftime('%H:%M:%S')} | Cliente: {self.nombre_cliente} | "
+        texto = (f"{formatear_hora(self.hora_entrada)} | Cliente: {self.nombre_cliente} | "
                  f"Motivo: {self.motivo}")
         if self.hora_salida:
-            texto += f" | Terminada: {self.hora_salida.strftime('%H:%M:%S')}"
+            texto += f" | Terminada: {formatear_hora(self.hora_salida)}"
         return texto
 
+# Columnas para guardar el historial de llamadas en un HistorialColumnar
+CAMPOS_LLAMADA = {"nombre_cliente": "texto", "motivo": "texto", "hora_entrada": "f",
+                  "hora_atencion": "f", "hora_salida": "f", "duracion_s": "f"}
+
 # =============================
 # LÓGICA DE NEGOCIO
 # =============================
 
 class CallCenter:
-    def __init__(self, agentes_disponibles=5):
+    def __init__(self, agentes_disponibles=5, despacho_automatico=False, update_callback=None,
+                 historial=None, persistencia=None):
         self.cola_llamadas = deque()
         self.en_atencion = []
-        self.historial = []
+        # Cualquier almacén con append; un HistorialColumnar con retención mantiene la memoria fija
+        self.historial = historial if historial is not None else Historial()
         self.lock = threading.Lock()
         self.agentes_disponibles = agentes_disponibles
         self.ocupados = 0
+        # Aumenta con cada cambio de la cola, de las llamadas en atención o del historial;
+        # la interfaz lo usa para saber si una lista que guardó sigue vigente
+        self.version = 0
+        # Esperas, duración, ocupación de los agentes y largo de la cola, en segundos reales
+        self.metricas = Metricas(agentes_disponibles)
+        # Si está activo, cada agente que se libera toma la siguiente llamada sin esperar un clic
+        self.despacho_automatico = despacho_automatico
+        # update_callback(evento, llamada) se invoca desde los hilos de los agentes con
+        # evento "inicio" o "fin"; también se usa para las llamadas despachadas solas
+        self.update_callback = update_callback
+        # Llamadas asignadas que los agentes toman de esta cola segura entre hilos
+        self.asignadas = queue.Queue()
+        # Con un RegistroPersistente las llamadas en espera y el historial sobreviven a un
+        # reinicio; las que se estaban atendiendo al caer vuelven a la cola
+        self.persistencia = persistencia
+        if persistencia is not None:
+            pendientes, atendidas = persistencia.restaurar()
+            self.cola_llamadas.extend(pendientes)
+            self.historial.extend(atendidas)
+        self.agentes = []
+        for i in range(agentes_disponibles):
+            agente = threading.Thread(target=self._agente, name=f"agente-{i + 1}", daemon=True)
+            agente.start()
+            self.agentes.append(agente)
 
     def agregar_llamada(self, llamada):
-        self.cola_llamadas.append(llamada)
+        with self.lock:
+            self.cola_llamadas.append(llamada)
+            self.version += 1
+            if self.persistencia is not None:
+                self.persistencia.alta(llamada)
+            self.metricas.llegada(llamada.hora_entrada)
+            self.metricas.cola(marca_actual(), len(self.cola_llamadas))
+            if self.despacho_automatico:
+                self._despachar_pendientes()
         return f"Llamada registrada: {llamada}"
 
-    def atender_llamada(self, update_callback=None):
-        if self.ocupados >= self.agentes_disponibles:
-            return "Todos los agentes están ocupados. Espere un momento..."
-        if not self.cola_llamadas:
-            return "No hay llamadas en espera."
+    def _reservar_siguiente(self, update_callback):
+        # Debe llamarse con self.lock tomado: reserva un agente para la próxima llamada
         llamada = self.cola_llamadas.popleft()
         self.ocupados += 1
-        hilo = threading.Thread(target=self._procesar_llamada, args=(llamada, update_callback))
-        hilo.daemon = True
-        hilo.start()
+        self.version += 1
+        self.metricas.cola(marca_actual(), len(self.cola_llamadas))
+        self.asignadas.put((llamada, update_callback))
+        return llamada
+
+    def _despachar_pendientes(self):
+        # Debe llamarse con self.lock tomado: reparte llamadas mientras haya agentes libres
+        while self.cola_llamadas and self.ocupados < self.agentes_disponibles:
+            self._reservar_siguiente(self.update_callback)
+
+    def cambiar_despacho_automatico(self, activo):
+        # Activa o desactiva el despacho continuo; al activarlo se reparte lo que espera
+        with self.lock:
+            self.despacho_automatico = activo
+            if activo:
+                self._despachar_pendientes()
+
+    def atender_llamada(self, update_callback=None):
+        # Reserva un agente y le entrega la siguiente llamada; la comprobación y la
+        # reserva se hacen bajo el mismo lock para no superar nunca la capacidad
+        with self.lock:
+            if self.ocupados >= self.agentes_disponibles:
+                return "Todos los agentes están ocupados. Espere un momento..."
+            if not self.cola_llamadas:
+                return "No hay llamadas en espera."
+            llamada = self._reservar_siguiente(update_callback or self.update_callback)
         return f"Atendiendo llamada de {llamada.nombre_cliente}..."
 
+    def _agente(self):
+        # Cada agente es un hilo de larga vida que atiende llamadas hasta que se cierra
+        while True:
+            trabajo = self.asignadas.get()
+            if trabajo is None:
+                break
+            self._procesar_llamada(*trabajo)
+
     def _procesar_llamada(self, llamada, update_callback=None):
         with self.lock:
+            llamada.hora_atencion = marca_actual()
+            self.metricas.inicio(llamada.hora_atencion, llamada.hora_atencion - llamada.hora_entrada)
             self.en_atencion.append(llamada)
-            if update_callback:
-                update_callback()
-        tiempo = random.randint(7, 20)  # 7 a 20 segundos
+            self.version += 1
+        # Los avisos a la interfaz se hacen fuera del lock para no bloquear a los demás agentes
+        if update_callback:
+            update_callback("inicio", llamada)
+        tiempo = random.randint(*DURACION_LLAMADA)
         time.sleep(tiempo)
         with self.lock:
             self.en_atencion.remove(llamada)
-            llamada.hora_salida = datetime.now()
+            llamada.hora_salida = marca_actual()
+            self.metricas.fin(llamada.hora_salida, llamada.hora_salida - llamada.hora_atencion)
             self.historial.append(llamada)
+            self.version += 1
+            if self.persistencia is not None:
+                self.persistencia.baja(llamada)
             self.ocupados -= 1
-            if update_callback:
-                update_callback()
+            if self.despacho_automatico:
+                self._despachar_pendientes()
+        if update_callback:
+            update_callback("fin", llamada)
+
+    def cerrar(self):
+        # Detiene a los agentes cuando terminen las llamadas que ya tienen asignadas
+        for _ in self.agentes:
+            self.asignadas.put(None)
+        if self.persistencia is not None:
+            self.persistencia.sincronizar()
+
+    def espera_media(self):
+        # Segundos promedio entre el registro de una llamada y el inicio de su atención
+        with self.lock:
+            return self.metricas.resumen()["espera_media"] or 0.0
 
-    def ver_llamada_actual(self):
-        if self.en_atencion:
-            return [str(llamada) for llamada in self.en_atencion]
-        else:
-            return ["No hay llamadas siendo atendidas en este momento."]
+    def resumen(self):
+        # Throughput, esperas (media y percentiles), utilización de los agentes y cola
+        with self.lock:
+            return self.metricas.resumen()
 
-    def ver_llamadas_pendientes(self):
-        if self.cola_llamadas:
-            return [str(llamada) for llamada in self.cola_llamadas]
-        else:
-            return ["No hay llamadas pendientes."]
+    # Los ver_* generan el texto de una página: desde/limite la eligen, filtro(llamada)
+    # selecciona y recientes empieza por el final. La página se toma con el lock y el
+    # texto se arma fuera, así los agentes no esperan al formateo.
+    def _ver(self, elementos, vacio, desde, limite, filtro, recientes):
+        with self.lock:
+            seleccion = list(pagina(elementos, desde, limite, filtro, recientes))
+        return ver_elementos(seleccion, vacio)
+
+    def ver_llamada_actual(self, desde=0, limite=None, filtro=None, recientes=False):
+        return self._ver(self.en_atencion, "No hay llamadas siendo atendidas en este momento.",
+                         desde, limite, filtro, recientes)
+
+    def ver_llamadas_pendientes(self, desde=0, limite=None, filtro=None, recientes=False):
+        return self._ver(self.cola_llamadas, "No hay llamadas pendientes.",
+                         desde, limite, filtro, recientes)
+
+    def ver_historial(self, desde=0, limite=None, filtro=None, recientes=False):
+        return self._ver(self.historial, "Aún no se han atendido llamadas.",
+                         desde, limite, filtro, recientes)
+
+class CallCenterAsync:
+    # Versión asyncio del call center: cada llamada es una corrutina y los agentes son un
+    # semáforo, así un solo hilo sostiene decenas de miles de llamadas simultáneas.
+    # escala_tiempo acelera el reloj: 1.0 es tiempo real, 0.001 va mil veces más rápido.
+    # Las horas y las métricas salen de un reloj virtual en segundos simulados: cada agente
+    # acumula la duración sorteada de sus llamadas y el tiempo real solo marca el ritmo, así
+    # el costo del bucle de eventos no se amplifica al dividir por la escala.
+    def __init__(self, agentes_disponibles=5, escala_tiempo=1.0, duracion=DURACION_LLAMADA, semilla=None,
+                 historial=None):
+        self.cola_llamadas = deque()
+        self.en_atencion = set()
+        self.historial = historial if historial is not None else Historial()
+        self.agentes_disponibles = agentes_disponibles
+        self.ocupados = 0
+        self.escala_tiempo = escala_tiempo
+        self.duracion = duracion            # Rango de segundos simulados por llamada
+        self.azar = random.Random(semilla)
+        self.agentes = None                 # asyncio.Semaphore, se crea dentro del bucle de eventos
+        self.tareas = set()                 # Llamadas en curso lanzadas con atender_llamada
+        self.metricas = Metricas(agentes_disponibles)  # En segundos simulados
+        self.base = marca_actual()          # Hora real que corresponde al segundo simulado 0
+        self.reloj = 0.0                    # Último instante simulado alcanzado
+        self.libres = [0.0] * agentes_disponibles  # Heap: instante simulado en que se libera cada agente
+
+    def _simulado(self, marca):
+        # Segundos simulados de una hora del reloj virtual
+        return marca - self.base
+
+    def _semaforo(self):
+        if self.agentes is None:
+            self.agentes = asyncio.Semaphore(self.agentes_disponibles)
+        return self.agentes
 
-    def ver_historial(self):
-        if self.historial:
-            return [str(llamada) for llamada in self.historial]
-        else:
-            return ["Aún no se han atendido llamadas."]
+    def agregar_llamada(self, llamada):
+        # La llamada entra en el instante simulado actual
+        llamada.hora_entrada = self.base + self.reloj
+        self.cola_llamadas.append(llamada)
+        self.metricas.llegada(self.reloj)
+        return f"Llamada registrada: {llamada}"
+
+    async def atender_llamada(self):
+        # Igual que CallCenter.atender_llamada, pero la llamada corre como una tarea asyncio
+        if self.ocupados >= self.agentes_disponibles:
+            return "Todos los agentes están ocupados. Espere un momento..."
+        if not self.cola_llamadas:
+            return "No hay llamadas en espera."
+        llamada = self.cola_llamadas.popleft()
+        self.ocupados += 1   # Se reserva el agente antes de que la tarea empiece a correr
+        tarea = asyncio.create_task(self._procesar_llamada(llamada, reservado=True))
+        self.tareas.add(tarea)
+        tarea.add_done_callback(self.tareas.discard)
+        return f"Atendiendo llamada de {llamada.nombre_cliente}..."
+
+    async def _procesar_llamada(self, llamada, reservado=False):
+        async with self._semaforo():
+            if not reservado:
+                self.ocupados += 1
+            # La llamada va al agente que se libera primero en el reloj virtual; así el
+            # orden en que terminan los sleeps reales no deja huecos en la simulación
+            llegada = self._simulado(llamada.hora_entrada)
+            tiempo = self.azar.randint(*self.duracion)
+            inicio = max(llegada, self.libres[0])
+            fin = inicio + tiempo
+            heapq.heapreplace(self.libres, fin)
+            self.reloj = max(self.reloj, inicio)
+            llamada.hora_atencion = self.base + inicio
+            self.metricas.inicio(inicio, inicio - llegada)
+            self.en_atencion.add(llamada)
+            await asyncio.sleep(tiempo * self.escala_tiempo)   # Solo marca el ritmo
+            self.en_atencion.discard(llamada)
+            llamada.hora_salida = self.base + fin
+            self.metricas.fin(fin, tiempo)
+            self.historial.append(llamada)
+            self.reloj = max(self.reloj, fin)
+            self.ocupados -= 1
+
+    async def atender_todas(self):
+        # Lanza una corrutina por cada llamada en espera; el semáforo limita cuántas
+        # se atienden a la vez. Devuelve cuando todas han terminado.
+        pendientes = []
+        while self.cola_llamadas:
+            pendientes.append(self._procesar_llamada(self.cola_llamadas.popleft()))
+        await asyncio.gather(*pendientes, *self.tareas)
+        return len(pendientes)
+
+    def resumen(self):
+        # Throughput, esperas (media y percentiles), utilización de los agentes y cola,
+        # en segundos simulados
+        return self.metricas.resumen()
+
+    async def esperar(self):
+        # Espera a que terminen las llamadas lanzadas con atender_llamada
+        if self.tareas:
+            await asyncio.gather(*self.tareas)
+
+    def ver_llamada_actual(self, desde=0, limite=None, filtro=None, recientes=False):
+        return ver_elementos(self.en_atencion, "No hay llamadas siendo atendidas en este momento.",
+                             desde, limite, filtro, recientes)
+
+    def ver_llamadas_pendientes(self, desde=0, limite=None, filtro=None, recientes=False):
+        return ver_elementos(self.cola_llamadas, "No hay llamadas pendientes.",
+                             desde, limite, filtro, recientes)
+
+    def ver_historial(self, desde=0, limite=None, filtro=None, recientes=False):
+        return ver_elementos(self.historial, "Aún no se han atendido llamadas.",
+                             desde, limite, filtro, recientes)
+
+
+def prueba_de_carga(llamadas=100_000, agentes=500, escala_tiempo=0.0001, semilla=None):
+    # Simula una ráfaga de llamadas sobre CallCenterAsync y devuelve las estadísticas
+    centro = CallCenterAsync(agentes, escala_tiempo=escala_tiempo, semilla=semilla)
+    for i in range(llamadas):
+        centro.agregar_llamada(Llamada(f"Cliente {i + 1}", "Prueba de carga"))
+    inicio = time.perf_counter()
+    atendidas = asyncio.run(centro.atender_todas())
+    metricas = centro.resumen()
+    return {"llamadas": atendidas, "agentes": agentes, "segundos_reales": time.perf_counter() - inicio,
+            "espera_p50": metricas["espera_p50"], "espera_p99": metricas["espera_p99"],
+            "utilizacion": metricas["utilizacion"]}
+
+
+def simular_call_center(llegadas, agentes=5, duracion=DURACION_LLAMADA, semilla=None, historial=None):
+    # Atiende sin esperas reales los pares (segundo de llegada, llamada) sobre el motor de
+    # colas compartido, leyéndolos de a uno (sirve un generador). Las llamadas con
+    # duracion_s la respetan; las demás sortean una dentro del rango. Las horas de cada
+    # llamada se calculan a partir de ahora y el resultado queda en el historial de un
+    # CallCenterAsync, listo para ver_historial.
+    centro = CallCenterAsync(agentes, duracion=duracion, semilla=semilla, historial=historial)
+    base = marca_actual()
+
+    def terminar(atencion):
+        llamada = atencion.elemento
+        llamada.hora_entrada = base + atencion.llegada
+        llamada.hora_atencion = base + atencion.inicio
+        llamada.hora_salida = base + atencion.fin
+        centro.historial.append(llamada)
+
+    modelo = TiempoRegistrado("duracion_s", TiempoUniforme(*duracion))
+    simulador = SimuladorColas(agentes, tiempo_servicio=modelo, semilla=semilla, al_terminar=terminar,
+                               historial=Historial(retencion=0))
+    simulador.cargar(llegadas)
+    return centro, simulador.simular()
+
+
+def _llegadas_de_traza(ruta):
+    # Convierte cada registro de la traza en (segundo de llegada, llamada)
+    for registro in leer_traza(ruta):
+        llamada = Llamada(campo_traza(registro, "nombre_cliente", defecto=""),
+                          campo_traza(registro, "motivo", defecto=""))
+        llamada.duracion_s = campo_traza(registro, "duracion", float)
+        yield campo_traza(registro, "llegada", float, 0.0), llamada
+
+
+def reproducir_traza(ruta, agentes=5, semilla=None, retencion=1000):
+    # Reproduce sin interfaz una traza JSONL o CSV con una llamada por registro: llegada
+    # (segundos), nombre_cliente, motivo y, opcional, duracion (segundos). Se lee de a una
+    # línea y el historial conserva solo las últimas llamadas, así la memoria no crece con
+    # el largo de la traza.
+    centro, resumen = simular_call_center(_llegadas_de_traza(ruta), agentes, semilla=semilla,
+                                          historial=Historial(retencion))
+    return resumen
+
+
+def simular_carga(cantidad, tasa, agentes=5, perfil="poisson", servicio=None, semilla=None,
+                  retencion=1000, **parametros):
+    # Somete al centro a una carga sintética de GeneradorCarga: cantidad llamadas a tasa
+    # llamadas por segundo con el perfil indicado. Sin modelo de servicio, cada llamada
+    # dura lo que indica DURACION_LLAMADA.
+    generador = GeneradorCarga(tasa, perfil, servicio, semilla, **parametros)
+
+    def crear(i, duracion):
+        llamada = Llamada(f"Cliente {i + 1}", "Carga sintética")
+        llamada.duracion_s = duracion
+        return llamada
+
+    centro, resumen = simular_call_center(generador.llegadas(cantidad, crear), agentes, semilla=semilla,
+                                          historial=Historial(retencion))
+    return resumen
 
 # =============================
 # INTERFAZ GRÁFICA (Tkinter)
 # =============================
 
 class CallCenterGUI:
+    INTERVALO_REFRESCO_MS = 100   # Como máximo 10 actualizaciones de pantalla por segundo
+    FILAS_POR_PAGINA = 100        # Filas que se materializan en la tabla a la vez
+    COLUMNAS = (("entrada", "Entrada", 90), ("cliente", "Cliente", 170), ("motivo", "Motivo", 230),
+                ("atencion", "Atención", 90), ("salida", "Terminada", 90))
+    # Atributo de Llamada por el que se ordena cada columna
+    CLAVES_ORDEN = {"entrada": "hora_entrada", "cliente": "nombre_cliente", "motivo": "motivo",
+                    "atencion": "hora_atencion", "salida": "hora_salida"}
+    TITULOS = {"en_atencion": "Llamadas en atención", "pendientes": "Llamadas pendientes",
+               "historial": "Historial de llamadas atendidas (más recientes primero)"}
+    VACIOS = {"en_atencion": "No hay llamadas siendo atendidas en este momento.",
+              "pendientes": "No hay llamadas pendientes.",
+              "historial": "Aún no se han atendido llamadas."}
+
     def __init__(self, root):
         self.root = root
         self.root.title("📞 Call Center - Simulador de Atención de Llamadas")
         self.root.geometry("800x600")
         self.root.configure(bg="#e6f2ff")
 
-        self.call_center = CallCenter(agentes_disponibles=4)  # Cambiado a 4 agentes
+        # Los agentes no tocan Tk: publican eventos en esta cola y la interfaz la vacía con root.after
+        self.eventos = queue.SimpleQueue()
+        self.vista = "pendientes"  # Lista mostrada en la tabla
+        self.pagina = 0            # Página visible de la lista
+        self.filtro = ""           # Texto buscado en cliente o motivo
+        self.orden = None          # Columna por la que se ordena (None = orden natural)
+        self.descendente = False
+        self.cache_clave = None    # Identifica la lista filtrada/ordenada guardada en cache_filas
+        self.cache_filas = []
+
+        # Con la variable de entorno COLAS_DATOS las llamadas sobreviven a un reinicio
+        self.call_center = CallCenter(agentes_disponibles=4, update_callback=self.notificar,  # Cambiado a 4 agentes
+                                      persistencia=abrir_persistencia("call_center", Llamada, CAMPOS_LLAMADA))
 
         # Encabezado bonito
         header = tk.Label(root, text="📞 Call Center - Simulador de Atención", font=("Arial", 22, "bold"), bg="#3399ff", fg="white", pady=10)
@@ -122,19 +439,170 @@ class CallCenterGUI:
         self.btn_historial = ttk.Button(btn_frame, text="Ver historial", command=self.mostrar_historial)
         self.btn_historial.grid(row=0, column=4, padx=8)
 
-        # Área de texto para mostrar información
-        self.text_area = tk.Text(root, height=25, font=("Consolas", 11), bg="#f7fbff", fg="#003366")
-        self.text_area.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+        # Modo de despacho: manual (con el botón) o automático (al liberarse un agente)
+        self.var_automatico = tk.BooleanVar(value=False)
+        self.chk_automatico = ttk.Checkbutton(btn_frame, text="Despacho automático", variable=self.var_automatico,
+                                              command=self.cambiar_despacho)
+        self.chk_automatico.grid(row=1, column=0, columnspan=5, pady=(8, 0))
+
+        # Búsqueda y título de la vista
+        busqueda_frame = tk.Frame(root, bg="#e6f2ff")
+        busqueda_frame.pack(fill=tk.X, padx=20)
+        self.titulo_label = tk.Label(busqueda_frame, font=("Arial", 12, "bold"), bg="#e6f2ff", fg="#003366")
+        self.titulo_label.pack(side=tk.LEFT)
+        self.var_busqueda = tk.StringVar()
+        self.var_busqueda.trace_add("write", lambda *_: self.buscar())
+        ttk.Entry(busqueda_frame, textvariable=self.var_busqueda, width=25).pack(side=tk.RIGHT)
+        tk.Label(busqueda_frame, text="Buscar:", bg="#e6f2ff").pack(side=tk.RIGHT, padx=5)
+
+        # Tabla: solo contiene las filas de la página visible, sin importar el tamaño de la lista
+        self.tabla = ttk.Treeview(root, columns=[c[0] for c in self.COLUMNAS], show="headings", height=18)
+        for columna, titulo, ancho in self.COLUMNAS:
+            self.tabla.heading(columna, text=titulo, command=lambda c=columna: self.ordenar_por(c))
+            self.tabla.column(columna, width=ancho, anchor=tk.W)
+        self.tabla.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+
+        # Navegación entre páginas
+        paginas_frame = tk.Frame(root, bg="#e6f2ff")
+        paginas_frame.pack()
+        ttk.Button(paginas_frame, text="◀ Anterior", command=lambda: self.cambiar_pagina(-1)).pack(side=tk.LEFT, padx=5)
+        self.pagina_label = tk.Label(paginas_frame, bg="#e6f2ff", width=30)
+        self.pagina_label.pack(side=tk.LEFT)
+        ttk.Button(paginas_frame, text="Siguiente ▶", command=lambda: self.cambiar_pagina(1)).pack(side=tk.LEFT, padx=5)
 
         # Estado de agentes
         self.status_label = tk.Label(root, text="Agentes disponibles: 4", font=("Arial", 12, "bold"), bg="#e6f2ff", fg="#006699")
         self.status_label.pack(pady=5)
 
+        self.dibujar()
+        self.root.after(self.INTERVALO_REFRESCO_MS, self.procesar_eventos)
+
+    def notificar(self, evento, llamada):
+        # Llamado desde los hilos de los agentes: solo encola el evento
+        self.eventos.put((evento, llamada))
+
+    def procesar_eventos(self):
+        # Vacía los eventos acumulados y redibuja una sola vez la página visible
+        hubo_eventos = False
+        while True:
+            try:
+                self.eventos.get_nowait()
+            except queue.Empty:
+                break
+            hubo_eventos = True
+        if hubo_eventos:
+            self.dibujar()
+        self.root.after(self.INTERVALO_REFRESCO_MS, self.procesar_eventos)
+
+    @staticmethod
+    def _hora(momento):
+        return formatear_hora(momento)
+
+    def _fila(self, llamada):
+        return (self._hora(llamada.hora_entrada), llamada.nombre_cliente, llamada.motivo,
+                self._hora(llamada.hora_atencion), self._hora(llamada.hora_salida))
+
+    def _coincide(self, llamada):
+        return self.filtro in llamada.nombre_cliente.lower() or self.filtro in llamada.motivo.lower()
+
+    def _origen(self):
+        return {"en_atencion": self.call_center.en_atencion,
+                "pendientes": self.call_center.cola_llamadas,
+                "historial": self.call_center.historial}[self.vista]
+
+    def _pagina_natural(self, origen, inicio):
+        # Sin filtro ni orden la página se toma directamente de la lista: O(filas por página)
+        total = len(origen)
+        if self.vista == "historial":
+            fin = total - inicio
+            return origen[max(0, fin - self.FILAS_POR_PAGINA):max(0, fin)][::-1], total
+        with self.call_center.lock:
+            return list(itertools.islice(origen, inicio, inicio + self.FILAS_POR_PAGINA)), len(origen)
+
+    def _pagina_filtrada(self, origen, inicio):
+        # Con búsqueda u orden se guarda la lista resultante y se reutiliza entre refrescos
+        clave = (self.vista, self.filtro, self.orden, self.descendente)
+        # La versión se lee antes que la lista: si cambia mientras se copia, se rehace después
+        version = self.call_center.version
+        total = len(origen)
+        if (self.cache_clave and self.cache_clave[0] == clave and self.vista == "historial"
+                and self.orden is None and self.cache_clave[1] <= total):
+            # El historial solo crece: basta con filtrar las llamadas nuevas
+            nuevas = [l for l in origen[self.cache_clave[1]:total] if self._coincide(l)]
+            self.cache_filas[:0] = reversed(nuevas)
+        elif self.cache_clave != (clave, total, version):
+            with self.call_center.lock:
+                datos = list(origen)
+            if self.filtro:
+                datos = [l for l in datos if self._coincide(l)]
+            if self.orden:
+                atributo = self.CLAVES_ORDEN[self.orden]
+                datos.sort(key=lambda l: (getattr(l, atributo) is not None, getattr(l, atributo) or ""),
+                           reverse=self.descendente)
+            elif self.vista == "historial":
+                datos.reverse()
+            self.cache_filas = datos
+        self.cache_clave = (clave, total, version)
+        return self.cache_filas[inicio:inicio + self.FILAS_POR_PAGINA], len(self.cache_filas)
+
+    def dibujar(self):
+        # Materializa solo las filas de la página visible
+        origen = self._origen()
+        inicio = self.pagina * self.FILAS_POR_PAGINA
+        if self.filtro or self.orden:
+            filas, total = self._pagina_filtrada(origen, inicio)
+        else:
+            filas, total = self._pagina_natural(origen, inicio)
+        paginas = max(1, -(-total // self.FILAS_POR_PAGINA))
+        if self.pagina >= paginas:
+            self.pagina = paginas - 1
+            return self.dibujar()
+        self.tabla.delete(*self.tabla.get_children())
+        for llamada in filas:
+            self.tabla.insert("", tk.END, values=self._fila(llamada))
+        self.titulo_label.config(text=self.TITULOS[self.vista])
+        if total:
+            self.pagina_label.config(text=f"Página {self.pagina + 1} de {paginas} ({total} llamadas)")
+        else:
+            self.pagina_label.config(text=self.VACIOS[self.vista])
         self.actualizar_estado()
 
+    def cambiar_vista(self, vista):
+        self.vista = vista
+        self.pagina = 0
+        self.cache_clave = None
+        self.dibujar()
+
+    def cambiar_pagina(self, paso):
+        self.pagina = max(0, self.pagina + paso)
+        self.dibujar()
+
+    def buscar(self):
+        self.filtro = self.var_busqueda.get().strip().lower()
+        self.pagina = 0
+        self.dibujar()
+
+    def ordenar_por(self, columna):
+        # Un clic ordena de forma ascendente, el segundo descendente y el tercero quita el orden
+        if self.orden != columna:
+            self.orden, self.descendente = columna, False
+        elif not self.descendente:
+            self.descendente = True
+        else:
+            self.orden, self.descendente = None, False
+        self.pagina = 0
+        self.dibujar()
+
     def actualizar_estado(self):
         libres = self.call_center.agentes_disponibles - self.call_center.ocupados
-        self.status_label.config(text=f"Agentes disponibles: {libres} / {self.call_center.agentes_disponibles}")
+        self.status_label.config(text=f"Agentes disponibles: {libres} / {self.call_center.agentes_disponibles} | "
+                                      f"Espera media: {self.call_center.espera_media():.1f} s")
+
+    def cambiar_despacho(self):
+        activo = self.var_automatico.get()
+        self.call_center.cambiar_despacho_automatico(activo)
+        self.btn_atender.state(["disabled"] if activo else ["!disabled"])
+        self.dibujar()
 
     def registrar_llamada(self):
         nombre = simpledialog.askstring("Registrar llamada", "Nombre del cliente:")
@@ -152,46 +620,36 @@ class CallCenterGUI:
         msg = self.call_center.agregar_llamada(llamada)
         self.mostrar_pendientes()
         messagebox.showinfo("Llamada registrada", msg)
-        self.actualizar_estado()
 
     def atender_llamada(self):
-        msg = self.call_center.atender_llamada(self.refrescar_todo)
+        msg = self.call_center.atender_llamada(self.notificar)
         messagebox.showinfo("Atención", msg)
-        self.refrescar_todo()
+        self.dibujar()
 
     def mostrar_en_atencion(self):
-        self.text_area.delete(1.0, tk.END)
-        self.text_area.insert(tk.END, "Llamadas en atención:\n\n")
-        for l in self.call_center.ver_llamada_actual():
-            self.text_area.insert(tk.END, f"- {l}\n")
-        self.actualizar_estado()
+        self.cambiar_vista("en_atencion")
 
     def mostrar_pendientes(self):
-        self.text_area.delete(1.0, tk.END)
-        self.text_area.insert(tk.END, "Llamadas pendientes:\n\n")
-        for l in self.call_center.ver_llamadas_pendientes():
-            self.text_area.insert(tk.END, f"- {l}\n")
-        self.actualizar_estado()
+        self.cambiar_vista("pendientes")
 
     def mostrar_historial(self):
-        self.text_area.delete(1.0, tk.END)
-        self.text_area.insert(tk.END, "Historial de llamadas atendidas:\n\n")
-        for l in self.call_center.ver_historial():
-            self.text_area.insert(tk.END, f"- {l}\n")
-        self.actualizar_estado()
+        self.cambiar_vista("historial")
 
     def refrescar_todo(self):
-        # Refresca todas las vistas para mostrar el estado actualizado
-        self.mostrar_en_atencion()
-        self.mostrar_pendientes()
-        self.mostrar_historial()
-        self.actualizar_estado()
+        # Vuelve a dibujar la página visible
+        self.dibujar()
 
 # =============================
 # PUNTO DE ENTRADA
 # =============================
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Modo sin interfaz: python Ejercicio2.py traza.jsonl [agentes]
+        agentes = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+        for clave, valor in reproducir_traza(sys.argv[1], agentes).items():
+            print(f"- {clave}: {valor}")
+        sys.exit()
     root = tk.Tk()
     app = CallCenterGUI(root)
     root.mainloop()
\ No newline at end of file
@@ -4,9 +4,30 @@ de servicio (compra, consulta, receta). El sistema debe permitir registrar
 nuevos pacientes, atender al siguiente en la fila y mostrar los turnos pendientes.'''
 
 from collections import deque
-from datetime import datetime
 import time
 import random  # Agrega esto al inicio junto con los otros imports
+import heapq
+import itertools
+import threading
+import sys
+
+from motor_colas import (ColaFIFO, ColaHeap, Historial, Metricas, SimuladorColas, TiempoPorTipo,
+                         TiempoRegistrado, TiempoUniforme, campo_traza, formatear_hora, internar,
+                         leer_traza, marca_actual, pagina, ver_elementos)
+from generador_carga import GeneradorCarga
+from registro_persistente import abrir_persistencia
+
+SERVICIOS = ('Compra', 'Consulta', 'Receta')  # Tipos de servicio que ofrece la farmacia
+# Rango de segundos que dura la atención de cada servicio
+DURACION_SERVICIO = {'Compra': (3, 7), 'Receta': (7, 12), 'Consulta': (10, 15)}
+SERVICIOS_EXPRESS = ('Compra',)  # Servicios cortos que pueden ir por la ventanilla rápida
+# Formas de repartir a los pacientes entre las ventanillas
+POLITICAS = {
+    'dedicada': "Cada ventanilla atiende solo su servicio",
+    'cola_mas_larga': "Ventanillas generales que vacían primero la cola más larga",
+    'express': "Ventanillas de Compra exclusivas; las demás atienden cualquier servicio",
+    'envejecimiento': "Primero los servicios cortos, pero la espera sube la prioridad",
+}
 
 # =============================
 # MODELO DE DATOS
@@ -14,57 +35,310 @@ import random  # Agrega esto al inicio junto con los otros imports
 
 class Paciente:
     # Representa a un paciente que solicita un turno en la farmacia
+    __slots__ = ("nombre", "servicio", "hora_turno", "turno", "hora_atencion", "hora_salida",
+                 "duracion_s")
+
     def __init__(self, nombre, servicio):
         self.nombre = nombre                  # Nombre del paciente
-        self.servicio = servicio              # Tipo de servicio solicitado
-        self.hora_turno = datetime.now()      # Hora en que se registró el turno
+        self.servicio = internar(servicio)    # Tipo de servicio solicitado
+        self.hora_turno = marca_actual()      # Hora en que se registró el turno (segundos desde la época)
+        self.turno = None                     # Número de turno asignado por la farmacia
+        self.hora_atencion = None             # Hora en que una ventanilla lo llamó
+        self.hora_salida = None               # Hora en que terminó su atención
+        self.duracion_s = None                # Duración conocida de antemano (por ejemplo, de una traza)
 
     def __str__(self):
         # Representación en texto del paciente y su turno
-        return f"{self.hora_turno.strftime('%H:%M:%S')} | Nombre: {self.nombre} | Servicio: {self.servicio}"
+        return f"{formatear_hora(self.hora_turno)} | Nombre: {self.nombre} | Servicio: {self.servicio}"
+
+# Columnas para guardar el historial de pacientes en un HistorialColumnar
+CAMPOS_PACIENTE = {"nombre": "texto", "servicio": "texto", "hora_turno": "f", "turno": "i",
+                   "hora_atencion": "f", "hora_salida": "f", "duracion_s": "f"}
 
 # =============================
 # LÓGICA DE NEGOCIO
 # =============================
 
+class Ventanilla:
+    # Mostrador que atiende en segundo plano a los pacientes de ciertos servicios
+    def __init__(self, nombre, servicios):
+        self.nombre = nombre          # Nombre visible de la ventanilla
+        self.servicios = servicios    # Servicios que puede atender
+        self.atendidos = 0            # Pacientes atendidos por esta ventanilla
+
+
+def armar_ventanillas(ventanillas, politica):
+    # ventanillas indica cuántos mostradores hay para cada servicio; según la política
+    # esos mostradores son exclusivos del servicio o atienden a cualquiera
+    if ventanillas is None:
+        ventanillas = {servicio: 1 for servicio in SERVICIOS}
+    armadas = []
+    for servicio, cantidad in ventanillas.items():
+        if politica == 'dedicada' or (politica == 'express' and servicio in SERVICIOS_EXPRESS):
+            servicios = (servicio,)
+        else:
+            servicios = SERVICIOS
+        for i in range(cantidad):
+            armadas.append(Ventanilla(f"{servicio} {i + 1}", servicios))
+    return armadas
+
+
 class Farmacia:
-    # Maneja la cola de turnos, la atención y el historial de pacientes
-    def __init__(self):
-        self.cola_turnos = deque()    # Cola de pacientes esperando turno
-        self.en_atencion = None       # Paciente que está siendo atendido
-        self.historial = []           # Lista de pacientes ya atendidos
+    # Maneja las colas de turnos, la atención y el historial de pacientes. Cada servicio
+    # tiene su propia cola y cada ventanilla trabaja en su propio hilo, así el menú sigue
+    # aceptando registros mientras se atiende. Con un RegistroPersistente los turnos en espera
+    # y el historial sobreviven a un reinicio; los que se atendían al caer vuelven a su cola.
+    def __init__(self, ventanillas=None, duracion=None, escala_tiempo=1.0, politica='dedicada',
+                 envejecimiento=0.5, historial=None, persistencia=None):
+        if politica not in POLITICAS:
+            raise ValueError(f"Política desconocida: {politica}")
+        self.colas = {servicio: deque() for servicio in SERVICIOS}  # Una cola por servicio
+        self.en_atencion = {}         # Paciente que atiende cada ventanilla
+        # Pacientes ya atendidos; un HistorialColumnar con retención mantiene la memoria fija
+        self.historial = historial if historial is not None else Historial()
+        self.duracion = duracion or DURACION_SERVICIO  # Rango de segundos (o uno por servicio)
+        self.escala_tiempo = escala_tiempo  # 1.0 es tiempo real; valores menores aceleran
+        self.politica = politica
+        self.envejecimiento = envejecimiento  # Segundos de prioridad ganados por segundo de espera
+        self.condicion = threading.Condition()  # Protege las colas y despierta a las ventanillas
+        self.abierta = True
+        self.turnos = itertools.count(1)
+        self.espera_total = {servicio: 0.0 for servicio in SERVICIOS}  # Segundos acumulados
+        self.atendidos = {servicio: 0 for servicio in SERVICIOS}
+        self.ventanillas = armar_ventanillas(ventanillas, politica)
+        # Esperas, ocupación de las ventanillas y largo de la cola, en segundos simulados
+        self.metricas = Metricas(len(self.ventanillas))
+        self.persistencia = persistencia
+        if persistencia is not None:
+            pendientes, atendidos = persistencia.restaurar()
+            for paciente in pendientes:
+                self.colas[paciente.servicio].append(paciente)
+            self.historial.extend(atendidos)
+            self.turnos = itertools.count(max((p.turno for p in pendientes + atendidos), default=0) + 1)
+        self.hilos = []
+        for ventanilla in self.ventanillas:
+            hilo = threading.Thread(target=self._trabajar, args=(ventanilla,), daemon=True)
+            hilo.start()
+            self.hilos.append(hilo)
+
+    @property
+    def cola_turnos(self):
+        # Todos los pacientes en espera, en orden de llegada
+        return list(heapq.merge(*self.colas.values(), key=lambda p: p.turno))
+
+    def _duracion(self, servicio):
+        # Rango de duración de un servicio (acepta un rango único para todos)
+        if isinstance(self.duracion, dict):
+            return self.duracion[servicio]
+        return self.duracion
 
     def registrar_paciente(self, paciente):
-        # Agrega un paciente a la cola de turnos
-        self.cola_turnos.append(paciente)
+        # Agrega un paciente a la cola de su servicio y avisa a las ventanillas
+        if not any(paciente.servicio in v.servicios for v in self.ventanillas):
+            return f" No hay ventanillas abiertas para {paciente.servicio}."
+        with self.condicion:
+            paciente.turno = next(self.turnos)
+            self.colas[paciente.servicio].append(paciente)
+            if self.persistencia is not None:
+                self.persistencia.alta(paciente)
+            self.metricas.llegada(paciente.hora_turno / self.escala_tiempo)
+            self.metricas.cola(marca_actual() / self.escala_tiempo, self._en_espera())
+            self.condicion.notify_all()
         return f" Turno registrado: {paciente}"
 
-    def atender_siguiente(self):
-        # Atiende al siguiente paciente en la cola
-        if self.en_atencion:
-            return f"Ya hay un paciente en atención: {self.en_atencion.nombre} ({self.en_atencion.servicio})"
-        if not self.cola_turnos:
-            return " No hay pacientes en espera."
-        self.en_atencion = self.cola_turnos.popleft()
-        print(f"\n Atendiendo a: {self.en_atencion}")
-        tiempo = random.randint(7, 15)  # Tiempo aleatorio entre 7 y 15 segundos
-        time.sleep(tiempo)
-        self.historial.append(self.en_atencion)
-        print(f" Atención finalizada para {self.en_atencion.nombre}")
-        self.en_atencion = None
-        return ""
-
-    def ver_turnos_pendientes(self):
-        # Devuelve la lista de pacientes en espera
-        if self.cola_turnos:
-            return [str(p) for p in self.cola_turnos]
-        return [" No hay turnos pendientes."]
-
-    def ver_historial(self):
-        # Devuelve la lista de pacientes ya atendidos
-        if self.historial:
-            return [str(p) for p in self.historial]
-        return [" Aún no se ha atendido ningún paciente."]
+    def _en_espera(self):
+        return sum(len(cola) for cola in self.colas.values())
+
+    def _prioridad(self, servicio, ahora):
+        # Menor valor = se atiende antes. Depende de la política de la farmacia.
+        primero = self.colas[servicio][0]
+        if self.politica == 'cola_mas_larga':
+            return -len(self.colas[servicio]), primero.turno
+        if self.politica == 'envejecimiento':
+            minimo, maximo = self._duracion(servicio)
+            espera = (ahora - primero.hora_turno) / self.escala_tiempo
+            return (minimo + maximo) / 2 - self.envejecimiento * espera, primero.turno
+        return primero.turno, 0  # Orden de llegada
+
+    def _tomar_paciente(self, ventanilla):
+        # Debe llamarse con la condición tomada: elige entre las colas que esta ventanilla
+        # puede atender y saca al primer paciente de la elegida
+        candidatas = [s for s in ventanilla.servicios if self.colas[s]]
+        if not candidatas:
+            return None
+        ahora = marca_actual()
+        servicio = min(candidatas, key=lambda s: self._prioridad(s, ahora))
+        paciente = self.colas[servicio].popleft()
+        paciente.hora_atencion = ahora
+        espera = (ahora - paciente.hora_turno) / self.escala_tiempo
+        self.espera_total[servicio] += espera
+        self.atendidos[servicio] += 1
+        self.metricas.inicio(ahora / self.escala_tiempo, espera)
+        self.metricas.cola(ahora / self.escala_tiempo, self._en_espera())
+        return paciente
+
+    def _trabajar(self, ventanilla):
+        # Bucle de cada ventanilla: espera un paciente, lo atiende y repite
+        while True:
+            with self.condicion:
+                paciente = self._tomar_paciente(ventanilla)
+                while paciente is None and self.abierta:
+                    self.condicion.wait()
+                    paciente = self._tomar_paciente(ventanilla)
+                if paciente is None:
+                    return
+                self.en_atencion[ventanilla.nombre] = paciente
+            tiempo = random.randint(*self._duracion(paciente.servicio))
+            time.sleep(tiempo * self.escala_tiempo)
+            with self.condicion:
+                del self.en_atencion[ventanilla.nombre]
+                paciente.hora_salida = marca_actual()
+                self.metricas.fin(paciente.hora_salida / self.escala_tiempo,
+                                  (paciente.hora_salida - paciente.hora_atencion) / self.escala_tiempo)
+                self.historial.append(paciente)
+                if self.persistencia is not None:
+                    self.persistencia.baja(paciente)
+                ventanilla.atendidos += 1
+
+    def espera_por_servicio(self):
+        # Espera media (segundos simulados) de los pacientes ya llamados, por servicio
+        with self.condicion:
+            return {s: self.espera_total[s] / self.atendidos[s] if self.atendidos[s] else 0.0
+                    for s in SERVICIOS}
+
+    def resumen(self):
+        # Throughput, esperas (media y percentiles), utilización de las ventanillas y cola
+        with self.condicion:
+            return self.metricas.resumen()
+
+    def cerrar(self):
+        # Las ventanillas terminan la atención en curso y dejan de tomar pacientes
+        with self.condicion:
+            self.abierta = False
+            self.condicion.notify_all()
+        if self.persistencia is not None:
+            self.persistencia.sincronizar()
+
+    def ver_en_atencion(self):
+        # Devuelve qué paciente atiende cada ventanilla
+        with self.condicion:
+            return [f"{v.nombre}: {self.en_atencion[v.nombre]}" if v.nombre in self.en_atencion
+                    else f"{v.nombre}: libre" for v in self.ventanillas]
+
+    def ver_turnos_pendientes(self, desde=0, limite=None, filtro=None, recientes=False):
+        # Genera los pacientes en espera por orden de turno. desde/limite eligen una página,
+        # filtro(paciente) los selecciona y recientes empieza por el último turno. La página
+        # se toma con la condición bloqueada y se formatea fuera.
+        with self.condicion:
+            pendientes = list(pagina(heapq.merge(*self.colas.values(), key=lambda p: p.turno),
+                                     desde, limite, filtro, recientes))
+        return ver_elementos(pendientes, " No hay turnos pendientes.",
+                             formato=lambda p: f"{p} | Turno: {p.turno}")
+
+    def ver_historial(self, desde=0, limite=None, filtro=None, recientes=False):
+        # Genera los pacientes ya atendidos (con recientes=True, del último al primero)
+        return ver_elementos(self.historial, " Aún no se ha atendido ningún paciente.",
+                             desde, limite, filtro, recientes)
+
+
+def simular_farmacia(llegadas, ventanillas=None, politica='dedicada', duracion=None,
+                     envejecimiento=0.5, semilla=None, historial=None, metricas=None):
+    # Atiende sin esperas reales los pares (segundo de llegada, paciente) sobre el motor
+    # de colas compartido, leyéndolos de a uno (sirve un generador). Las ventanillas que
+    # atienden los mismos servicios forman un grupo con su propia cola; cada paciente va al
+    # grupo exclusivo de su servicio si lo hay y si no a las ventanillas generales. En las
+    # generales, 'envejecimiento' ordena por duración media menos lo ganado esperando y las
+    # demás políticas por llegada. Los pacientes con duracion_s la respetan. Si se pasa un
+    # Metricas, recibe a todos los pacientes (percentiles y utilización de la farmacia entera).
+    # Devuelve la espera media por servicio y el historial en orden de salida.
+    duracion = duracion or DURACION_SERVICIO
+    if not isinstance(duracion, dict):
+        duracion = {servicio: duracion for servicio in SERVICIOS}
+    modelo = TiempoRegistrado("duracion_s", TiempoPorTipo(
+        "servicio", {s: TiempoUniforme(*duracion[s]) for s in SERVICIOS}))
+    base = marca_actual()
+    atendidos = historial if historial is not None else Historial()
+    espera = {servicio: [0.0, 0] for servicio in SERVICIOS}
+
+    def terminar(atencion):
+        paciente = atencion.elemento
+        paciente.hora_turno = base + atencion.llegada
+        paciente.hora_atencion = base + atencion.inicio
+        paciente.hora_salida = base + atencion.fin
+        espera[paciente.servicio][0] += atencion.espera
+        espera[paciente.servicio][1] += 1
+        atendidos.append(paciente)
+        if metricas is not None:
+            metricas.llegada(atencion.llegada)
+            metricas.inicio(atencion.inicio, atencion.espera)
+            metricas.fin(atencion.fin, atencion.fin - atencion.inicio)
+
+    def clave(atencion, ahora):
+        minimo, maximo = duracion[atencion.elemento.servicio]
+        return (minimo + maximo) / 2 + envejecimiento * atencion.llegada
+
+    grupos = {}
+    for ventanilla in armar_ventanillas(ventanillas, politica):
+        grupos[ventanilla.servicios] = grupos.get(ventanilla.servicios, 0) + 1
+    simuladores = {}
+    for i, (servicios, cantidad) in enumerate(grupos.items()):
+        cola = ColaHeap(clave) if politica == 'envejecimiento' and len(servicios) > 1 else ColaFIFO()
+        azar = None if semilla is None else semilla + i  # Cada grupo con su propia secuencia
+        simuladores[servicios] = SimuladorColas(cantidad, cola, modelo, azar, terminar,
+                                                historial=Historial(retencion=0))
+
+    def avanzar(hasta=None):
+        # Procesa los eventos de todos los grupos en orden de tiempo hasta el instante dado
+        while True:
+            pendientes = [s for s in simuladores.values() if s.motor]
+            if not pendientes:
+                return
+            simulador = min(pendientes, key=lambda s: s.motor.proximo_tiempo())
+            if hasta is not None and simulador.motor.proximo_tiempo() >= hasta:
+                return
+            simulador._paso()
+
+    for turno, (llegada, paciente) in enumerate(llegadas, start=1):
+        grupo = (paciente.servicio,) if (paciente.servicio,) in simuladores else SERVICIOS
+        if grupo not in simuladores:
+            raise ValueError(f"No hay ventanillas abiertas para {paciente.servicio}.")
+        avanzar(llegada)
+        paciente.turno = turno
+        simuladores[grupo].llegada(paciente, llegada)
+    avanzar()
+    return {s: total / cantidad if cantidad else 0.0 for s, (total, cantidad) in espera.items()}, atendidos
+
+
+def reproducir_traza(ruta, ventanillas=None, politica='dedicada', semilla=None, retencion=1000):
+    # Reproduce sin hilos ni esperas una traza JSONL o CSV con un paciente por registro:
+    # llegada (segundos), nombre, servicio y, opcional, duracion (segundos). Se lee de a una
+    # línea y el historial conserva solo los últimos pacientes.
+    def pacientes():
+        for registro in leer_traza(ruta):
+            paciente = Paciente(campo_traza(registro, "nombre", defecto=""),
+                                campo_traza(registro, "servicio", defecto="Compra"))
+            paciente.duracion_s = campo_traza(registro, "duracion", float)
+            yield campo_traza(registro, "llegada", float, 0.0), paciente
+
+    return simular_farmacia(pacientes(), ventanillas, politica, semilla=semilla,
+                            historial=Historial(retencion))
+
+
+def simular_carga(cantidad, tasa, ventanillas=None, politica='dedicada', perfil="poisson", servicio=None,
+                  semilla=None, retencion=1000, metricas=None, **parametros):
+    # Somete a la farmacia a una carga sintética de GeneradorCarga: cantidad pacientes a
+    # tasa pacientes por segundo, cada uno con un servicio al azar. Sin modelo de servicio,
+    # la atención dura lo que indica DURACION_SERVICIO.
+    generador = GeneradorCarga(tasa, perfil, servicio, semilla, **parametros)
+    azar = random.Random(semilla)
+
+    def crear(i, duracion):
+        paciente = Paciente(f"Paciente {i + 1}", azar.choice(SERVICIOS))
+        paciente.duracion_s = duracion
+        return paciente
+
+    return simular_farmacia(generador.llegadas(cantidad, crear), ventanillas, politica, semilla=semilla,
+                            historial=Historial(retencion), metricas=metricas)
 
 # =============================
 # INTERFAZ DE CONSOLA
@@ -74,10 +348,11 @@ def mostrar_menu():
     # Muestra el menú de opciones al usuario
     print("\n=== SISTEMA DE TURNOS - FARMACIA ===")
     print("1. Registrar nuevo paciente")
-    print("2. Atender siguiente paciente")
+    print("2. Ver pacientes en atención")
     print("3. Ver turnos pendientes")
     print("4. Ver historial de atención")
-    print("5. Salir")
+    print("5. Ver espera media por servicio")
+    print("6. Salir")
 
 def elegir_servicio():
     # Permite al usuario elegir el tipo de servicio para el paciente
@@ -92,6 +367,29 @@ def elegir_servicio():
     opcion = input("Opción (1-3): ").strip()
     return servicios.get(opcion, None)
 
+def elegir_politica():
+    # Permite elegir cómo se reparten los pacientes entre las ventanillas
+    nombres = list(POLITICAS)
+    print("\nSeleccione la política de atención:")
+    for i, nombre in enumerate(nombres, start=1):
+        print(f"{i}. {nombre} - {POLITICAS[nombre]}")
+    opcion = input(f"Opción (1-{len(nombres)}, Enter = dedicada): ").strip()
+    if opcion.isdigit() and 1 <= int(opcion) <= len(nombres):
+        return nombres[int(opcion) - 1]
+    return 'dedicada'
+
+def configurar_ventanillas():
+    # Pregunta cuántas ventanillas habrá para cada servicio (Enter = 1)
+    ventanillas = {}
+    for servicio in SERVICIOS:
+        respuesta = input(f"Ventanillas para {servicio} (Enter = 1): ").strip()
+        try:
+            ventanillas[servicio] = max(0, int(respuesta)) if respuesta else 1
+        except ValueError:
+            print(" Valor inválido, se usará 1 ventanilla.")
+            ventanillas[servicio] = 1
+    return ventanillas
+
 def crear_paciente():
     # Solicita los datos del paciente y crea un objeto Paciente
     nombre = input("Nombre del paciente: ").strip()
@@ -110,18 +408,21 @@ def crear_paciente():
 
 def main():
     # Función principal que ejecuta el sistema de turnos
-    farmacia = Farmacia()
+    politica = elegir_politica()
+    # Con la variable de entorno COLAS_DATOS los turnos sobreviven a un reinicio
+    farmacia = Farmacia(configurar_ventanillas(), politica=politica,
+                        persistencia=abrir_persistencia("farmacia", Paciente, CAMPOS_PACIENTE))
     while True:
         mostrar_menu()
-        opcion = input("Seleccione una opción (1-5): ").strip()
+        opcion = input("Seleccione una opción (1-6): ").strip()
         if opcion == '1':
             paciente = crear_paciente()
             if paciente:
                 print(farmacia.registrar_paciente(paciente))
         elif opcion == '2':
-            resultado = farmacia.atender_siguiente()
-            if resultado:
-                print(resultado)
+            print("\n Pacientes en atención:")
+            for v in farmacia.ver_en_atencion():
+                print(f"- {v}")
         elif opcion == '3':
             print("\n Turnos pendientes:")
             for p in farmacia.ver_turnos_pendientes():
@@ -131,7 +432,16 @@ def main():
             for p in farmacia.ver_historial():
                 print(f"- {p}")
         elif opcion == '5':
+            print("\n Espera media por servicio:")
+            for servicio, espera in farmacia.espera_por_servicio().items():
+                print(f"- {servicio}: {espera:.1f} s")
+            resumen = farmacia.resumen()
+            if resumen["espera_p95"] is not None:
+                print(f"- Percentiles 50/95/99: {resumen['espera_p50']:.1f} / {resumen['espera_p95']:.1f}"
+                      f" / {resumen['espera_p99']:.1f} s")
+        elif opcion == '6':
             print("\n Cerrando sistema de turnos de farmacia.")
+            farmacia.cerrar()
             break
         else:
             print(" Opción inválida. Intente de nuevo.")
@@ -141,6 +451,14 @@ def main():
 # =============================
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1:
+        # Modo sin consola: python Ejercicio3.py traza.csv [politica]
+        politica = sys.argv[2] if len(sys.argv) > 2 else 'dedicada'
+        espera, historial = reproducir_traza(sys.argv[1], politica=politica)
+        print(f"Pacientes atendidos: {historial.total}")
+        for servicio, media in espera.items():
+            print(f"- {servicio}: espera media {media:.2f} s")
+    else:
+        main()
 
 
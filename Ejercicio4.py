@@ -5,9 +5,16 @@ libre, atiende al siguiente proceso en orden de llegada (FIFO - First In, First
 El sistema debe permitir agregar procesos a la cola, mostrar el proceso en ejecución
 y visualizar los procesos pendientes.'''
 
+import copy
+import random
+import sys
 import time
 from collections import deque
-from datetime import datetime
+
+from motor_colas import (ColaFIFO, ColaHeap, Historial, Metricas, MotorEventos,
+                         campo_traza, formatear_hora, leer_traza, marca_actual, ver_elementos)
+from generador_carga import GeneradorCarga
+from registro_persistente import abrir_persistencia
 
 # =============================
 # MODELO DE DATOS
@@ -15,62 +22,477 @@ from datetime import datetime
 
 class Proceso:
     # Representa un proceso que será ejecutado por el microprocesador
-    def __init__(self, id_proceso, nombre, duracion_ms):
+    __slots__ = ("id_proceso", "nombre", "duracion_ms", "prioridad", "restante_ms", "nivel",
+                 "fecha_creacion", "llegada_ms", "inicio_ms", "fin_ms")
+
+    def __init__(self, id_proceso, nombre, duracion_ms, prioridad=0):
         self.id_proceso = id_proceso              # Identificador único del proceso
         self.nombre = nombre                      # Nombre del proceso
         self.duracion_ms = duracion_ms            # Duración estimada en milisegundos
-        self.fecha_creacion = datetime.now()      # Fecha y hora de creación del proceso
+        self.prioridad = prioridad                # Prioridad (menor número = más urgente)
+        self.restante_ms = duracion_ms            # Tiempo de CPU que aún le falta
+        self.nivel = 0                            # Nivel actual en la cola multinivel
+        self.fecha_creacion = marca_actual()      # Creación del proceso (segundos desde la época)
+        self.llegada_ms = None                    # Instante simulado de llegada a la cola
+        self.inicio_ms = None                     # Instante simulado de inicio de ejecución
+        self.fin_ms = None                        # Instante simulado de finalización
+
+    @property
+    def espera_ms(self):
+        # Tiempo simulado que el proceso pasó en la cola (sumando las expropiaciones)
+        if self.llegada_ms is None:
+            return None
+        if self.fin_ms is not None:
+            return self.fin_ms - self.llegada_ms - self.duracion_ms
+        if self.inicio_ms is not None:
+            return self.inicio_ms - self.llegada_ms
+        return None
 
     def __str__(self):
         # Representación en texto del proceso
-        return (f"{self.fecha_creacion.strftime('%H:%M:%S')} | "
-                f"ID: {self.id_proceso} | Nombre: {self.nombre} | Duración: {self.duracion_ms} ms")
+        texto = (f"{formatear_hora(self.fecha_creacion)} | "
+                 f"ID: {self.id_proceso} | Nombre: {self.nombre} | Duración: {self.duracion_ms} ms")
+        if self.fin_ms is not None:
+            texto += (f" | Inicio: {self.inicio_ms} ms | Fin: {self.fin_ms} ms"
+                      f" | Espera: {self.espera_ms} ms")
+        return texto
+
+# Columnas para guardar el historial de procesos en un HistorialColumnar
+CAMPOS_PROCESO = {"id_proceso": "texto", "nombre": "texto", "duracion_ms": "i", "prioridad": "i",
+                  "restante_ms": "i", "nivel": "i", "fecha_creacion": "f", "llegada_ms": "i",
+                  "inicio_ms": "i", "fin_ms": "i"}
+
+# =============================
+# POLÍTICAS DE PLANIFICACIÓN
+# =============================
+
+class PlanificadorFIFO(ColaFIFO):
+    # Atiende los procesos en orden de llegada, sin expropiación
+    nombre = "FIFO"
+    expropiativo = False
+
+    def rafaga(self, proceso):
+        # Tiempo máximo que el proceso puede ocupar la CPU antes de ser desalojado
+        return proceso.restante_ms
+
+
+class PlanificadorHeap(ColaHeap):
+    # Base para políticas que eligen el proceso con la menor clave usando un heap
+    nombre = "Heap"
+    expropiativo = False
+
+    def rafaga(self, proceso):
+        return proceso.restante_ms
+
+
+class PlanificadorSJF(PlanificadorHeap):
+    # Shortest Job First: ejecuta primero el proceso más corto, sin expropiación
+    nombre = "SJF"
+
+    def clave(self, proceso, ahora=None):
+        return proceso.restante_ms
+
+
+class PlanificadorSRTF(PlanificadorSJF):
+    # Shortest Remaining Time First: como SJF, pero un proceso más corto que llega
+    # desaloja al que está en ejecución
+    nombre = "SRTF"
+    expropiativo = True
+
+
+class PlanificadorPrioridad(PlanificadorHeap):
+    # Ejecuta primero el proceso con menor número de prioridad
+    nombre = "Prioridad"
+
+    def clave(self, proceso, ahora=None):
+        return proceso.prioridad
+
+
+class PlanificadorRoundRobin(PlanificadorFIFO):
+    # Turno rotatorio: cada proceso usa la CPU como máximo un quantum y vuelve a la cola
+    nombre = "Round Robin"
+
+    def __init__(self, quantum_ms=20):
+        # Con un quantum nulo el proceso volvería a la cola sin avanzar, y uno negativo
+        # haría retroceder el reloj
+        if quantum_ms <= 0:
+            raise ValueError("El quantum debe ser un número positivo de milisegundos.")
+        super().__init__()
+        self.quantum_ms = quantum_ms
+
+    def rafaga(self, proceso):
+        return min(proceso.restante_ms, self.quantum_ms)
+
+
+class PlanificadorMLFQ:
+    # Cola multinivel con retroalimentación: los procesos entran al nivel 0 y bajan
+    # de nivel cada vez que agotan su quantum
+    nombre = "MLFQ"
+    expropiativo = False
+
+    def __init__(self, quantums_ms=(10, 20, 40)):
+        if not quantums_ms or any(q <= 0 for q in quantums_ms):
+            raise ValueError("Cada nivel necesita un quantum positivo de milisegundos.")
+        self.quantums_ms = quantums_ms
+        self.niveles = [deque() for _ in quantums_ms]
+        self.cantidad = 0
+
+    def agregar(self, proceso):
+        proceso.nivel = 0
+        self.niveles[0].append(proceso)
+        self.cantidad += 1
+
+    def reencolar(self, proceso):
+        # Agotó su quantum: pasa al siguiente nivel (o se queda en el último)
+        proceso.nivel = min(proceso.nivel + 1, len(self.niveles) - 1)
+        self.niveles[proceso.nivel].append(proceso)
+        self.cantidad += 1
+
+    def siguiente(self):
+        for nivel in self.niveles:
+            if nivel:
+                self.cantidad -= 1
+                return nivel.popleft()
+        raise IndexError("La cola multinivel está vacía.")
+
+    def robar(self):
+        # Se roba desde el nivel más bajo, donde están los procesos más largos
+        for nivel in reversed(self.niveles):
+            if nivel:
+                self.cantidad -= 1
+                return nivel.pop()
+        raise IndexError("La cola multinivel está vacía.")
+
+    def primero(self):
+        for nivel in self.niveles:
+            if nivel:
+                return nivel[0]
+        raise IndexError("La cola multinivel está vacía.")
+
+    def rafaga(self, proceso):
+        return min(proceso.restante_ms, self.quantums_ms[proceso.nivel])
+
+    def __len__(self):
+        return self.cantidad
+
+    def __iter__(self):
+        for nivel in self.niveles:
+            yield from nivel
+
+
+PLANIFICADORES = {
+    "FIFO": PlanificadorFIFO,
+    "SJF": PlanificadorSJF,
+    "SRTF": PlanificadorSRTF,
+    "Prioridad": PlanificadorPrioridad,
+    "Round Robin": PlanificadorRoundRobin,
+    "MLFQ": PlanificadorMLFQ,
+}
 
 # =============================
 # LÓGICA DE SIMULACIÓN
 # =============================
 
+class Nucleo:
+    # Un núcleo de la CPU con su propia cola de ejecución
+    def __init__(self, id_nucleo, cola):
+        self.id_nucleo = id_nucleo   # Número del núcleo
+        self.cola = cola             # Cola de ejecución propia (según la política)
+        self.en_ejecucion = None     # Proceso que ocupa el núcleo
+        self.inicio_rafaga = 0       # Instante en que empezó la ráfaga actual
+        self.turno = 0               # Identifica la ráfaga vigente (invalida fines desalojados)
+        self.ocupado_ms = 0          # Tiempo simulado total de trabajo
+        self.completados = 0         # Procesos terminados en este núcleo
+        self.robos = 0               # Procesos tomados de la cola de otro núcleo
+        self.cambios_contexto = 0    # Veces que el núcleo pasó de un proceso a otro
+
+    def pendientes(self):
+        # Procesos en la cola del núcleo más el que se está ejecutando
+        return len(self.cola) + (self.en_ejecucion is not None)
+
+
 class Microprocesador:
-    # Simula la cola de procesos y su ejecución en el microprocesador
-    def __init__(self):
-        self.cola = deque()      # Cola de procesos pendientes (FIFO)
-        self.historial = []      # Lista de procesos ya ejecutados
-
-    def agregar_proceso(self, proceso):
-        # Agrega un proceso a la cola de ejecución
-        self.cola.append(proceso)
+    # Simula la cola de procesos y su ejecución en el microprocesador. Con nucleos > 1
+    # cada núcleo tiene su propia cola y los núcleos ociosos roban trabajo de los ocupados.
+    def __init__(self, planificador=None, tiempo_real=False, nucleos=1, historial=None, persistencia=None):
+        if planificador is None:
+            planificador = PlanificadorFIFO()
+        if nucleos < 1:
+            raise ValueError("El microprocesador necesita al menos un núcleo.")
+        self.politica = planificador.nombre
+        self.nucleos = [Nucleo(0, planificador)]
+        for i in range(1, nucleos):
+            self.nucleos.append(Nucleo(i, copy.deepcopy(planificador)))
+        # Procesos ya ejecutados; un HistorialColumnar con retención mantiene la memoria fija
+        self.historial = historial if historial is not None else Historial()
+        self.motor = MotorEventos()  # Reloj virtual y eventos pendientes
+        self.siguiente_nucleo = 0    # Reparto rotatorio de las llegadas entre núcleos
+        self.tiempo_real = tiempo_real  # Si es True, espera de verdad el tiempo simulado
+        self.metricas = Metricas(nucleos)  # Llegadas, esperas, ocupación y largo de las colas
+        self.espera_total_ms = 0     # Sumas acumuladas de los procesos terminados: el resumen
+        self.retorno_total_ms = 0    # no recorre el historial
+        self.makespan_ms = 0
+        # Con un RegistroPersistente los procesos pendientes y el historial sobreviven a un
+        # reinicio. Los que estaban a medio ejecutar vuelven a la cola con toda su duración.
+        self.persistencia = persistencia
+        if persistencia is not None:
+            self._restaurar(*persistencia.restaurar())
+
+    def _restaurar(self, pendientes, terminados):
+        # El reloj sigue desde el último fin guardado. Los terminados vuelven a las sumas y
+        # a las métricas; como el registro no guarda el núcleo, su tiempo de CPU se reparte
+        # por igual. Los pendientes conservan su llegada: los que ya habían llegado entran a
+        # las colas y los demás se programan como llegadas futuras.
+        self.motor.reloj = max((p.fin_ms for p in terminados), default=0)
+        self.historial.extend(terminados)
+        for proceso in terminados:
+            self.espera_total_ms += proceso.espera_ms
+            self.retorno_total_ms += proceso.fin_ms - proceso.llegada_ms
+            self.metricas.llegada(proceso.llegada_ms)
+            self.metricas.inicio(proceso.inicio_ms, proceso.inicio_ms - proceso.llegada_ms)
+            self.metricas.fin(proceso.fin_ms)
+            self.metricas.ocupacion(proceso.duracion_ms)
+            for nucleo in self.nucleos:
+                nucleo.ocupado_ms += proceso.duracion_ms / len(self.nucleos)
+        self.makespan_ms = self.reloj_ms
+        for proceso in pendientes:
+            if proceso.llegada_ms <= self.reloj_ms:
+                self._asignar(proceso)
+            else:
+                self.motor.programar(proceso.llegada_ms, MotorEventos.LLEGADA, proceso)
+
+    @property
+    def reloj_ms(self):
+        # Tiempo simulado actual
+        return self.motor.reloj
+
+    @property
+    def cola(self):
+        # Cola de ejecución del primer núcleo (la única en el modo de un núcleo)
+        return self.nucleos[0].cola
+
+    def _asignar(self, proceso):
+        # Coloca un proceso que acaba de llegar en la cola del próximo núcleo
+        nucleo = self.nucleos[self.siguiente_nucleo]
+        self.siguiente_nucleo = (self.siguiente_nucleo + 1) % len(self.nucleos)
+        nucleo.cola.agregar(proceso)
+        self.metricas.llegada(self.reloj_ms)
+        self._expropiar_si_corresponde(nucleo, proceso)
+
+    def _encolar(self, proceso, llegada_ms):
+        # Registra la llegada de un proceso: a una cola si ya llegó, al motor si es futura.
+        # El alta se guarda con la llegada ya fijada, para restaurarla al reiniciar.
+        inmediata = llegada_ms is None or llegada_ms <= self.reloj_ms
+        proceso.llegada_ms = self.reloj_ms if inmediata else llegada_ms
+        if self.persistencia is not None:
+            self.persistencia.alta(proceso)
+        if inmediata:
+            self._asignar(proceso)
+        else:
+            self.motor.programar(llegada_ms, MotorEventos.LLEGADA, proceso)
+
+    def agregar_proceso(self, proceso, llegada_ms=None):
+        # Agrega un proceso a la cola de ejecución. Con llegada_ms se programa una
+        # llegada futura en el tiempo simulado.
+        self._encolar(proceso, llegada_ms)
         return f" Proceso agregado: {proceso}"
 
+    def cargar_procesos(self, procesos):
+        # Agrega muchos procesos de una vez, sin construir el mensaje de cada uno.
+        # Acepta procesos sueltos o pares (proceso, llegada_ms).
+        cantidad = 0
+        for elemento in procesos:
+            if isinstance(elemento, tuple):
+                self._encolar(*elemento)
+            else:
+                self._encolar(elemento, None)
+            cantidad += 1
+        return cantidad
+
+    def reproducir(self, procesos):
+        # Como cargar_procesos con pares (proceso, llegada_ms) en orden de llegada, pero
+        # simulando a medida que los lee: el motor nunca guarda más de una llegada futura,
+        # así una traza larga se recorre con memoria constante. Devuelve el resumen.
+        motor = self.motor
+        self._despachar_todos()
+        sin_despachar = False   # Llegaron procesos en el instante actual del reloj
+        for proceso, llegada_ms in procesos:
+            if sin_despachar and llegada_ms > self.reloj_ms:
+                # Las llegadas simultáneas se reparten juntas, como en cargar_procesos
+                self._despachar_todos()
+                sin_despachar = False
+            while motor and motor.proximo_tiempo() < llegada_ms:
+                self._procesar_evento()
+            sin_despachar = sin_despachar or llegada_ms <= self.reloj_ms
+            self._encolar(proceso, llegada_ms)
+        return self.simular()
+
+    def _robar_trabajo(self, ladron):
+        # Un núcleo ocioso toma un proceso de la cola más cargada entre los núcleos ocupados;
+        # robarle a un núcleo libre solo movería el trabajo de un núcleo ocioso a otro
+        ocupados = [n for n in self.nucleos if n.en_ejecucion is not None and n.cola]
+        if not ocupados:
+            return None
+        victima = max(ocupados, key=lambda n: len(n.cola))
+        ladron.robos += 1
+        return victima.cola.robar()
+
+    def _despachar(self, nucleo, proceso):
+        # Pone el proceso en el núcleo libre y agenda el fin de su ráfaga
+        if proceso.inicio_ms is None:
+            proceso.inicio_ms = self.reloj_ms
+            self.metricas.inicio(self.reloj_ms, self.reloj_ms - proceso.llegada_ms)
+        nucleo.en_ejecucion = proceso
+        nucleo.inicio_rafaga = self.reloj_ms
+        nucleo.turno += 1
+        nucleo.cambios_contexto += 1
+        fin = self.reloj_ms + nucleo.cola.rafaga(proceso)
+        self.motor.programar(fin, MotorEventos.FIN, (nucleo, proceso, nucleo.turno))
+
+    def _despachar_todos(self):
+        # Pone a trabajar a todos los núcleos libres: primero cada uno con su propia cola y
+        # después, los que siguen sin trabajo, robando a los que quedaron ocupados
+        libres = []
+        for nucleo in self.nucleos:
+            if nucleo.en_ejecucion is not None:
+                continue
+            if nucleo.cola:
+                self._despachar(nucleo, nucleo.cola.siguiente())
+            else:
+                libres.append(nucleo)
+        for nucleo in libres:
+            proceso = self._robar_trabajo(nucleo)
+            if proceso is None:
+                break
+            self._despachar(nucleo, proceso)
+        self.metricas.cola(self.reloj_ms, sum(len(n.cola) for n in self.nucleos))
+
+    def _expropiar_si_corresponde(self, nucleo, recien_llegado):
+        # Con políticas expropiativas, un proceso más corto desaloja al que se ejecuta
+        actual = nucleo.en_ejecucion
+        if not nucleo.cola.expropiativo or actual is None:
+            return
+        transcurrido = self.reloj_ms - nucleo.inicio_rafaga
+        restante = actual.restante_ms - transcurrido
+        if recien_llegado.restante_ms < restante:
+            actual.restante_ms = restante
+            nucleo.ocupado_ms += transcurrido
+            self.metricas.ocupacion(transcurrido)
+            nucleo.en_ejecucion = None   # El evento FIN pendiente queda obsoleto por el turno
+            nucleo.cola.reencolar(actual)
+
+    def _procesar_evento(self):
+        # Procesa un evento del motor y devuelve el proceso terminado, si lo hubo
+        antes = self.reloj_ms
+        tipo, dato = self.motor.siguiente()
+        if self.tiempo_real and self.reloj_ms > antes:
+            time.sleep((self.reloj_ms - antes) / 1000.0)  # Reproduce el tiempo a escala real
+        if tipo == MotorEventos.LLEGADA:
+            self._asignar(dato)
+            self._despachar_todos()
+            return None
+        nucleo, proceso, turno = dato
+        if turno != nucleo.turno or nucleo.en_ejecucion is not proceso:
+            return None  # Ráfaga interrumpida por una expropiación
+        transcurrido = self.reloj_ms - nucleo.inicio_rafaga
+        proceso.restante_ms -= transcurrido
+        nucleo.ocupado_ms += transcurrido
+        self.metricas.ocupacion(transcurrido)
+        nucleo.en_ejecucion = None
+        terminado = None
+        if proceso.restante_ms > 0:
+            nucleo.cola.reencolar(proceso)   # Agotó su quantum
+        else:
+            proceso.fin_ms = self.reloj_ms
+            nucleo.completados += 1
+            self.metricas.fin(self.reloj_ms)
+            self.espera_total_ms += proceso.espera_ms
+            self.retorno_total_ms += proceso.fin_ms - proceso.llegada_ms
+            self.makespan_ms = self.reloj_ms
+            self.historial.append(proceso)
+            if self.persistencia is not None:
+                self.persistencia.baja(proceso)
+            terminado = proceso
+        self._despachar_todos()
+        return terminado
+
+    def en_ejecucion(self):
+        # Procesos que ocupan algún núcleo en este instante
+        return [n.en_ejecucion for n in self.nucleos if n.en_ejecucion is not None]
+
     def ejecutar_proceso(self):
-        # Ejecuta el siguiente proceso en la cola (si hay alguno)
-        if not self.cola:
+        # Avanza el reloj virtual hasta que termine el próximo proceso
+        self._despachar_todos()
+        if not self.motor:
             return " No hay procesos en la cola."
-        proceso = self.cola.popleft()
-        print(f"\n Ejecutando proceso: {proceso}")
-        time.sleep(proceso.duracion_ms / 1000.0)  # Simula el tiempo de ejecución real
-        self.historial.append(proceso)
-        return f" Proceso {proceso.id_proceso} terminado."
+        for proceso in self.en_ejecucion():
+            print(f"\n Ejecutando proceso: {proceso}")
+        while self.motor:
+            terminado = self._procesar_evento()
+            if terminado is not None:
+                return f" Proceso {terminado.id_proceso} terminado en t={terminado.fin_ms} ms."
+        return " No hay procesos en la cola."
+
+    def simular(self, hasta_ms=None):
+        # Ejecuta todos los procesos pendientes (o hasta el instante indicado) sin esperas
+        # reales y devuelve un resumen de la ejecución
+        self._despachar_todos()
+        while self.motor:
+            if hasta_ms is not None and self.motor.proximo_tiempo() > hasta_ms:
+                break
+            self._procesar_evento()
+        return self.resumen()
+
+    def resumen(self):
+        # Estadísticas de los procesos ejecutados, en milisegundos simulados, a partir de
+        # sumas acumuladas (O(1), cuente o no el historial con retención). Los percentiles
+        # son del tiempo de respuesta: desde la llegada hasta la primera ejecución.
+        total = self.historial.total
+        datos = {"politica": self.politica, "nucleos": len(self.nucleos),
+                 "procesos": total, "reloj_ms": self.reloj_ms}
+        if not total:
+            return datos
+        makespan = self.makespan_ms
+        metricas = self.metricas.resumen()
+        ocupado = [n.ocupado_ms for n in self.nucleos]
+        promedio = sum(ocupado) / len(ocupado)
+        datos.update({
+            "makespan_ms": makespan,
+            "throughput_por_s": total * 1000.0 / makespan if makespan else None,
+            "espera_media_ms": self.espera_total_ms / total,
+            "retorno_medio_ms": self.retorno_total_ms / total,
+            "respuesta_p50_ms": metricas["espera_p50"],
+            "respuesta_p95_ms": metricas["espera_p95"],
+            "respuesta_p99_ms": metricas["espera_p99"],
+            "cola_media": metricas["cola_media"],
+            "cola_maxima": metricas["cola_maxima"],
+            "cambios_contexto": sum(n.cambios_contexto for n in self.nucleos),
+            "utilizacion_por_nucleo": [o / makespan if makespan else 0.0 for o in ocupado],
+            "desbalance": max(ocupado) / promedio - 1 if promedio else 0.0,
+            "robos": sum(n.robos for n in self.nucleos),
+        })
+        return datos
 
     def ver_proceso_actual(self):
-        # Muestra el proceso que está primero en la cola (el próximo a ejecutar)
-        if self.cola:
-            return f" Proceso en espera para ejecutar: {self.cola[0]}"
-        else:
-            return " No hay procesos en la cola."
+        # Muestra los procesos en ejecución o, si la CPU está libre, el próximo en cola
+        activos = [n for n in self.nucleos if n.en_ejecucion is not None]
+        if activos:
+            return "\n".join(f" Núcleo {n.id_nucleo} ejecutando (t={self.reloj_ms} ms): {n.en_ejecucion}"
+                             for n in activos)
+        for nucleo in self.nucleos:
+            if nucleo.cola:
+                return f" Proceso en espera para ejecutar: {nucleo.cola.primero()}"
+        return " No hay procesos en la cola."
 
-    def ver_procesos_pendientes(self):
-        # Devuelve la lista de procesos pendientes en la cola
-        if self.cola:
-            return [str(p) for p in self.cola]
-        else:
-            return [" No hay procesos pendientes."]
+    def ver_procesos_pendientes(self, desde=0, limite=None, filtro=None, recientes=False):
+        # Genera los procesos pendientes en las colas de todos los núcleos. desde/limite
+        # eligen una página, filtro(proceso) los selecciona y recientes empieza por el final.
+        return ver_elementos((p for nucleo in self.nucleos for p in nucleo.cola),
+                             " No hay procesos pendientes.", desde, limite, filtro, recientes)
 
-    def ver_historial(self):
-        # Devuelve la lista de procesos que ya fueron ejecutados
-        if self.historial:
-            return [str(p) for p in self.historial]
-        else:
-            return [" Historial vacío."]
+    def ver_historial(self, desde=0, limite=None, filtro=None, recientes=False):
+        # Genera los procesos que ya fueron ejecutados (con recientes=True, del último al primero)
+        return ver_elementos(self.historial, " Historial vacío.", desde, limite, filtro, recientes)
 
 # =============================
 # INTERFAZ DE CONSOLA
@@ -84,7 +506,29 @@ def mostrar_menu():
     print("3. Ejecutar siguiente proceso")
     print("4. Ver procesos pendientes")
     print("5. Ver historial de procesos ejecutados")
-    print("6. Salir")
+    print("6. Simular todos los procesos pendientes")
+    print("7. Salir")
+
+def elegir_planificador():
+    # Permite al usuario elegir la política de planificación de la CPU
+    nombres = list(PLANIFICADORES)
+    print("\nSeleccione la política de planificación:")
+    for i, nombre in enumerate(nombres, start=1):
+        print(f"{i}. {nombre}")
+    opcion = input(f"Opción (1-{len(nombres)}, Enter = FIFO): ").strip()
+    if not opcion.isdigit() or not 1 <= int(opcion) <= len(nombres):
+        return PlanificadorFIFO()
+    clase = PLANIFICADORES[nombres[int(opcion) - 1]]
+    if clase is PlanificadorRoundRobin:
+        while True:
+            texto = input("Quantum (ms, Enter = 20): ").strip()
+            if not texto:
+                break
+            try:
+                return clase(int(texto))
+            except ValueError:
+                print(" Quantum inválido. Debe ser un número entero positivo.")
+    return clase()
 
 def crear_proceso():
     # Solicita los datos de un nuevo proceso al usuario
@@ -103,16 +547,55 @@ def crear_proceso():
         print(" Duración inválida. Debe ser un número entero positivo.")
         return None
 
+def _procesos_de_traza(ruta):
+    # Convierte cada registro de la traza en (proceso, llegada_ms)
+    for numero, registro in enumerate(leer_traza(ruta), start=1):
+        proceso = Proceso(campo_traza(registro, "id_proceso", defecto=f"P{numero}"),
+                          campo_traza(registro, "nombre", defecto=""),
+                          campo_traza(registro, "duracion", int, 1),
+                          campo_traza(registro, "prioridad", int, 0))
+        yield proceso, campo_traza(registro, "llegada", int, 0)
+
+
+def reproducir_traza(ruta, planificador=None, nucleos=1, retencion=1000):
+    # Reproduce una traza JSONL o CSV con un proceso por registro: llegada (ms), id_proceso,
+    # nombre, duracion (ms) y prioridad. Se lee de a una línea y el historial conserva solo
+    # los últimos procesos, así la memoria no crece con el largo de la traza.
+    cpu = Microprocesador(planificador, nucleos=nucleos, historial=Historial(retencion))
+    return cpu.reproducir(_procesos_de_traza(ruta))
+
+
+def simular_carga(cantidad, tasa, planificador=None, nucleos=1, perfil="poisson",
+                  servicio=("exponencial", 20), semilla=None, retencion=1000, **parametros):
+    # Somete al microprocesador a una carga sintética de GeneradorCarga: cantidad procesos
+    # a tasa procesos por milisegundo; servicio da la duración de cada uno en milisegundos
+    # y la prioridad sale al azar entre 0 y 4. Los tiempos se redondean a milisegundos.
+    generador = GeneradorCarga(tasa, perfil, servicio, semilla, **parametros)
+    azar = random.Random(semilla)
+
+    def crear(i, duracion):
+        return Proceso(f"P{i + 1}", "Sintético", max(1, round(duracion)), azar.randint(0, 4))
+
+    cpu = Microprocesador(planificador, nucleos=nucleos, historial=Historial(retencion))
+    return cpu.reproducir((proceso, round(llegada)) for llegada, proceso in generador.llegadas(cantidad, crear))
+
 # =============================
 # FUNCIÓN PRINCIPAL
 # =============================
 
 def main():
     # Función principal que ejecuta el simulador del microprocesador
-    cpu = Microprocesador()
+    planificador = elegir_planificador()
+    try:
+        nucleos = int(input("Número de núcleos (Enter = 1): ").strip() or 1)
+    except ValueError:
+        nucleos = 1
+    # Con la variable de entorno COLAS_DATOS la cola sobrevive a un reinicio
+    persistencia = abrir_persistencia("microprocesador", Proceso, CAMPOS_PROCESO)
+    cpu = Microprocesador(planificador, nucleos=max(1, nucleos), persistencia=persistencia)
     while True:
         mostrar_menu()
-        opcion = input("Seleccione una opción (1-6): ").strip()
+        opcion = input("Seleccione una opción (1-7): ").strip()
         if opcion == '1':
             # Agregar un nuevo proceso a la cola
             proceso = crear_proceso()
@@ -135,8 +618,16 @@ def main():
             for p in cpu.ver_historial():
                 print(f"- {p}")
         elif opcion == '6':
+            # Ejecutar todo lo pendiente sobre el reloj virtual
+            resumen = cpu.simular()
+            print(f"\n Simulación completada en t={resumen['reloj_ms']} ms.")
+            for clave, valor in resumen.items():
+                print(f"- {clave}: {valor}")
+        elif opcion == '7':
             # Salir del simulador
             print("\n Cerrando simulador de microprocesador.")
+            if persistencia is not None:
+                persistencia.cerrar()
             break
         else:
             print(" Opción no válida. Intente nuevamente.")
@@ -146,4 +637,11 @@ def main():
 # =============================
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1:
+        # Modo sin menú: python Ejercicio4.py traza.jsonl [politica] [nucleos]
+        politica = sys.argv[2] if len(sys.argv) > 2 else "FIFO"
+        nucleos = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+        for clave, valor in reproducir_traza(sys.argv[1], PLANIFICADORES[politica](), nucleos).items():
+            print(f"- {clave}: {valor}")
+    else:
+        main()
\ No newline at end of file
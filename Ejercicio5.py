@@ -8,8 +8,23 @@ qué usuario está accediendo al archivo y eliminar la solicitud una vez atendid
 También debe permitir consultar la lista de solicitudes pendientes.
 '''
 
-from collections import deque
-from datetime import datetime
+import heapq
+import itertools
+import mmap
+import os
+import random
+import sys
+import time
+import zlib
+from collections import deque, OrderedDict
+
+from motor_colas import (Historial, Metricas, TiempoConstante, TiempoPorTipo, TiempoRegistrado, campo_traza,
+                         formatear_hora, internar, leer_traza, marca_actual, ver_elementos)
+from generador_carga import GeneradorCarga
+from registro_persistente import abrir_persistencia
+
+LECTURA = "lectura"        # Varios lectores pueden acceder juntos al mismo archivo
+ESCRITURA = "escritura"    # Un escritor necesita el archivo en exclusiva
 
 # =============================
 # MODELO DE DATOS
@@ -17,59 +32,383 @@ from datetime import datetime
 
 class SolicitudAcceso:
     # Representa una solicitud de acceso a un archivo por parte de un usuario
-    def __init__(self, usuario, archivo):
-        self.usuario = usuario                        # Nombre del usuario que solicita acceso
-        self.archivo = archivo                        # Nombre del archivo solicitado
-        self.fecha_solicitud = datetime.now()         # Fecha y hora de la solicitud
+    __slots__ = ("usuario", "archivo", "tipo", "id_solicitud", "fecha_solicitud", "llegada_ms",
+                 "inicio_ms", "fin_ms", "bytes_servidos", "crc32", "duracion_ms")
+
+    def __init__(self, usuario, archivo, tipo=LECTURA):
+        self.usuario = internar(usuario)              # Nombre del usuario que solicita acceso
+        self.archivo = internar(archivo)              # Nombre del archivo solicitado
+        self.tipo = tipo                              # Lectura (compartida) o escritura (exclusiva)
+        self.id_solicitud = None                      # Número asignado por el servidor al registrarla
+        self.fecha_solicitud = marca_actual()         # Hora de la solicitud (segundos desde la época)
+        self.llegada_ms = None                        # Instante simulado en que se registró
+        self.inicio_ms = None                         # Instante simulado en que se concedió el acceso
+        self.fin_ms = None                            # Instante simulado en que terminó el acceso
+        self.bytes_servidos = 0                       # Bytes entregados (solo con archivos reales)
+        self.crc32 = 0                                # CRC-32 del contenido entregado, para verificarlo
+        self.duracion_ms = None                       # Duración ya conocida (por ejemplo, de una traza)
 
     def __str__(self):
         # Representación en texto de la solicitud
-        return (f"{self.fecha_solicitud.strftime('%Y-%m-%d %H:%M:%S')} | "
-                f"Usuario: {self.usuario} | Archivo: {self.archivo}")
+        return (f"{formatear_hora(self.fecha_solicitud, '%Y-%m-%d %H:%M:%S')} | "
+                f"Usuario: {self.usuario} | Archivo: {self.archivo} | Tipo: {self.tipo}")
+
+# Columnas para guardar el historial de solicitudes en un HistorialColumnar
+CAMPOS_SOLICITUD = {"usuario": "texto", "archivo": "texto", "tipo": "texto", "id_solicitud": "i",
+                    "fecha_solicitud": "f", "llegada_ms": "f", "inicio_ms": "f", "fin_ms": "f", "bytes_servidos": "i",
+                    "crc32": "i", "duracion_ms": "f"}
 
 # =============================
 # LÓGICA DE NEGOCIO
 # =============================
 
+class CacheArchivos:
+    # Cache LRU de archivos mapeados en memoria (mmap), limitada por tamaño total en bytes.
+    # Devuelve memoryview sobre el mapeo, así entregar un archivo o un trozo no copia datos.
+    def __init__(self, limite_bytes=64 * 1024 * 1024):
+        self.limite_bytes = limite_bytes
+        self.mapas = OrderedDict()   # ruta -> (mmap, memoryview), del menos al más reciente
+        self.ocupado = 0             # Bytes mapeados en la cache
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, ruta):
+        # Devuelve una vista de solo lectura del archivo completo
+        entrada = self.mapas.get(ruta)
+        if entrada is not None:
+            self.aciertos += 1
+            self.mapas.move_to_end(ruta)
+            return entrada[1]
+        self.fallos += 1
+        with open(ruta, "rb") as archivo:
+            tamano = os.fstat(archivo.fileno()).st_size
+            if tamano == 0:
+                return memoryview(b"")   # mmap no admite archivos vacíos
+            mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        vista = memoryview(mapa)
+        if tamano <= self.limite_bytes:
+            self.mapas[ruta] = (mapa, vista)
+            self.ocupado += tamano
+            while self.ocupado > self.limite_bytes:
+                self._expulsar(next(iter(self.mapas)))
+        return vista
+
+    def _expulsar(self, ruta):
+        # Saca un archivo de la cache; el mapeo se libera cuando nadie usa ya sus vistas
+        _, vista = self.mapas.pop(ruta)
+        self.ocupado -= len(vista)
+
+    def invalidar(self, ruta):
+        # Olvida un archivo que pudo cambiar (por ejemplo, tras una escritura)
+        if ruta in self.mapas:
+            self._expulsar(ruta)
+
+    def tasa_aciertos(self):
+        total = self.aciertos + self.fallos
+        return self.aciertos / total if total else 0.0
+
+
 class ServidorArchivos:
-    # Simula la gestión de solicitudes de acceso a archivos en un servidor
-    def __init__(self):
-        self.cola_solicitudes = deque()   # Cola de solicitudes pendientes
-        self.historial = []               # Historial de solicitudes atendidas
-
-    def registrar_solicitud(self, solicitud):
-        # Agrega una nueva solicitud a la cola
-        self.cola_solicitudes.append(solicitud)
+    # Simula la gestión de solicitudes de acceso a archivos en un servidor. Cada archivo
+    # tiene su propia cola y el servidor las recorre por turnos (round-robin), así una
+    # ráfaga sobre un archivo no bloquea a los demás. Con lecturas compartidas, las
+    # lecturas seguidas de un mismo archivo se conceden juntas y cada escritura se concede
+    # sola; una escritura en espera frena a las lecturas que llegaron después, así los
+    # escritores no se quedan esperando para siempre.
+    # Si se indica una carpeta raíz, cada solicitud atendida lee de verdad el archivo pedido
+    # (mapeado con mmap y guardado en una cache LRU) y el tiempo real de E/S se suma al reloj.
+    # No usa MotorEventos ni SimuladorColas: hay un solo servidor y cada turno atiende un
+    # lote entero (varias solicitudes con un mismo inicio y fin), elegido por archivo y no
+    # por orden de llegada. Nunca hay dos fines pendientes ni llegadas futuras que ordenar,
+    # así que el reloj avanza de turno en turno y el heap del motor no aportaría nada;
+    # SimuladorColas, pensado para c servidores que atienden de a un elemento, no puede
+    # expresar el lote ni la ronda.
+    def __init__(self, lecturas_compartidas=True, duracion_lectura_ms=50, duracion_escritura_ms=80,
+                 raiz=None, cache_bytes=64 * 1024 * 1024, historial=None, persistencia=None):
+        self.colas = {}                   # Cola de cada archivo: OrderedDict id -> solicitud
+        self.ronda = deque()              # Archivos con solicitudes, en orden de turno
+        self.en_ronda = set()             # Archivos que ya están en la ronda
+        self.solicitudes = {}             # Índice id -> solicitud pendiente
+        self.por_usuario = {}             # Índice usuario -> {id: solicitud} pendientes
+        self.historial = historial if historial is not None else Historial()  # Solicitudes atendidas
+        self.ids = itertools.count(1)
+        self.lecturas_compartidas = lecturas_compartidas
+        self.duracion_lectura_ms = duracion_lectura_ms      # Tiempo simulado de una lectura
+        self.duracion_escritura_ms = duracion_escritura_ms  # Tiempo simulado de una escritura
+        # Duración de cada acceso: la registrada en la traza o la fija de su tipo
+        self.modelo = TiempoRegistrado("duracion_ms", TiempoPorTipo("tipo", {
+            LECTURA: TiempoConstante(duracion_lectura_ms),
+            ESCRITURA: TiempoConstante(duracion_escritura_ms),
+        }))
+        self.reloj_ms = 0                 # Tiempo simulado transcurrido
+        self.turnos = 0                   # Veces que se concedió el acceso (lotes)
+        self.raiz = os.path.realpath(raiz) if raiz else None  # Carpeta de los archivos reales
+        self.cache = CacheArchivos(cache_bytes)
+        self.bytes_servidos = 0           # Bytes entregados a los usuarios
+        self.io_ms = 0.0                  # Tiempo real dedicado a leer archivos
+        self.metricas = Metricas()        # Esperas, ocupación y largo de la cola (un servidor)
+        # Con un RegistroPersistente las solicitudes pendientes (con sus números) y el
+        # historial sobreviven a un reinicio; el reloj sigue desde el último instante guardado
+        self.persistencia = persistencia
+        if persistencia is not None:
+            pendientes, atendidas = persistencia.restaurar()
+            for solicitud in pendientes:
+                self._indexar(solicitud)
+            self.historial.extend(atendidas)
+            self.ids = itertools.count(max((s.id_solicitud for s in pendientes + atendidas), default=0) + 1)
+            instantes = [s.fin_ms for s in atendidas] + [s.llegada_ms for s in pendientes]
+            self.reloj_ms = max((t for t in instantes if t is not None), default=0)
+
+    @property
+    def cola_solicitudes(self):
+        # Todas las solicitudes pendientes en orden de llegada
+        return list(self._pendientes_en_orden())
+
+    def _pendientes_en_orden(self):
+        # Mezcla perezosa de las colas de cada archivo, por número de solicitud
+        return heapq.merge(*(cola.values() for cola in self.colas.values()),
+                           key=lambda s: s.id_solicitud)
+
+    def registrar_solicitud(self, solicitud, llegada_ms=None):
+        # Agrega una nueva solicitud a la cola de su archivo y a los índices. llegada_ms
+        # indica cuándo llegó si fue antes del reloj actual (mientras se atendía otro lote).
+        solicitud.id_solicitud = next(self.ids)
+        solicitud.llegada_ms = self.reloj_ms if llegada_ms is None else min(llegada_ms, self.reloj_ms)
+        self._indexar(solicitud)
+        if self.persistencia is not None:
+            self.persistencia.alta(solicitud)
+        self.metricas.llegada(solicitud.llegada_ms)
+        self.metricas.cola(self.reloj_ms, len(self.solicitudes))
         return f"Solicitud registrada: {solicitud}"
 
+    def _indexar(self, solicitud):
+        # Pone la solicitud en la cola de su archivo, en los índices y en la ronda
+        self.colas.setdefault(solicitud.archivo, OrderedDict())[solicitud.id_solicitud] = solicitud
+        self.solicitudes[solicitud.id_solicitud] = solicitud
+        self.por_usuario.setdefault(solicitud.usuario, {})[solicitud.id_solicitud] = solicitud
+        if solicitud.archivo not in self.en_ronda:
+            self.en_ronda.add(solicitud.archivo)
+            self.ronda.append(solicitud.archivo)
+
+    def _quitar_de_indices(self, solicitud):
+        del self.solicitudes[solicitud.id_solicitud]
+        del self.colas[solicitud.archivo][solicitud.id_solicitud]
+        del self.por_usuario[solicitud.usuario][solicitud.id_solicitud]
+        if not self.por_usuario[solicitud.usuario]:
+            del self.por_usuario[solicitud.usuario]
+
+    def cancelar_solicitud(self, id_solicitud):
+        # Elimina una solicitud pendiente en O(1); el archivo sale de la ronda al llegar su turno
+        solicitud = self.solicitudes.get(id_solicitud)
+        if solicitud is None:
+            return f" No existe una solicitud pendiente con ID {id_solicitud}."
+        self._quitar_de_indices(solicitud)
+        if self.persistencia is not None:
+            self.persistencia.baja(solicitud, atendido=False)
+        self.metricas.cola(self.reloj_ms, len(self.solicitudes))
+        return f" Solicitud cancelada: {solicitud}"
+
+    def buscar_solicitud(self, id_solicitud):
+        return self.solicitudes.get(id_solicitud)
+
+    def pendientes_de_archivo(self, archivo):
+        # Solicitudes pendientes de un archivo, en orden de llegada
+        return list(self.colas.get(archivo, {}).values())
+
+    def pendientes_de_usuario(self, usuario):
+        # Solicitudes pendientes de un usuario, en orden de llegada
+        return list(self.por_usuario.get(usuario, {}).values())
+
+    def _archivo_en_turno(self):
+        # Primer archivo de la ronda que aún tiene solicitudes (descarta los vaciados)
+        while self.ronda:
+            archivo = self.ronda[0]
+            if self.colas.get(archivo):
+                return archivo
+            self.ronda.popleft()
+            self.en_ronda.discard(archivo)
+            self.colas.pop(archivo, None)
+        return None
+
+    def _siguiente_lote(self, archivo):
+        # Primera solicitud del archivo y, si es una lectura, las lecturas que la siguen
+        # hasta la próxima escritura de ese archivo
+        lote = []
+        for solicitud in self.colas[archivo].values():
+            if lote and (solicitud.tipo != LECTURA or lote[0].tipo != LECTURA
+                         or not self.lecturas_compartidas):
+                break
+            lote.append(solicitud)
+        for solicitud in lote:
+            self._quitar_de_indices(solicitud)
+        return lote
+
+    def _ruta(self, archivo):
+        # Ruta real del archivo dentro de la carpeta raíz (no se permite salir de ella)
+        ruta = os.path.realpath(os.path.join(self.raiz, archivo))
+        if os.path.commonpath([ruta, self.raiz]) != self.raiz:
+            raise PermissionError(f"{archivo} está fuera de la carpeta del servidor.")
+        return ruta
+
+    def leer_archivo(self, archivo, inicio=0, tamano=None):
+        # Devuelve una vista (sin copia) del archivo o de un trozo de él
+        vista = self.cache.obtener(self._ruta(archivo))
+        fin = len(vista) if tamano is None else inicio + tamano
+        return vista[inicio:fin]
+
+    def _servir(self, archivo, lote):
+        # Lee el archivo una sola vez para todo el lote de lectores; una escritura lo
+        # saca de la cache para que la próxima lectura vea el contenido nuevo
+        comienzo = time.perf_counter()
+        if lote[0].tipo == LECTURA:
+            # Se recorre todo el contenido (como lo haría el envío por la red), así el tiempo
+            # medido incluye traer las páginas del disco cuando el archivo no está en cache
+            vista = self.leer_archivo(archivo)
+            tamano = len(vista)
+            crc = zlib.crc32(vista)
+            for solicitud in lote:
+                solicitud.bytes_servidos = tamano
+                solicitud.crc32 = crc
+            self.bytes_servidos += tamano * len(lote)
+        else:
+            self.cache.invalidar(self._ruta(archivo))
+        transcurrido = (time.perf_counter() - comienzo) * 1000.0
+        self.io_ms += transcurrido
+        return transcurrido
+
+    def _medir(self, lote, duracion):
+        # El lote ocupa el servidor una sola vez aunque atienda a varios lectores
+        for solicitud in lote:
+            self.metricas.inicio(self.reloj_ms, self.reloj_ms - solicitud.llegada_ms)
+            self.metricas.fin(self.reloj_ms + duracion)
+        self.metricas.ocupacion(duracion)
+        self.metricas.cola(self.reloj_ms, len(self.solicitudes))
+
+    def _archivar(self, lote):
+        # Pasa al historial las solicitudes ya atendidas
+        self.historial.extend(lote)
+        if self.persistencia is not None:
+            for solicitud in lote:
+                self.persistencia.baja(solicitud)
+
     def atender_solicitud(self):
-        # Atiende la siguiente solicitud en la cola (FIFO)
-        if not self.cola_solicitudes:
+        # Concede el acceso al archivo que tiene el turno (y a las lecturas que acompañan
+        # a su primera solicitud) y lo pasa al final de la ronda
+        archivo = self._archivo_en_turno()
+        if archivo is None:
             return " No hay solicitudes pendientes."
-        solicitud = self.cola_solicitudes.popleft()
-        self.historial.append(solicitud)
-        return f" Atendiendo solicitud: {solicitud}"
+        lote = self._siguiente_lote(archivo)
+        self.ronda.rotate(-1)
+        duracion = max(self.modelo(s, None) for s in lote)   # Lo que tarda el más lento del lote
+        if self.raiz is not None:
+            try:
+                duracion += self._servir(archivo, lote)
+            except OSError as e:
+                # La solicitud fallida se archiva como atendida en el instante actual y sin bytes
+                for solicitud in lote:
+                    solicitud.inicio_ms = solicitud.fin_ms = self.reloj_ms
+                self._medir(lote, 0)
+                self._archivar(lote)
+                return f" No se pudo acceder a {archivo}: {e}"
+        for solicitud in lote:
+            solicitud.inicio_ms = self.reloj_ms
+            solicitud.fin_ms = self.reloj_ms + duracion
+        self._medir(lote, duracion)
+        self.reloj_ms += duracion   # Las lecturas del lote ocurren a la vez
+        self.turnos += 1
+        self._archivar(lote)
+        if len(lote) == 1:
+            return f" Atendiendo solicitud: {lote[0]}"
+        return (f" Atendiendo {len(lote)} lecturas simultáneas de {archivo}: "
+                + ", ".join(s.usuario for s in lote))
+
+    def reproducir(self, solicitudes):
+        # Recibe pares (solicitud, llegada_ms) en orden de llegada y atiende a medida que
+        # los lee: antes de cada llegada se conceden los turnos que empiezan antes de ella
+        # y, si no queda nada pendiente, el reloj salta a la llegada. Devuelve el resumen.
+        for solicitud, llegada_ms in solicitudes:
+            while self.solicitudes and self.reloj_ms < llegada_ms:
+                self.atender_solicitud()
+            self.reloj_ms = max(self.reloj_ms, llegada_ms)
+            self.registrar_solicitud(solicitud, llegada_ms)
+        while self.solicitudes:
+            self.atender_solicitud()
+        return self.resumen()
+
+    def resumen(self):
+        # Solicitudes atendidas por segundo simulado, tamaño medio de los lotes y esperas
+        atendidas = self.historial.total
+        metricas = self.metricas.resumen()
+        return {
+            "atendidas": atendidas,
+            "turnos": self.turnos,
+            "reloj_ms": self.reloj_ms,
+            "solicitudes_por_turno": atendidas / self.turnos if self.turnos else 0.0,
+            "throughput_por_s": atendidas * 1000.0 / self.reloj_ms if self.reloj_ms else 0.0,
+            "bytes_servidos": self.bytes_servidos,
+            "io_ms": self.io_ms,
+            "tasa_aciertos_cache": self.cache.tasa_aciertos(),
+            "espera_media_ms": metricas["espera_media"],
+            "espera_p50_ms": metricas["espera_p50"],
+            "espera_p95_ms": metricas["espera_p95"],
+            "espera_p99_ms": metricas["espera_p99"],
+            "utilizacion": metricas["utilizacion"],
+            "cola_media": metricas["cola_media"],
+            "cola_maxima": metricas["cola_maxima"],
+        }
 
     def ver_solicitud_actual(self):
-        # Muestra la solicitud que está siendo atendida actualmente (primera en la cola)
-        if self.cola_solicitudes:
-            return f" Solicitud en proceso: {self.cola_solicitudes[0]}"
+        # Muestra la solicitud que está siendo atendida actualmente (la del archivo en turno)
+        archivo = self._archivo_en_turno()
+        if archivo is not None:
+            return f" Solicitud en proceso: {next(iter(self.colas[archivo].values()))}"
         else:
             return " No hay solicitudes en proceso."
 
-    def ver_solicitudes_pendientes(self):
-        # Devuelve la lista de solicitudes pendientes en la cola
-        if self.cola_solicitudes:
-            return [str(s) for s in self.cola_solicitudes]
-        else:
-            return [" No hay solicitudes pendientes."]
+    def ver_solicitudes_pendientes(self, desde=0, limite=None, filtro=None, recientes=False):
+        # Genera las solicitudes pendientes en orden de llegada. desde/limite eligen una
+        # página, filtro(solicitud) las selecciona y recientes empieza por la última.
+        return ver_elementos(self._pendientes_en_orden(), " No hay solicitudes pendientes.",
+                             desde, limite, filtro, recientes, formato=lambda s: f"ID: {s.id_solicitud} | {s}")
 
-    def ver_historial(self):
-        # Devuelve el historial de solicitudes ya atendidas
-        if self.historial:
-            return [str(s) for s in self.historial]
-        else:
-            return [" Historial vacío."]
+    def ver_historial(self, desde=0, limite=None, filtro=None, recientes=False):
+        # Genera el historial de solicitudes ya atendidas (con recientes=True, del último al primero)
+        return ver_elementos(self.historial, " Historial vacío.", desde, limite, filtro, recientes)
+
+def _solicitudes_de_traza(ruta):
+    # Convierte cada registro de la traza en (solicitud, llegada_ms)
+    for registro in leer_traza(ruta):
+        solicitud = SolicitudAcceso(campo_traza(registro, "usuario", defecto=""),
+                                    campo_traza(registro, "archivo", defecto=""),
+                                    campo_traza(registro, "tipo", defecto=LECTURA))
+        solicitud.duracion_ms = campo_traza(registro, "duracion", float)
+        yield solicitud, campo_traza(registro, "llegada", float, 0.0)
+
+
+def reproducir_traza(ruta, lecturas_compartidas=True, retencion=1000):
+    # Reproduce una traza JSONL o CSV con una solicitud por registro: llegada (ms), usuario,
+    # archivo, tipo (lectura o escritura) y, opcional, duracion (ms). Se lee de a una línea
+    # y el historial conserva solo las últimas solicitudes.
+    servidor = ServidorArchivos(lecturas_compartidas, historial=Historial(retencion))
+    return servidor.reproducir(_solicitudes_de_traza(ruta))
+
+
+def simular_carga(cantidad, tasa, lecturas_compartidas=True, perfil="poisson", servicio=None, archivos=10,
+                  escrituras=0.2, semilla=None, retencion=1000, **parametros):
+    # Somete al servidor a una carga sintética de GeneradorCarga: cantidad solicitudes a
+    # tasa solicitudes por milisegundo sobre archivos al azar, con esa proporción de
+    # escrituras. Sin modelo de servicio, cada acceso dura lo configurado en el servidor.
+    generador = GeneradorCarga(tasa, perfil, servicio, semilla, **parametros)
+    azar = random.Random(semilla)
+
+    def crear(i, duracion):
+        tipo = ESCRITURA if azar.random() < escrituras else LECTURA
+        solicitud = SolicitudAcceso(f"usuario{i % 50 + 1}", f"archivo{azar.randrange(archivos) + 1}.txt", tipo)
+        solicitud.duracion_ms = duracion
+        return solicitud
+
+    servidor = ServidorArchivos(lecturas_compartidas, historial=Historial(retencion))
+    return servidor.reproducir((solicitud, llegada) for llegada, solicitud in generador.llegadas(cantidad, crear))
 
 # =============================
 # INTERFAZ DE CONSOLA
@@ -83,7 +422,10 @@ def mostrar_menu():
     print("3. Atender siguiente solicitud")
     print("4. Ver solicitudes pendientes")
     print("5. Ver historial de accesos atendidos")
-    print("6. Salir")
+    print("6. Ver estadísticas de atención")
+    print("7. Cancelar una solicitud")
+    print("8. Buscar solicitudes por usuario o archivo")
+    print("9. Salir")
 
 def solicitar_datos():
     # Solicita los datos necesarios para registrar una solicitud de acceso
@@ -93,7 +435,8 @@ def solicitar_datos():
         if not usuario or not archivo:
             print(" Los campos no pueden estar vacíos.")
             return None
-        return SolicitudAcceso(usuario, archivo)
+        tipo = input("Tipo de acceso (1. Lectura, 2. Escritura, Enter = Lectura): ").strip()
+        return SolicitudAcceso(usuario, archivo, ESCRITURA if tipo == '2' else LECTURA)
     except Exception as e:
         print(f" Error inesperado: {e}")
         return None
@@ -104,10 +447,16 @@ def solicitar_datos():
 
 def main():
     # Función principal que ejecuta el simulador del servidor de archivos
-    servidor = ServidorArchivos()
+    raiz = input("Carpeta con los archivos a servir (Enter = solo simulación): ").strip()
+    if raiz and not os.path.isdir(raiz):
+        print(" La carpeta no existe; se usará solo la simulación.")
+        raiz = None
+    # Con la variable de entorno COLAS_DATOS las solicitudes sobreviven a un reinicio
+    persistencia = abrir_persistencia("servidor_archivos", SolicitudAcceso, CAMPOS_SOLICITUD)
+    servidor = ServidorArchivos(raiz=raiz or None, persistencia=persistencia)
     while True:
         mostrar_menu()
-        opcion = input("Seleccione una opción (1-6): ").strip()
+        opcion = input("Seleccione una opción (1-9): ").strip()
 
         if opcion == '1':
             # Registrar una nueva solicitud de acceso
@@ -136,8 +485,32 @@ def main():
                 print(f"- {solicitud}")
 
         elif opcion == '6':
+            # Mostrar cuántas solicitudes se atienden por turno y por segundo simulado
+            print("\n Estadísticas de atención:")
+            for clave, valor in servidor.resumen().items():
+                print(f"- {clave}: {valor}")
+
+        elif opcion == '7':
+            # Cancelar una solicitud pendiente por su ID
+            try:
+                print(servidor.cancelar_solicitud(int(input("ID de la solicitud: ").strip())))
+            except ValueError:
+                print(" El ID debe ser un número entero.")
+
+        elif opcion == '8':
+            # Consultar los índices por usuario y por archivo
+            nombre = input("Usuario o archivo a buscar: ").strip()
+            encontradas = servidor.pendientes_de_usuario(nombre) or servidor.pendientes_de_archivo(nombre)
+            if not encontradas:
+                print(" No hay solicitudes pendientes para ese usuario o archivo.")
+            for solicitud in encontradas:
+                print(f"- ID: {solicitud.id_solicitud} | {solicitud}")
+
+        elif opcion == '9':
             # Salir del simulador
             print("\n Cerrando el servidor de archivos. ¡Hasta pronto!")
+            if persistencia is not None:
+                persistencia.cerrar()
             break
 
         else:
@@ -148,4 +521,9 @@ def main():
 # =============================
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1:
+        # Modo sin menú: python Ejercicio5.py traza.jsonl
+        for clave, valor in reproducir_traza(sys.argv[1]).items():
+            print(f"- {clave}: {valor}")
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,317 @@
+'''Generador de carga sintética para los simuladores. Produce, por bloques, los instantes
+de llegada y los tiempos de servicio de millones de elementos según un perfil de
+llegadas (Poisson, Pareto, ráfagas MMPP o ciclo diario), siempre a partir de una
+semilla, para poder estresar cada ejercicio sin que nadie tenga que escribir en la
+consola. Usa NumPy si está instalado y, si no, el módulo random: es más lento pero
+genera la misma carga en sentido estadístico.'''
+
+import math
+import random
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+# Formas de generar las llegadas
+PERFILES = {
+    "poisson": "Llegadas independientes: tiempos entre llegadas exponenciales",
+    "pareto": "Tiempos entre llegadas de cola pesada (Pareto): huecos largos y grupos apretados",
+    "rafagas": "Poisson modulado (MMPP) que alterna períodos de calma y de ráfaga",
+    "diurno": "La tasa sigue el ciclo del día (curva coseno o un peso por franja horaria)",
+}
+# Distribuciones disponibles para los tiempos de servicio
+DISTRIBUCIONES = {
+    "constante": "(valor,)",
+    "uniforme": "(minimo, maximo)",
+    "exponencial": "(media,)",
+    "pareto": "(media, alfa)",
+}
+
+# =============================
+# GENERADOR
+# =============================
+
+class GeneradorCarga:
+    # tasa es la cantidad media de llegadas por unidad de tiempo del ejercicio (segundos o
+    # milisegundos) y se respeta en todos los perfiles. servicio es una tupla con la
+    # distribución y sus parámetros, por ejemplo ("exponencial", 12) o ("uniforme", 7, 20);
+    # con None no se generan duraciones y cada ejercicio usa su propio modelo.
+    # Parámetros de cada perfil:
+    #   pareto:  alfa (forma, mayor que 1; cuanto más cerca de 1, más pesada la cola)
+    #   rafagas: factor (cuántas veces más rápido se llega en ráfaga), duracion_rafaga y
+    #            duracion_calma (duración media de cada fase, en unidades de tiempo)
+    #   diurno:  periodo (largo del día), amplitud (de 0 a 1) y pico (fracción del día con
+    #            más llegadas), o curva (peso relativo de cada franja, por ejemplo 24 horas)
+    # La misma semilla repite la carga mientras no cambie el motor (NumPy o random).
+    def __init__(self, tasa, perfil="poisson", servicio=None, semilla=None, bloque=65536,
+                 usar_numpy=None, **parametros):
+        if tasa <= 0:
+            raise ValueError("La tasa de llegadas debe ser positiva.")
+        if perfil not in PERFILES:
+            raise ValueError(f"Perfil de llegadas desconocido: {perfil}")
+        if servicio is not None and servicio[0] not in DISTRIBUCIONES:
+            raise ValueError(f"Distribución de servicio desconocida: {servicio[0]}")
+        if usar_numpy is None:
+            usar_numpy = np is not None
+        elif usar_numpy and np is None:
+            raise ImportError("NumPy no está instalado.")
+        self.tasa = tasa
+        self.perfil = perfil
+        self.servicio = servicio
+        self.bloque = bloque
+        self.usar_numpy = usar_numpy
+        self.azar = np.random.default_rng(semilla) if usar_numpy else random.Random(semilla)
+        self.reloj = 0.0      # Instante de la última llegada generada
+        self.generados = 0
+        self._preparar(parametros)
+
+    def _preparar(self, parametros):
+        # Valida los parámetros del perfil y precalcula lo que usa en cada bloque
+        perfil = self.perfil
+        if perfil == "pareto":
+            self.alfa = parametros.pop("alfa", 1.5)
+            if self.alfa <= 1:
+                raise ValueError("Con alfa <= 1 la media de Pareto es infinita.")
+            self.escala = (self.alfa - 1) / (self.alfa * self.tasa)  # Mínimo entre llegadas
+        elif perfil == "rafagas":
+            self.factor = parametros.pop("factor", 5.0)
+            self.duraciones = (parametros.pop("duracion_calma", 200.0 / self.tasa),
+                               parametros.pop("duracion_rafaga", 50.0 / self.tasa))
+            calma, rafaga = self.duraciones
+            fraccion = rafaga / (calma + rafaga)
+            base = self.tasa / (fraccion * self.factor + 1 - fraccion)
+            self.tasas = (base, base * self.factor)  # Tasa en calma y en ráfaga
+            self.fase = 0                            # 0 = calma, 1 = ráfaga
+            self.fin_fase = self._duracion_fase(0)
+        elif perfil == "diurno":
+            self.periodo = parametros.pop("periodo", 86400.0)
+            curva = parametros.pop("curva", None)
+            if curva is not None:
+                media = sum(curva) / len(curva)
+                self.curva = [peso / media for peso in curva]
+                self.peso_maximo = max(self.curva)
+            else:
+                self.curva = None
+                self.amplitud = parametros.pop("amplitud", 0.8)
+                self.pico = parametros.pop("pico", 0.5)
+                if not 0 <= self.amplitud <= 1:
+                    raise ValueError("La amplitud del ciclo diario va de 0 a 1.")
+                self.peso_maximo = 1 + self.amplitud
+        if parametros:
+            raise TypeError(f"Parámetros que el perfil {perfil} no usa: {', '.join(parametros)}")
+
+    # -----------------------------
+    # Llegadas
+    # -----------------------------
+
+    def instantes(self, n):
+        # Instantes de las próximas n llegadas (siguen desde la última generada)
+        if n <= 0:
+            return self._vector([])
+        if self.usar_numpy:
+            tiempos = getattr(self, f"_instantes_{self.perfil}_numpy")(n)
+        else:
+            tiempos = getattr(self, f"_instantes_{self.perfil}")(n)
+        self.reloj = float(tiempos[-1])
+        self.generados += n
+        return tiempos
+
+    def entre_llegadas(self, n):
+        # Tiempos entre las próximas n llegadas consecutivas
+        anterior = self.reloj
+        tiempos = self.instantes(n)
+        if self.usar_numpy:
+            return np.diff(tiempos, prepend=anterior)
+        huecos = array("d", tiempos)
+        for i in range(len(huecos) - 1, 0, -1):
+            huecos[i] -= huecos[i - 1]
+        if huecos:
+            huecos[0] -= anterior
+        return huecos
+
+    def _vector(self, valores):
+        return np.asarray(valores, dtype=float) if self.usar_numpy else array("d", valores)
+
+    def _instantes_poisson(self, n):
+        azar, tasa, t = self.azar, self.tasa, self.reloj
+        tiempos = array("d", bytes(8 * n))
+        for i in range(n):
+            t += azar.expovariate(tasa)
+            tiempos[i] = t
+        return tiempos
+
+    def _instantes_poisson_numpy(self, n):
+        return self.reloj + np.cumsum(self.azar.exponential(1.0 / self.tasa, n))
+
+    def _instantes_pareto(self, n):
+        azar, alfa, escala, t = self.azar, self.alfa, self.escala, self.reloj
+        tiempos = array("d", bytes(8 * n))
+        for i in range(n):
+            t += escala * azar.paretovariate(alfa)
+            tiempos[i] = t
+        return tiempos
+
+    def _instantes_pareto_numpy(self, n):
+        # numpy.pareto es la Pareto desplazada (Lomax): se le suma 1 para que empiece en la escala
+        return self.reloj + np.cumsum((self.azar.pareto(self.alfa, n) + 1.0) * self.escala)
+
+    def _duracion_fase(self, fase):
+        media = self.duraciones[fase]
+        if self.usar_numpy:
+            return self.reloj + self.azar.exponential(media)
+        return self.reloj + self.azar.expovariate(1.0 / media)
+
+    def _instantes_rafagas(self, n):
+        # Entre llegadas exponenciales con la tasa de la fase; al cruzar el fin de la fase
+        # se descarta el sorteo (sin memoria) y se sigue con la tasa de la fase siguiente
+        azar, t = self.azar, self.reloj
+        tiempos = array("d", bytes(8 * n))
+        i = 0
+        while i < n:
+            siguiente = t + azar.expovariate(self.tasas[self.fase])
+            if siguiente > self.fin_fase:
+                t = self.fin_fase
+                self.fase = 1 - self.fase
+                self.fin_fase = t + azar.expovariate(1.0 / self.duraciones[self.fase])
+                continue
+            t = tiempos[i] = siguiente
+            i += 1
+        return tiempos
+
+    def _instantes_rafagas_numpy(self, n):
+        # Se sortean primero las fases y luego cuántas llegadas caen en cada una (Poisson)
+        # y dónde (uniformes dentro de la fase); al ordenar quedan los instantes de llegada
+        azar = self.azar
+        por_ciclo = sum(t * d for t, d in zip(self.tasas, self.duraciones))
+        partes = []
+        faltan = n
+        while faltan > 0:
+            ciclos = int(faltan / por_ciclo) + 2
+            fases = (self.fase + np.arange(2 * ciclos)) % 2
+            duraciones = azar.exponential(np.take(self.duraciones, fases))
+            duraciones[0] = self.fin_fase - self.reloj  # Lo que queda de la fase en curso
+            finales = self.reloj + np.cumsum(duraciones)
+            inicios = finales - duraciones
+            cantidades = azar.poisson(np.take(self.tasas, fases) * duraciones)
+            tiempos = np.repeat(inicios, cantidades) + azar.random(cantidades.sum()) * np.repeat(duraciones, cantidades)
+            tiempos.sort()
+            if len(tiempos) >= faltan:
+                tiempos = tiempos[:faltan]
+                ultima = int(np.searchsorted(finales, tiempos[-1]))
+            else:
+                ultima = len(fases) - 1
+            self.fase = int(fases[ultima])
+            self.fin_fase = float(finales[ultima])
+            if len(tiempos):
+                self.reloj = float(tiempos[-1])
+            if len(tiempos) < faltan:
+                # Se pasa a la fase siguiente sin llegadas en lo que quedaba de la última
+                self.reloj = self.fin_fase
+                self.fase = 1 - self.fase
+                self.fin_fase = self._duracion_fase(self.fase)
+            partes.append(tiempos)
+            faltan -= len(tiempos)
+        return np.concatenate(partes)
+
+    def _peso(self, t):
+        # Multiplicador de la tasa en el instante t (su promedio en un día es 1)
+        fraccion = (t % self.periodo) / self.periodo
+        if self.curva is not None:
+            return self.curva[min(int(fraccion * len(self.curva)), len(self.curva) - 1)]
+        return 1 + self.amplitud * math.cos(2 * math.pi * (fraccion - self.pico))
+
+    def _peso_numpy(self, t):
+        fraccion = (t % self.periodo) / self.periodo
+        if self.curva is not None:
+            franjas = np.minimum((fraccion * len(self.curva)).astype(int), len(self.curva) - 1)
+            return np.take(self.curva, franjas)
+        return 1 + self.amplitud * np.cos(2 * np.pi * (fraccion - self.pico))
+
+    def _instantes_diurno(self, n):
+        # Poisson no homogéneo por descarte: candidatos a la tasa máxima, cada uno aceptado
+        # con probabilidad peso(t) / peso máximo
+        azar, t = self.azar, self.reloj
+        tasa_maxima = self.tasa * self.peso_maximo
+        tiempos = array("d", bytes(8 * n))
+        i = 0
+        while i < n:
+            t += azar.expovariate(tasa_maxima)
+            if azar.random() * self.peso_maximo < self._peso(t):
+                tiempos[i] = t
+                i += 1
+        return tiempos
+
+    def _instantes_diurno_numpy(self, n):
+        azar = self.azar
+        tasa_maxima = self.tasa * self.peso_maximo
+        partes = []
+        faltan = n
+        while faltan > 0:
+            candidatos = self.reloj + np.cumsum(azar.exponential(1.0 / tasa_maxima, int(faltan * self.peso_maximo) + 16))
+            aceptados = candidatos[azar.random(len(candidatos)) * self.peso_maximo < self._peso_numpy(candidatos)]
+            if len(aceptados) >= faltan:
+                aceptados = aceptados[:faltan]
+                self.reloj = float(aceptados[-1])
+            else:
+                self.reloj = float(candidatos[-1])
+            partes.append(aceptados)
+            faltan -= len(aceptados)
+        return np.concatenate(partes)
+
+    # -----------------------------
+    # Servicio
+    # -----------------------------
+
+    def servicios(self, n):
+        # Tiempos de servicio de n elementos según el modelo indicado
+        if self.servicio is None:
+            raise ValueError("El generador no tiene un modelo de servicio.")
+        distribucion, *parametros = self.servicio
+        azar = self.azar
+        if self.usar_numpy:
+            if distribucion == "constante":
+                return np.full(n, float(parametros[0]))
+            if distribucion == "uniforme":
+                return azar.uniform(parametros[0], parametros[1], n)
+            if distribucion == "exponencial":
+                return azar.exponential(parametros[0], n)
+            media, alfa = parametros
+            return (azar.pareto(alfa, n) + 1.0) * media * (alfa - 1) / alfa
+        if distribucion == "constante":
+            return array("d", [parametros[0]]) * n
+        if distribucion == "uniforme":
+            minimo, maximo = parametros
+            return array("d", [azar.uniform(minimo, maximo) for _ in range(n)])
+        if distribucion == "exponencial":
+            tasa = 1.0 / parametros[0]
+            return array("d", [azar.expovariate(tasa) for _ in range(n)])
+        media, alfa = parametros
+        escala = media * (alfa - 1) / alfa
+        return array("d", [escala * azar.paretovariate(alfa) for _ in range(n)])
+
+    # -----------------------------
+    # Alimentación de los simuladores
+    # -----------------------------
+
+    def bloques(self, n):
+        # Genera n llegadas en bloques de (instantes, duraciones) como listas de Python;
+        # duraciones es None sin modelo de servicio. La memoria depende del bloque, no de n.
+        while n > 0:
+            cantidad = min(n, self.bloque)
+            instantes = self.instantes(cantidad).tolist()
+            duraciones = self.servicios(cantidad).tolist() if self.servicio is not None else None
+            yield instantes, duraciones
+            n -= cantidad
+
+    def llegadas(self, n, crear):
+        # Pares (instante, elemento) listos para SimuladorColas.cargar o simular_call_center.
+        # crear(i, duracion) arma el elemento número i (duracion es None sin servicio).
+        i = 0
+        for instantes, duraciones in self.bloques(n):
+            if duraciones is None:
+                duraciones = [None] * len(instantes)
+            for instante, duracion in zip(instantes, duraciones):
+                yield instante, crear(i, duracion)
+                i += 1
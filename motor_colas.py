@@ -0,0 +1,685 @@
+'''Motor de colas compartido por los cinco ejercicios. Reúne lo que cada simulador
+repetía por su cuenta: el reloj virtual con su heap de eventos, las colas (FIFO o
+por prioridad con heap), los modelos de tiempo de servicio, el historial de
+elementos atendidos y un simulador genérico de una cola con varios servidores.
+Así una mejora hecha aquí (motor de eventos, almacenamiento, métricas) llega a
+todos los ejercicios a la vez.'''
+
+import bisect
+import csv
+import functools
+import heapq
+import itertools
+import json
+import math
+import random
+import sys
+import time
+from array import array
+from collections import deque
+
+# =============================
+# MOTOR DE EVENTOS
+# =============================
+
+class MotorEventos:
+    # Motor de eventos discretos: un reloj virtual y un heap de eventos ordenados por tiempo
+    LLEGADA = 0
+    FIN = 1
+
+    def __init__(self):
+        self.reloj = 0           # Tiempo simulado actual (la unidad la decide cada ejercicio)
+        self.eventos = []        # Heap de (tiempo, tipo, secuencia, dato)
+        self.secuencia = 0       # Desempata eventos simultáneos respetando el orden de llegada
+
+    def programar(self, tiempo, tipo, dato):
+        # Agenda un evento en el instante simulado indicado
+        heapq.heappush(self.eventos, (tiempo, tipo, self.secuencia, dato))
+        self.secuencia += 1
+
+    def siguiente(self):
+        # Extrae el próximo evento y avanza el reloj hasta su instante (sin esperar)
+        tiempo, tipo, _, dato = heapq.heappop(self.eventos)
+        self.reloj = tiempo
+        return tipo, dato
+
+    def vencidos(self, hasta):
+        # Extrae, sin mover el reloj, los eventos programados hasta el instante indicado
+        while self.eventos and self.eventos[0][0] <= hasta:
+            tiempo, tipo, _, dato = heapq.heappop(self.eventos)
+            yield tiempo, tipo, dato
+
+    def proximo_tiempo(self):
+        # Instante del próximo evento, o None si no hay eventos pendientes
+        return self.eventos[0][0] if self.eventos else None
+
+    def __len__(self):
+        return len(self.eventos)
+
+# =============================
+# COLAS
+# =============================
+
+class ColaFIFO:
+    # Atiende en orden de llegada
+    nombre = "FIFO"
+
+    def __init__(self):
+        self.cola = deque()
+
+    def agregar(self, elemento, ahora=None):
+        self.cola.append(elemento)
+
+    def reencolar(self, elemento):
+        # Devuelve a la cola un elemento cuya atención quedó a medias
+        self.agregar(elemento)
+
+    def siguiente(self):
+        return self.cola.popleft()
+
+    def robar(self):
+        # Otro servidor se lleva el elemento del final, el que más tardaría en atenderse aquí
+        return self.cola.pop()
+
+    def primero(self):
+        return self.cola[0]
+
+    def __len__(self):
+        return len(self.cola)
+
+    def __iter__(self):
+        return iter(self.cola)
+
+
+class ColaHeap:
+    # Atiende primero al elemento con menor clave (heap: O(log n) al agregar y al sacar).
+    # La clave se define en una subclase o se pasa como función clave(elemento, ahora).
+    nombre = "Heap"
+
+    def __init__(self, clave=None):
+        self.heap = []         # Heap de (clave, secuencia, elemento)
+        self.secuencia = 0     # Respeta el orden de llegada entre claves iguales
+        if clave is not None:
+            self.clave = clave
+
+    def clave(self, elemento, ahora):
+        raise NotImplementedError
+
+    def agregar(self, elemento, ahora=None):
+        heapq.heappush(self.heap, (self.clave(elemento, ahora), self.secuencia, elemento))
+        self.secuencia += 1
+
+    def reencolar(self, elemento):
+        self.agregar(elemento)
+
+    def siguiente(self):
+        return heapq.heappop(self.heap)[2]
+
+    def robar(self):
+        # En un heap solo el mínimo sale en O(log n); el ladrón se lleva ese
+        return self.siguiente()
+
+    def primero(self):
+        return self.heap[0][2]
+
+    def primeros(self, cantidad):
+        # Los próximos elementos a atender sin ordenar todo el heap: O(n log cantidad)
+        return [entrada[2] for entrada in heapq.nsmallest(cantidad, self.heap, key=lambda e: e[:2])]
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __iter__(self):
+        # Recorre los elementos en el orden en que serían atendidos
+        return (entrada[2] for entrada in sorted(self.heap, key=lambda e: e[:2]))
+
+# =============================
+# MODELOS DE TIEMPO DE SERVICIO
+# =============================
+
+class TiempoConstante:
+    # Todos los elementos tardan lo mismo
+    def __init__(self, valor):
+        self.valor = valor
+
+    def __call__(self, elemento, azar):
+        return self.valor
+
+
+class TiempoUniforme:
+    # Duración al azar entre un mínimo y un máximo (enteros, como random.randint)
+    def __init__(self, minimo, maximo, enteros=True):
+        self.minimo = minimo
+        self.maximo = maximo
+        self.enteros = enteros
+
+    def __call__(self, elemento, azar):
+        if self.enteros:
+            return azar.randint(self.minimo, self.maximo)
+        return azar.uniform(self.minimo, self.maximo)
+
+
+class TiempoSegunElemento:
+    # La duración sale del propio elemento, por ejemplo lambda p: p.duracion_ms
+    def __init__(self, funcion):
+        self.funcion = funcion
+
+    def __call__(self, elemento, azar):
+        return self.funcion(elemento)
+
+
+class TiempoRegistrado:
+    # Usa la duración guardada en el elemento (por ejemplo, la que trae una traza) y, si no
+    # la tiene, la del modelo de respaldo
+    def __init__(self, atributo, respaldo):
+        self.atributo = atributo
+        self.respaldo = respaldo
+
+    def __call__(self, elemento, azar):
+        duracion = getattr(elemento, self.atributo)
+        return duracion if duracion is not None else self.respaldo(elemento, azar)
+
+
+class TiempoPorTipo:
+    # Un modelo de tiempo distinto según un atributo del elemento (por ejemplo, el servicio)
+    def __init__(self, atributo, modelos):
+        self.atributo = atributo
+        self.modelos = modelos
+
+    def __call__(self, elemento, azar):
+        return self.modelos[getattr(elemento, self.atributo)](elemento, azar)
+
+# =============================
+# REGISTROS COMPACTOS
+# =============================
+
+def marca_actual():
+    # Marca de tiempo compacta: segundos desde la época como float, en vez de un datetime
+    return time.time()
+
+
+@functools.lru_cache(maxsize=4096)
+def _hora_en_texto(segundo, formato):
+    return time.strftime(formato, time.localtime(segundo))
+
+
+def formatear_hora(marca, formato='%H:%M:%S'):
+    # Texto de una marca de tiempo (None queda como texto vacío). Los formatos no muestran
+    # fracciones de segundo, así que el texto se calcula una vez por segundo y se reutiliza
+    # para todos los elementos registrados en ese segundo.
+    return _hora_en_texto(int(marca), formato) if marca is not None else ""
+
+
+def internar(texto):
+    # Los nombres de usuario, servicio o archivo se repiten mucho: se guarda una sola copia
+    return sys.intern(texto) if type(texto) is str else texto
+
+
+# =============================
+# HISTORIAL
+# =============================
+
+class Historial:
+    # Elementos ya atendidos, en el orden en que terminaron. Con retencion solo se
+    # conservan los últimos elementos (anillo), así la memoria no crece en corridas largas;
+    # total cuenta todos los que pasaron, también los ya descartados.
+    def __init__(self, retencion=None):
+        self.retencion = retencion
+        self.elementos = deque(maxlen=retencion) if retencion is not None else []
+        self.total = 0
+
+    def append(self, elemento):
+        self.elementos.append(elemento)
+        self.total += 1
+
+    def extend(self, elementos):
+        for elemento in elementos:
+            self.append(elemento)
+
+    def __len__(self):
+        return len(self.elementos)
+
+    def __iter__(self):
+        return iter(self.elementos)
+
+    def __reversed__(self):
+        return reversed(self.elementos)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice) and self.retencion is not None:
+            return [self.elementos[i] for i in range(*indice.indices(len(self.elementos)))]
+        return self.elementos[indice]
+
+
+class HistorialColumnar:
+    # Historial guardado por columnas en arrays: cada campo numérico ocupa 8 bytes por
+    # elemento y los textos se guardan una vez en una tabla y se referencian por número.
+    # campos es un dict nombre -> tipo: 'f' (float, admite None), 'i' (entero) o 'texto'
+    # (admite None). Al leer se reconstruye un objeto de la clase tipo con esos campos.
+    # Con retencion las columnas funcionan como un anillo de tamaño fijo y cada texto lleva
+    # la cuenta de cuántos elementos lo usan: cuando se pisa el último, su lugar en la tabla
+    # se libera y se reutiliza, así la memoria no crece con ids o nombres siempre distintos.
+    def __init__(self, tipo, campos, retencion=None):
+        self.tipo = tipo
+        self.campos = campos
+        self.retencion = retencion
+        self.columnas = {nombre: array('q' if clase == 'i' else 'd') for nombre, clase in campos.items()}
+        self.textos = []          # Tabla de textos distintos
+        self.codigos = {}         # texto -> posición en la tabla
+        self.usos = []            # Elementos retenidos que usan cada texto (solo con retención)
+        self.libres = []          # Posiciones de la tabla que quedaron sin uso
+        self.inicio = 0           # Posición del elemento más antiguo dentro del anillo
+        self.total = 0
+
+    def _codificar(self, clase, valor):
+        if clase == 'f':
+            return math.nan if valor is None else valor
+        if clase == 'i':
+            return valor
+        if valor is None:
+            return -1
+        codigo = self.codigos.get(valor)
+        if codigo is None:
+            if self.libres:
+                codigo = self.libres.pop()
+                self.textos[codigo] = valor
+            else:
+                codigo = len(self.textos)
+                self.textos.append(valor)
+                if self.retencion is not None:
+                    self.usos.append(0)
+            self.codigos[valor] = codigo
+        if self.retencion is not None:
+            self.usos[codigo] += 1
+        return codigo
+
+    def _soltar(self, codigo):
+        # Un elemento que sale del anillo deja de usar su texto
+        if codigo < 0:
+            return
+        codigo = int(codigo)
+        self.usos[codigo] -= 1
+        if not self.usos[codigo]:
+            del self.codigos[self.textos[codigo]]
+            self.textos[codigo] = None
+            self.libres.append(codigo)
+
+    def _decodificar(self, clase, valor):
+        if clase == 'f':
+            return None if math.isnan(valor) else valor
+        if clase == 'i':
+            return valor
+        return None if valor < 0 else self.textos[int(valor)]
+
+    def append(self, elemento):
+        lleno = self.retencion is not None and self.total >= self.retencion
+        for nombre, clase in self.campos.items():
+            valor = self._codificar(clase, getattr(elemento, nombre))
+            if lleno:
+                if clase == 'texto':
+                    self._soltar(self.columnas[nombre][self.inicio])
+                self.columnas[nombre][self.inicio] = valor
+            else:
+                self.columnas[nombre].append(valor)
+        if lleno:
+            self.inicio = (self.inicio + 1) % self.retencion
+        self.total += 1
+
+    def extend(self, elementos):
+        for elemento in elementos:
+            self.append(elemento)
+
+    def _leer(self, posicion):
+        registro = self.tipo.__new__(self.tipo)
+        for nombre, clase in self.campos.items():
+            setattr(registro, nombre, self._decodificar(clase, self.columnas[nombre][posicion]))
+        return registro
+
+    def __len__(self):
+        return self.total if self.retencion is None else min(self.total, self.retencion)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __reversed__(self):
+        return (self[i] for i in range(len(self) - 1, -1, -1))
+
+    def __getitem__(self, indice):
+        cantidad = len(self)
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(cantidad))]
+        if indice < 0:
+            indice += cantidad
+        if not 0 <= indice < cantidad:
+            raise IndexError("Índice fuera del historial.")
+        if self.retencion is not None:
+            indice = (self.inicio + indice) % self.retencion
+        return self._leer(indice)
+
+
+def pagina(elementos, desde=0, limite=None, filtro=None, recientes=False):
+    # Recorre de forma perezosa una página de elementos: salta "desde", entrega como mucho
+    # "limite" y solo los que cumplen el filtro. Con recientes=True empieza por el final.
+    # Sin filtro y con acceso por índice (listas, deques, historiales) cuesta O(limite),
+    # sin importar cuántos elementos haya.
+    if filtro is None and hasattr(elementos, "__getitem__") and hasattr(elementos, "__len__"):
+        total = len(elementos)
+        fin = total if limite is None else min(total, desde + limite)
+        if recientes:
+            return (elementos[total - 1 - i] for i in range(desde, fin))
+        return (elementos[i] for i in range(desde, fin))
+    if filtro is None and limite is not None and not recientes and hasattr(elementos, "primeros"):
+        return iter(elementos.primeros(desde + limite)[desde:])
+    if recientes:
+        elementos = reversed(elementos) if hasattr(elementos, "__reversed__") else reversed(list(elementos))
+    if filtro is not None:
+        elementos = filter(filtro, elementos)
+    return itertools.islice(elementos, desde, None if limite is None else desde + limite)
+
+
+def ver_elementos(elementos, vacio, desde=0, limite=None, filtro=None, recientes=False, formato=str):
+    # Patrón común de los ver_*: genera el texto de cada elemento de la página pedida, o
+    # un aviso si no hay ninguno
+    vacia = True
+    for elemento in pagina(elementos, desde, limite, filtro, recientes):
+        vacia = False
+        yield formato(elemento)
+    if vacia:
+        yield vacio
+
+# =============================
+# MÉTRICAS
+# =============================
+
+class CuantilP2:
+    # Estimación de un cuantil sobre un flujo de datos con el algoritmo P² (Jain y Chlamtac):
+    # guarda solo cinco marcadores, así que usa memoria constante y O(1) por dato
+    def __init__(self, p):
+        self.p = p
+        self.alturas = []                                  # Valores de los marcadores
+        self.posiciones = [1, 2, 3, 4, 5]                  # Posición real de cada marcador
+        self.deseadas = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.incrementos = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def agregar(self, valor):
+        q = self.alturas
+        if len(q) < 5:
+            bisect.insort(q, valor)
+            return
+        if valor < q[0]:
+            q[0] = valor
+            k = 0
+        elif valor >= q[4]:
+            q[4] = valor
+            k = 3
+        else:
+            k = bisect.bisect_right(q, valor) - 1
+        n = self.posiciones
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.deseadas[i] += self.incrementos[i]
+        for i in (1, 2, 3):
+            d = self.deseadas[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                # Ajuste parabólico; si se sale de los vecinos, ajuste lineal
+                nuevo = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if not q[i - 1] < nuevo < q[i + 1]:
+                    nuevo = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = nuevo
+                n[i] += d
+
+    def valor(self):
+        q = self.alturas
+        if not q:
+            return None
+        if len(q) < 5:
+            return q[round(self.p * (len(q) - 1))]
+        return q[2]
+
+
+class Metricas:
+    # Métricas de teoría de colas que se actualizan en O(1) por evento: cada ejercicio avisa
+    # cuándo llega un elemento, cuándo empieza y termina su atención y, si lo sabe, el
+    # largo de su cola. La unidad de tiempo es la del ejercicio.
+    # Con muestras de la cola, la cola media es su promedio ponderado por tiempo; sin ellas
+    # sale de la ley de Little (suma de esperas / tiempo observado). La serie guarda las
+    # últimas muestras (tiempo, largo) para ver la evolución de la cola.
+    CUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, servidores=1, muestras=1000):
+        self.servidores = servidores
+        self.llegadas = 0
+        self.iniciados = 0
+        self.atendidos = 0
+        self.espera_total = 0.0
+        self.servicio_total = 0.0     # Tiempo de servidor ocupado (para la utilización)
+        self.primero = None           # Primer instante observado
+        self.ultimo = None            # Último instante observado
+        self.cola_maxima = 0
+        self.serie_cola = deque(maxlen=muestras)
+        self.area_cola = 0.0          # Integral del largo de la cola en el tiempo
+        self.t_cola = None            # Instante y largo de la última muestra
+        self.largo_cola = 0
+        self.cuantiles = {p: CuantilP2(p) for p in self.CUANTILES}
+
+    def _instante(self, t):
+        if self.primero is None or t < self.primero:
+            self.primero = t
+        if self.ultimo is None or t > self.ultimo:
+            self.ultimo = t
+
+    def llegada(self, t):
+        self.llegadas += 1
+        self._instante(t)
+
+    def inicio(self, t, espera):
+        self.iniciados += 1
+        self.espera_total += espera
+        for cuantil in self.cuantiles.values():
+            cuantil.agregar(espera)
+        self._instante(t)
+
+    def fin(self, t, servicio=None):
+        # servicio es el tiempo que el elemento ocupó un servidor; si varios elementos
+        # comparten una misma atención (un lote), se informa una sola vez con ocupacion()
+        self.atendidos += 1
+        if servicio is not None:
+            self.servicio_total += servicio
+        self._instante(t)
+
+    def ocupacion(self, duracion):
+        self.servicio_total += duracion
+
+    def cola(self, t, largo):
+        if largo > self.cola_maxima:
+            self.cola_maxima = largo
+        if self.t_cola is None or t >= self.t_cola:
+            if self.t_cola is not None:
+                self.area_cola += self.largo_cola * (t - self.t_cola)
+            self.t_cola = t
+            self.largo_cola = largo
+        self.serie_cola.append((t, largo))
+        self._instante(t)
+
+    def cola_media(self):
+        tiempo = self.transcurrido()
+        if not tiempo:
+            return None
+        if self.t_cola is None:
+            return self.espera_total / tiempo
+        return (self.area_cola + self.largo_cola * (self.ultimo - self.t_cola)) / tiempo
+
+    def transcurrido(self):
+        return self.ultimo - self.primero if self.primero is not None else 0
+
+    def resumen(self):
+        tiempo = self.transcurrido()
+        datos = {
+            "llegadas": self.llegadas,
+            "atendidos": self.atendidos,
+            "en_sistema": self.llegadas - self.atendidos,
+            "throughput": self.atendidos / tiempo if tiempo else None,
+            "espera_media": self.espera_total / self.iniciados if self.iniciados else None,
+            "servicio_medio": self.servicio_total / self.atendidos if self.atendidos else None,
+            "utilizacion": self.servicio_total / (self.servidores * tiempo) if tiempo else None,
+            "cola_media": self.cola_media(),
+            "cola_maxima": self.cola_maxima,
+        }
+        for p, cuantil in self.cuantiles.items():
+            datos[f"espera_p{round(p * 100)}"] = cuantil.valor()
+        return datos
+
+# =============================
+# TRAZAS
+# =============================
+
+def leer_traza(ruta, formato=None):
+    # Recorre una traza de llegadas registro por registro, sin cargarla entera en memoria.
+    # Acepta JSON Lines (un objeto por línea) o CSV con encabezado; el formato se deduce de
+    # la extensión si no se indica. Cada registro es un dict campo -> valor.
+    formato = formato or ("csv" if ruta.lower().endswith(".csv") else "jsonl")
+    if formato not in ("csv", "jsonl"):
+        raise ValueError(f"Formato de traza desconocido: {formato}")
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        if formato == "csv":
+            yield from csv.DictReader(archivo)
+            return
+        for numero, linea in enumerate(archivo, start=1):
+            linea = linea.strip()
+            if not linea or linea.startswith("#"):
+                continue
+            try:
+                yield json.loads(linea)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Línea {numero} de {ruta}: {e}") from e
+
+
+def campo_traza(registro, nombre, conversion=str, defecto=None):
+    # Valor de un campo de la traza convertido al tipo pedido. En CSV todo llega como
+    # texto y un campo vacío cuenta como ausente.
+    valor = registro.get(nombre)
+    if valor is None or valor == "":
+        return defecto
+    return conversion(valor)
+
+# =============================
+# SIMULADOR GENÉRICO
+# =============================
+
+class Atencion:
+    # Paso de un elemento por el sistema: cuándo llegó, empezó y terminó, y quién lo atendió
+    __slots__ = ("elemento", "llegada", "inicio", "fin", "servidor")
+
+    def __init__(self, elemento, llegada):
+        self.elemento = elemento
+        self.llegada = llegada
+        self.inicio = None
+        self.fin = None
+        self.servidor = None
+
+    @property
+    def espera(self):
+        return None if self.inicio is None else self.inicio - self.llegada
+
+
+class Servidor:
+    # Un agente, ventanilla, impresora o núcleo del simulador genérico
+    def __init__(self, id_servidor):
+        self.id_servidor = id_servidor
+        self.ocupado = 0.0       # Tiempo total atendiendo
+        self.atendidos = 0
+
+
+class SimuladorColas:
+    # Cola con varios servidores sobre el reloj virtual (modelo G/G/c). La política decide
+    # el orden de la cola (recibe objetos Atencion) y tiempo_servicio(elemento, azar)
+    # devuelve cuánto tarda cada uno. al_terminar(atencion) permite a cada ejercicio copiar
+    # los tiempos a sus propios objetos.
+    # historial guarda los objetos Atencion; con Historial(retencion=0) no se guarda ninguno.
+    def __init__(self, servidores=1, politica=None, tiempo_servicio=None, semilla=None, al_terminar=None,
+                 historial=None):
+        if servidores < 1:
+            raise ValueError("El simulador necesita al menos un servidor.")
+        self.servidores = [Servidor(i + 1) for i in range(servidores)]
+        self.libres = list(reversed(self.servidores))  # Pila de servidores desocupados
+        self.cola = politica if politica is not None else ColaFIFO()
+        self.tiempo_servicio = tiempo_servicio or TiempoConstante(1)
+        self.azar = random.Random(semilla)
+        self.motor = MotorEventos()
+        self.historial = historial if historial is not None else Historial()
+        self.al_terminar = al_terminar
+        self.metricas = Metricas(servidores)
+
+    def llegada(self, elemento, tiempo=None):
+        # Programa la llegada de un elemento (por defecto, en el instante actual)
+        if tiempo is None or tiempo < self.motor.reloj:
+            tiempo = self.motor.reloj
+        self.motor.programar(tiempo, MotorEventos.LLEGADA, Atencion(elemento, tiempo))
+
+    def cargar(self, llegadas):
+        # Recibe pares (tiempo, elemento) en orden de llegada y va simulando a medida que
+        # los lee: el heap solo guarda lo que está en curso, así la memoria no depende del
+        # largo de la entrada (puede ser un generador sobre una traza de millones de líneas)
+        cantidad = 0
+        motor = self.motor
+        for tiempo, elemento in llegadas:
+            while motor and motor.proximo_tiempo() < tiempo:
+                self._paso()
+            self.llegada(elemento, tiempo)
+            cantidad += 1
+        return cantidad
+
+    def _iniciar(self, servidor, atencion, ahora):
+        atencion.inicio = ahora
+        atencion.servidor = servidor.id_servidor
+        self.metricas.inicio(ahora, ahora - atencion.llegada)
+        duracion = self.tiempo_servicio(atencion.elemento, self.azar)
+        self.motor.programar(ahora + duracion, MotorEventos.FIN, (servidor, atencion))
+
+    def simular(self, hasta=None):
+        # Procesa los eventos pendientes (o hasta el instante indicado) y devuelve el resumen
+        motor = self.motor
+        while motor:
+            if hasta is not None and motor.proximo_tiempo() > hasta:
+                break
+            self._paso()
+        return self.resumen()
+
+    def _paso(self):
+        # Procesa el próximo evento del motor
+        tipo, dato = self.motor.siguiente()
+        ahora = self.motor.reloj
+        if tipo == MotorEventos.LLEGADA:
+            self.metricas.llegada(ahora)
+            if self.libres:
+                self._iniciar(self.libres.pop(), dato, ahora)
+            else:
+                self.cola.agregar(dato, ahora)
+                self.metricas.cola(ahora, len(self.cola))
+            return
+        servidor, atencion = dato
+        atencion.fin = ahora
+        servidor.ocupado += ahora - atencion.inicio
+        servidor.atendidos += 1
+        self.metricas.fin(ahora, ahora - atencion.inicio)
+        self.historial.append(atencion)
+        if self.al_terminar is not None:
+            self.al_terminar(atencion)
+        if self.cola:
+            self._iniciar(servidor, self.cola.siguiente(), ahora)
+            self.metricas.cola(ahora, len(self.cola))
+        else:
+            self.libres.append(servidor)
+
+    def resumen(self):
+        # Estadísticas de lo atendido hasta ahora, en la unidad de tiempo del ejercicio:
+        # las de Metricas más la utilización de cada servidor
+        fin = self.motor.reloj
+        datos = self.metricas.resumen()
+        datos.update({"servidores": len(self.servidores), "fin": fin,
+                      "utilizacion_por_servidor": [s.ocupado / fin if fin else 0.0 for s in self.servidores]})
+        return datos
@@ -0,0 +1,196 @@
+'''Planificador de capacidad: cuántos agentes necesita el centro de llamadas, cuántas
+ventanillas la farmacia o cuántas impresoras la oficina para cumplir un objetivo de
+espera (por ejemplo, el 95 % de los clientes espera menos de 60 s). Compara la
+estimación analítica de Erlang C (modelo M/M/c) con réplicas de la simulación, busca
+en ambos casos la menor cantidad de servidores con búsqueda binaria y arma una tabla
+de costo y latencia alrededor de esas cantidades.'''
+
+import math
+import sys
+
+import Ejercicio2
+import Ejercicio3
+import replicas
+from motor_colas import Metricas
+
+# =============================
+# MODELO ANALÍTICO (M/M/c)
+# =============================
+
+def erlang_c(servidores, carga):
+    # Probabilidad de que un cliente tenga que esperar con carga = tasa * servicio medio
+    # (en erlangs). Se calcula con la recurrencia de Erlang B, que no desborda con
+    # muchos servidores.
+    if carga >= servidores:
+        return 1.0
+    b = 1.0
+    for k in range(1, servidores + 1):
+        b = carga * b / (k + carga * b)
+    return servidores * b / (servidores - carga * (1 - b))
+
+
+def espera_media_mmc(servidores, tasa, servicio):
+    # Espera media en la cola de un M/M/c (infinita si el sistema no es estable)
+    carga = tasa * servicio
+    if carga >= servidores:
+        return math.inf
+    return erlang_c(servidores, carga) * servicio / (servidores - carga)
+
+
+def percentil_espera_mmc(servidores, tasa, servicio, p):
+    # Espera que no supera la fracción p de los clientes: P(W > t) = C * e^{-(c/s - tasa) t}
+    carga = tasa * servicio
+    if carga >= servidores:
+        return math.inf
+    probabilidad = erlang_c(servidores, carga)
+    if probabilidad <= 1 - p:
+        return 0.0
+    return math.log(probabilidad / (1 - p)) / (servidores / servicio - tasa)
+
+# =============================
+# BÚSQUEDA
+# =============================
+
+def busqueda_binaria(cumple, minimo, maximo=None):
+    # Menor n >= minimo con cumple(n), suponiendo que cumple es monótona (si se cumple con
+    # n servidores, se cumple con más). Sin máximo, lo busca duplicando. Cada n se evalúa
+    # a lo sumo una vez, así cumple puede ser una simulación cara.
+    if maximo is None:
+        maximo = max(minimo, 1)
+        while not cumple(maximo):
+            minimo, maximo = maximo + 1, maximo * 2
+    while minimo < maximo:
+        medio = (minimo + maximo) // 2
+        if cumple(medio):
+            maximo = medio
+        else:
+            minimo = medio + 1
+    return minimo
+
+# =============================
+# ESCENARIOS
+# =============================
+
+def _media_uniforme(rango):
+    minimo, maximo = rango
+    return (minimo + maximo) / 2
+
+
+def repartir_ventanillas(cantidad):
+    # Reparte las ventanillas entre los servicios; con políticas de colas compartidas
+    # todas atienden cualquier servicio y solo importa el total
+    base, resto = divmod(cantidad, len(Ejercicio3.SERVICIOS))
+    return {s: base + (i < resto) for i, s in enumerate(Ejercicio3.SERVICIOS)}
+
+
+# Escenario -> parámetro de los servidores, cómo armarlo, servicio medio (en la unidad del
+# ejercicio) y configuración fija de la simulación
+ESCENARIOS = {
+    "call_center": {
+        "parametro": "agentes",
+        "armar": int,
+        "servicio": _media_uniforme(Ejercicio2.DURACION_LLAMADA),
+        "config": {},
+    },
+    "farmacia": {
+        "parametro": "ventanillas",
+        "armar": repartir_ventanillas,
+        "servicio": sum(_media_uniforme(Ejercicio3.DURACION_SERVICIO[s])
+                        for s in Ejercicio3.SERVICIOS) / len(Ejercicio3.SERVICIOS),
+        "config": {"politica": "cola_mas_larga"},
+    },
+    "impresion": {
+        "parametro": "impresoras",
+        "armar": int,
+        "servicio": _media_uniforme((1, 20)) * 60.0 / 20,  # Páginas de simular_carga a 20 ppm
+        "config": {},
+    },
+}
+
+# =============================
+# PLANIFICACIÓN
+# =============================
+
+def planificar(escenario, tasa, objetivo, percentil=0.95, replicas_por_punto=10, cantidad=5000,
+               costo_servidor=1.0, costo_espera=0.0, margen=2, semilla=0, procesos=None):
+    # Busca la menor cantidad de servidores cuyo percentil de espera no supera el objetivo,
+    # según Erlang C y según la simulación (con el extremo superior del intervalo de
+    # confianza, para no aprobar una cantidad por suerte). Devuelve ambas cantidades y una
+    # fila por cantidad, desde la mínima estable hasta margen por encima de la mayor.
+    # El costo por unidad de tiempo es servidores * costo_servidor más el tiempo total de
+    # espera de los clientes (tasa * espera media) por costo_espera.
+    if escenario not in ESCENARIOS:
+        raise ValueError(f"Escenario desconocido: {escenario}")
+    if percentil not in Metricas.CUANTILES:
+        raise ValueError(f"La simulación solo mide los percentiles {Metricas.CUANTILES}.")
+    datos = ESCENARIOS[escenario]
+    servicio = datos["servicio"]
+    clave = f"espera_p{round(percentil * 100)}"
+    estable = math.floor(tasa * servicio) + 1   # Con menos servidores la cola crece sin límite
+    simulados = {}
+
+    def simular(servidores):
+        if servidores not in simulados:
+            config = {**datos["config"], datos["parametro"]: datos["armar"](servidores)}
+            simulados[servidores] = replicas.replicar(escenario, tasa, replicas_por_punto, cantidad, semilla,
+                                                      procesos, **config)
+        return simulados[servidores]
+
+    analitico = busqueda_binaria(lambda n: percentil_espera_mmc(n, tasa, servicio, percentil) <= objetivo,
+                                 estable)
+    simulado = busqueda_binaria(lambda n: simular(n)[clave]["intervalo"][1] <= objetivo, estable)
+    # Las cantidades de la tabla que la búsqueda no simuló se corren juntas en un barrido
+    cantidades = range(max(estable, min(analitico, simulado) - 1), max(analitico, simulado) + margen + 1)
+    faltan = [n for n in cantidades if n not in simulados]
+    if faltan:
+        barrido = replicas.barrer(escenario, datos["parametro"], [datos["armar"](n) for n in faltan], tasa,
+                                  replicas_por_punto, cantidad, semilla, procesos, **datos["config"])
+        simulados.update(zip(faltan, (combinado for _, combinado in barrido)))
+    filas = []
+    for n in cantidades:
+        combinado = simulados[n]
+        espera_media = combinado["espera_media"]["media"]
+        filas.append({
+            "servidores": n,
+            "utilizacion": tasa * servicio / n,
+            "espera_media_mmc": espera_media_mmc(n, tasa, servicio),
+            "percentil_mmc": percentil_espera_mmc(n, tasa, servicio, percentil),
+            "espera_media_sim": espera_media,
+            "percentil_sim": combinado[clave]["media"],
+            "percentil_sim_semiancho": combinado[clave]["semiancho"],
+            "costo": n * costo_servidor + tasa * espera_media * costo_espera,
+            "cumple": combinado[clave]["intervalo"][1] <= objetivo,
+        })
+    return {"escenario": escenario, "parametro": datos["parametro"], "tasa": tasa, "objetivo": objetivo,
+            "percentil": percentil, "analitico": analitico, "simulado": simulado, "filas": filas}
+
+# =============================
+# INTERFAZ DE CONSOLA
+# =============================
+
+def mostrar_plan(plan):
+    # Tabla de costo y latencia con las recomendaciones de cada método
+    p = round(plan["percentil"] * 100)
+    print(f"\n=== {plan['escenario'].upper()}: tasa {plan['tasa']}, objetivo p{p} <= {plan['objetivo']} ===")
+    print(f"{plan['parametro']:>12} | {'uso':>5} | {'media M/M/c':>11} | {f'p{p} M/M/c':>10} | "
+          f"{'media sim':>9} | {f'p{p} simulado':>17} | {'costo':>8} | cumple")
+    for fila in plan["filas"]:
+        print(f"{fila['servidores']:>12} | {fila['utilizacion']:>5.0%} | {fila['espera_media_mmc']:>11.2f} | "
+              f"{fila['percentil_mmc']:>10.2f} | {fila['espera_media_sim']:>9.2f} | "
+              f"{fila['percentil_sim']:>8.2f} ± {fila['percentil_sim_semiancho']:<6.2f} | {fila['costo']:>8.2f} | "
+              f"{'sí' if fila['cumple'] else 'no'}")
+    print(f"Erlang C recomienda {plan['analitico']} y la simulación {plan['simulado']} {plan['parametro']}.")
+
+
+def main():
+    # python planificador_capacidad.py [escenario] [tasa] [objetivo] [réplicas]
+    escenario = sys.argv[1] if len(sys.argv) > 1 else "call_center"
+    tasa = float(sys.argv[2]) if len(sys.argv) > 2 else 0.35
+    objetivo = float(sys.argv[3]) if len(sys.argv) > 3 else 60.0
+    replicas_por_punto = int(sys.argv[4]) if len(sys.argv) > 4 else 10
+    mostrar_plan(planificar(escenario, tasa, objetivo, replicas_por_punto=replicas_por_punto,
+                            costo_espera=0.5))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+'''Persistencia de una cola y su historial ante caídas. Cada alta (un elemento entra a
+la cola) y cada baja (sale atendido o cancelado) se agrega a un registro binario de
+solo escritura al final (write-ahead log): cada operación llega al sistema operativo
+apenas ocurre y el fsync se hace por lotes, cada cierta cantidad de operaciones o de
+tiempo. Cada tanto el estado vivo (pendientes e historial retenido) se guarda en una
+instantánea compacta y el registro vuelve a empezar, así la recuperación lee a lo
+sumo una instantánea y unas pocas operaciones, aunque se hayan hecho millones.
+Al reiniciar se cargan la instantánea y el registro y la cola queda como estaba; los
+elementos que estaban en atención en el momento de la caída vuelven a la cola.
+
+Los elementos se guardan según los mismos campos que usa HistorialColumnar
+(CAMPOS_DOCUMENTO, CAMPOS_LLAMADA, ...): 'f' float o None, 'i' entero, 'texto'.'''
+
+import math
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+
+ALTA = 1            # El elemento entró a la cola
+BAJA_ATENDIDO = 2   # Salió atendido: pasa al historial
+BAJA_CANCELADO = 3  # Salió sin atenderse
+
+CABECERA = struct.Struct("<IIQB")   # largo del contenido, crc32, secuencia, operación
+CLAVE = struct.Struct("<Q")
+FLOTANTE = struct.Struct("<d")
+ENTERO = struct.Struct("<q")
+LARGO = struct.Struct("<I")
+SIN_TEXTO = 0xFFFFFFFF
+SIN_ENTERO = -2 ** 63
+MARCA_INSTANTANEA = b"COLAS1"
+
+# =============================
+# CODIFICACIÓN DE ELEMENTOS
+# =============================
+
+class CodificadorRegistro:
+    # Convierte un elemento en bytes según sus campos y lo reconstruye al leer
+    def __init__(self, tipo, campos):
+        self.tipo = tipo
+        self.campos = campos
+
+    def codificar(self, elemento):
+        partes = []
+        for nombre, clase in self.campos.items():
+            valor = getattr(elemento, nombre)
+            if clase == 'f':
+                partes.append(FLOTANTE.pack(math.nan if valor is None else valor))
+            elif clase == 'i':
+                partes.append(ENTERO.pack(SIN_ENTERO if valor is None else valor))
+            elif valor is None:
+                partes.append(LARGO.pack(SIN_TEXTO))
+            else:
+                texto = str(valor).encode("utf-8")
+                partes.append(LARGO.pack(len(texto)))
+                partes.append(texto)
+        return b"".join(partes)
+
+    def decodificar(self, datos):
+        elemento = self.tipo.__new__(self.tipo)
+        posicion = 0
+        for nombre, clase in self.campos.items():
+            if clase == 'f':
+                valor = FLOTANTE.unpack_from(datos, posicion)[0]
+                posicion += FLOTANTE.size
+                valor = None if math.isnan(valor) else valor
+            elif clase == 'i':
+                valor = ENTERO.unpack_from(datos, posicion)[0]
+                posicion += ENTERO.size
+                valor = None if valor == SIN_ENTERO else valor
+            else:
+                largo = LARGO.unpack_from(datos, posicion)[0]
+                posicion += LARGO.size
+                if largo == SIN_TEXTO:
+                    valor = None
+                else:
+                    valor = datos[posicion:posicion + largo].decode("utf-8")
+                    posicion += largo
+            setattr(elemento, nombre, valor)
+        return elemento
+
+# =============================
+# REGISTRO DE OPERACIONES
+# =============================
+
+class RegistroPersistente:
+    # Guarda en carpeta el registro de operaciones y la instantánea de una cola.
+    # lote e intervalo_s deciden cada cuánto se hace fsync: una caída del sistema puede
+    # perder como mucho esas últimas operaciones (una caída del programa no pierde
+    # ninguna). compactar_cada limita cuántas operaciones se reproducen al recuperar.
+    # retencion es cuántos elementos del historial se conservan en la instantánea.
+    # Es seguro entre hilos.
+    def __init__(self, carpeta, tipo, campos, lote=64, intervalo_s=0.05, compactar_cada=100000,
+                 retencion=1000):
+        os.makedirs(carpeta, exist_ok=True)
+        self.carpeta = carpeta
+        self.ruta_registro = os.path.join(carpeta, "operaciones.wal")
+        self.ruta_instantanea = os.path.join(carpeta, "instantanea.bin")
+        self.codificador = CodificadorRegistro(tipo, campos)
+        self.lote = lote
+        self.intervalo_s = intervalo_s
+        self.compactar_cada = compactar_cada
+        self.lock = threading.Lock()
+        self.pendientes = {}                      # clave -> elemento codificado, en orden de alta
+        self.historial = deque(maxlen=retencion)  # Últimos elementos atendidos, codificados
+        self.claves = {}                          # id(elemento) -> clave, para los pendientes vivos
+        self.secuencia = 0                        # Número de la última operación
+        self.siguiente_clave = 1
+        self.operaciones = 0                      # Operaciones en el registro desde la instantánea
+        self._recuperar()
+        self.archivo = open(self.ruta_registro, "ab", buffering=0)
+        self.sin_sincronizar = 0
+        self.ultima_sincronizacion = time.monotonic()
+
+    # -----------------------------
+    # Recuperación
+    # -----------------------------
+
+    def _recuperar(self):
+        # Carga la instantánea y aplica las operaciones posteriores. Un registro cortado
+        # o con el crc roto (la caída llegó a mitad de una escritura) se descarta desde ahí.
+        if os.path.exists(self.ruta_instantanea):
+            self._leer_instantanea()
+        if not os.path.exists(self.ruta_registro):
+            return
+        valido = 0
+        with open(self.ruta_registro, "rb") as archivo:
+            datos = archivo.read()
+        while valido + CABECERA.size <= len(datos):
+            largo, crc, secuencia, operacion = CABECERA.unpack_from(datos, valido)
+            fin = valido + CABECERA.size + largo
+            if fin > len(datos) or zlib.crc32(datos[valido + 8:fin]) != crc:
+                break
+            if secuencia > self.secuencia:   # Las anteriores ya están en la instantánea
+                self._aplicar(operacion, datos[valido + CABECERA.size:fin])
+                self.secuencia = secuencia
+                self.operaciones += 1
+            valido = fin
+        if valido < len(datos):
+            with open(self.ruta_registro, "r+b") as archivo:
+                archivo.truncate(valido)
+                os.fsync(archivo.fileno())
+
+    def _aplicar(self, operacion, contenido):
+        clave = CLAVE.unpack_from(contenido)[0]
+        if operacion == ALTA:
+            self.pendientes[clave] = contenido[CLAVE.size:]
+            self.siguiente_clave = max(self.siguiente_clave, clave + 1)
+            return
+        self.pendientes.pop(clave, None)
+        if operacion == BAJA_ATENDIDO:
+            self.historial.append(contenido[CLAVE.size:])
+
+    def _leer_instantanea(self):
+        with open(self.ruta_instantanea, "rb") as archivo:
+            datos = archivo.read()
+        if not datos.startswith(MARCA_INSTANTANEA) or zlib.crc32(datos[:-4]) != LARGO.unpack_from(datos, len(datos) - 4)[0]:
+            raise ValueError(f"La instantánea {self.ruta_instantanea} está dañada.")
+        posicion = len(MARCA_INSTANTANEA)
+        self.secuencia, self.siguiente_clave, cantidad = struct.unpack_from("<QQQ", datos, posicion)
+        posicion += 24
+        for _ in range(cantidad):
+            clave, largo = struct.unpack_from("<QI", datos, posicion)
+            posicion += 12
+            self.pendientes[clave] = datos[posicion:posicion + largo]
+            posicion += largo
+        cantidad = CLAVE.unpack_from(datos, posicion)[0]
+        posicion += CLAVE.size
+        for _ in range(cantidad):
+            largo = LARGO.unpack_from(datos, posicion)[0]
+            posicion += LARGO.size
+            self.historial.append(datos[posicion:posicion + largo])
+            posicion += largo
+
+    def restaurar(self):
+        # Reconstruye los elementos pendientes (en orden de alta) y los del historial.
+        # Los pendientes quedan asociados a su clave para las bajas que vengan.
+        with self.lock:
+            pendientes = []
+            for clave, contenido in self.pendientes.items():
+                elemento = self.codificador.decodificar(contenido)
+                self.claves[id(elemento)] = clave
+                pendientes.append(elemento)
+            historial = [self.codificador.decodificar(contenido) for contenido in self.historial]
+        return pendientes, historial
+
+    # -----------------------------
+    # Operaciones
+    # -----------------------------
+
+    def alta(self, elemento):
+        # El elemento entró a la cola
+        with self.lock:
+            clave = self.siguiente_clave
+            self.siguiente_clave += 1
+            self.claves[id(elemento)] = clave
+            contenido = self.codificador.codificar(elemento)
+            self.pendientes[clave] = contenido
+            self._escribir(ALTA, CLAVE.pack(clave) + contenido)
+
+    def baja(self, elemento, atendido=True):
+        # El elemento salió de la cola; si fue atendido se guarda con sus datos finales
+        with self.lock:
+            clave = self.claves.pop(id(elemento), None)
+            if clave is None:
+                return   # No se registró su alta (por ejemplo, llegó antes de activar el registro)
+            self.pendientes.pop(clave, None)
+            if atendido:
+                contenido = self.codificador.codificar(elemento)
+                self.historial.append(contenido)
+                self._escribir(BAJA_ATENDIDO, CLAVE.pack(clave) + contenido)
+            else:
+                self._escribir(BAJA_CANCELADO, CLAVE.pack(clave))
+
+    def _escribir(self, operacion, contenido):
+        # Debe llamarse con el lock tomado
+        self.secuencia += 1
+        cuerpo = struct.pack("<QB", self.secuencia, operacion) + contenido
+        self.archivo.write(struct.pack("<II", len(contenido), zlib.crc32(cuerpo)) + cuerpo)
+        self.sin_sincronizar += 1
+        self.operaciones += 1
+        if (self.sin_sincronizar >= self.lote
+                or time.monotonic() - self.ultima_sincronizacion >= self.intervalo_s):
+            self._sincronizar()
+        if self.operaciones >= self.compactar_cada:
+            self._compactar()
+
+    def _sincronizar(self):
+        if self.sin_sincronizar:
+            os.fsync(self.archivo.fileno())
+            self.sin_sincronizar = 0
+        self.ultima_sincronizacion = time.monotonic()
+
+    def sincronizar(self):
+        # Fuerza a disco las operaciones pendientes de fsync
+        with self.lock:
+            self._sincronizar()
+
+    # -----------------------------
+    # Compactación
+    # -----------------------------
+
+    def _compactar(self):
+        # Escribe el estado vivo en una instantánea nueva (archivo temporal + rename, que es
+        # atómico) y recién entonces vacía el registro. Si la caída ocurre en el medio, las
+        # operaciones que quedan en el registro ya están en la instantánea y se saltean.
+        partes = [MARCA_INSTANTANEA, struct.pack("<QQQ", self.secuencia, self.siguiente_clave, len(self.pendientes))]
+        for clave, contenido in self.pendientes.items():
+            partes.append(struct.pack("<QI", clave, len(contenido)))
+            partes.append(contenido)
+        partes.append(CLAVE.pack(len(self.historial)))
+        for contenido in self.historial:
+            partes.append(LARGO.pack(len(contenido)))
+            partes.append(contenido)
+        datos = b"".join(partes)
+        temporal = self.ruta_instantanea + ".tmp"
+        with open(temporal, "wb") as archivo:
+            archivo.write(datos + LARGO.pack(zlib.crc32(datos)))
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(temporal, self.ruta_instantanea)
+        self._sincronizar_carpeta()
+        self.archivo.close()
+        self.archivo = open(self.ruta_registro, "wb", buffering=0)
+        os.fsync(self.archivo.fileno())
+        self.operaciones = 0
+        self.sin_sincronizar = 0
+
+    def _sincronizar_carpeta(self):
+        # Hace durable el rename (en Windows no se puede abrir una carpeta)
+        if os.name == "nt":
+            return
+        descriptor = os.open(self.carpeta, os.O_RDONLY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+    def compactar(self):
+        with self.lock:
+            self._compactar()
+
+    def cerrar(self):
+        # Deja todo en disco; se compacta para que el próximo arranque sea inmediato
+        with self.lock:
+            if self.archivo.closed:
+                return
+            self._compactar()
+            self.archivo.close()
+
+
+def abrir_persistencia(nombre, tipo, campos, **opciones):
+    # Registro persistente de una cola dentro de la carpeta que indica la variable de
+    # entorno COLAS_DATOS (cada ejercicio en su subcarpeta), o None si no está definida
+    carpeta = os.environ.get("COLAS_DATOS")
+    if not carpeta:
+        return None
+    return RegistroPersistente(os.path.join(carpeta, nombre), tipo, campos, **opciones)
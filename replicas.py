@@ -0,0 +1,172 @@
+'''Réplicas Monte Carlo de los simuladores. Una sola corrida con tiempos al azar da una
+muestra ruidosa; aquí se repite un escenario (agentes o ventanillas, tasa de llegadas,
+política) con muchas semillas independientes, repartiendo las corridas entre los
+núcleos con un ProcessPoolExecutor, y se combinan sus métricas en medias con
+intervalos de confianza. Los barridos (por ejemplo, de la cantidad de agentes) mandan
+todas sus corridas al mismo pool, así escalan con la cantidad de núcleos.'''
+
+import math
+import os
+import random
+import statistics
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import Ejercicio1
+import Ejercicio2
+import Ejercicio3
+from motor_colas import Metricas
+
+# =============================
+# ESCENARIOS
+# =============================
+
+def _call_center(cantidad, tasa, semilla, agentes=5, **parametros):
+    # Una corrida del centro de llamadas (tasa en llamadas por segundo)
+    return Ejercicio2.simular_carga(cantidad, tasa, agentes, semilla=semilla, retencion=0, **parametros)
+
+
+def _farmacia(cantidad, tasa, semilla, ventanillas=None, politica='dedicada', **parametros):
+    # Una corrida de la farmacia (tasa en pacientes por segundo) con las métricas de todas
+    # las ventanillas juntas y la espera media de cada servicio
+    metricas = Metricas(len(Ejercicio3.armar_ventanillas(ventanillas, politica)))
+    espera, _ = Ejercicio3.simular_carga(cantidad, tasa, ventanillas, politica, semilla=semilla,
+                                         retencion=0, metricas=metricas, **parametros)
+    datos = metricas.resumen()
+    for servicio, media in espera.items():
+        datos[f"espera_{servicio.lower()}"] = media
+    return datos
+
+
+def _impresion(cantidad, tasa, semilla, impresoras=1, paginas_por_minuto=20, **parametros):
+    # Una corrida de la cola de impresión con impresoras iguales (tasa en documentos por
+    # segundo), con las claves de Metricas y la utilización media de la flota
+    flota = [Ejercicio1.Impresora(f"Impresora {i + 1}", paginas_por_minuto) for i in range(impresoras)]
+    resumen = Ejercicio1.simular_carga(cantidad, tasa, impresoras=flota, semilla=semilla, retencion=0,
+                                       **parametros)
+    utilizacion = resumen.pop("utilizacion")
+    datos = {clave.removesuffix("_s"): valor for clave, valor in resumen.items()}
+    datos["utilizacion"] = sum(utilizacion.values()) / len(utilizacion)
+    return datos
+
+
+# Escenarios que se pueden replicar: nombre -> función(cantidad, tasa, semilla, **config)
+ESCENARIOS = {
+    "call_center": _call_center,
+    "farmacia": _farmacia,
+    "impresion": _impresion,
+}
+
+# =============================
+# ESTADÍSTICA
+# =============================
+
+def cuantil_t(confianza, grados):
+    # Valor crítico de la t de Student (dos colas) por la expansión de Cornish-Fisher
+    # alrededor de la normal; para 3 o más grados de libertad el error es menor al 1 %
+    z = statistics.NormalDist().inv_cdf((1 + confianza) / 2)
+    if grados <= 0:
+        return math.inf
+    return (z + (z ** 3 + z) / (4 * grados)
+            + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * grados ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * grados ** 3))
+
+
+def combinar(resultados, confianza=0.95):
+    # Une los resúmenes de varias réplicas: para cada métrica numérica, la media, el desvío
+    # entre réplicas y el intervalo de confianza de la media
+    combinado = {}
+    for clave in resultados[0]:
+        valores = [r[clave] for r in resultados
+                   if isinstance(r.get(clave), (int, float)) and not isinstance(r.get(clave), bool)]
+        if not valores:
+            continue
+        media = statistics.fmean(valores)
+        desvio = statistics.stdev(valores) if len(valores) > 1 else 0.0
+        semiancho = cuantil_t(confianza, len(valores) - 1) * desvio / math.sqrt(len(valores))
+        combinado[clave] = {"media": media, "desvio": desvio, "semiancho": semiancho,
+                            "intervalo": (media - semiancho, media + semiancho), "replicas": len(valores)}
+    return combinado
+
+# =============================
+# EJECUCIÓN EN PARALELO
+# =============================
+
+def semillas(semilla, replicas):
+    # Semillas independientes para cada réplica. No se usa semilla + i porque la farmacia
+    # ya usa semilla + i para sus grupos de ventanillas y las réplicas quedarían correlacionadas.
+    azar = random.Random(semilla)
+    return [azar.getrandbits(32) for _ in range(replicas)]
+
+
+def _correr(tarea):
+    escenario, cantidad, tasa, semilla, config = tarea
+    return ESCENARIOS[escenario](cantidad, tasa, semilla, **config)
+
+
+def _ejecutar(tareas, procesos):
+    # Corre las tareas en el pool (o en este proceso con procesos=1), en orden
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1 or len(tareas) == 1:
+        return [_correr(tarea) for tarea in tareas]
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        return list(pool.map(_correr, tareas, chunksize=max(1, len(tareas) // (4 * procesos))))
+
+
+def replicar(escenario, tasa, replicas=30, cantidad=10000, semilla=0, procesos=None, confianza=0.95,
+             **config):
+    # Corre replicas veces el escenario con semillas distintas y devuelve las métricas
+    # combinadas. config va a la función del escenario (agentes, ventanillas, politica,
+    # perfil, servicio...). procesos es la cantidad de procesos (None: uno por núcleo).
+    if escenario not in ESCENARIOS:
+        raise ValueError(f"Escenario desconocido: {escenario}")
+    tareas = [(escenario, cantidad, tasa, s, config) for s in semillas(semilla, replicas)]
+    return combinar(_ejecutar(tareas, procesos), confianza)
+
+
+def barrer(escenario, parametro, valores, tasa, replicas=30, cantidad=10000, semilla=0, procesos=None,
+           confianza=0.95, **config):
+    # Repite replicar para cada valor de un parámetro del escenario (por ejemplo agentes)
+    # con las mismas semillas en todos (números aleatorios comunes: las diferencias entre
+    # valores no dependen del azar). Devuelve una lista de (valor, métricas combinadas).
+    if escenario not in ESCENARIOS:
+        raise ValueError(f"Escenario desconocido: {escenario}")
+    valores = list(valores)
+    lista_semillas = semillas(semilla, replicas)
+    tareas = [(escenario, cantidad, tasa, s, {**config, parametro: valor})
+              for valor in valores for s in lista_semillas]
+    resultados = _ejecutar(tareas, procesos)
+    return [(valor, combinar(resultados[i * replicas:(i + 1) * replicas], confianza))
+            for i, valor in enumerate(valores)]
+
+# =============================
+# INTERFAZ DE CONSOLA
+# =============================
+
+def mostrar_barrido(parametro, filas, metricas=("espera_media", "espera_p95", "utilizacion")):
+    # Tabla con la media ± semiancho de cada métrica para cada valor del parámetro
+    print(f"{parametro:>12} | " + " | ".join(f"{m:>22}" for m in metricas))
+    for valor, combinado in filas:
+        celdas = []
+        for metrica in metricas:
+            dato = combinado.get(metrica)
+            celdas.append(f"{dato['media']:>12.2f} ± {dato['semiancho']:<7.2f}" if dato else f"{'-':>22}")
+        print(f"{str(valor):>12} | " + " | ".join(celdas))
+
+
+def main():
+    # python replicas.py [réplicas] [procesos]: barre la cantidad de agentes del centro de
+    # llamadas y de ventanillas de la farmacia con la carga de ejemplo
+    replicas = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    procesos = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    print(f"\n=== CENTRO DE LLAMADAS: 0.35 llamadas/s, {replicas} réplicas ===")
+    mostrar_barrido("agentes", barrer("call_center", "agentes", range(5, 9), 0.35, replicas,
+                                      procesos=procesos))
+    print(f"\n=== FARMACIA (cola_mas_larga): 0.25 pacientes/s, {replicas} réplicas ===")
+    filas = barrer("farmacia", "ventanillas", [{s: n for s in Ejercicio3.SERVICIOS} for n in (1, 2)], 0.25,
+                   replicas, procesos=procesos, politica='cola_mas_larga')
+    mostrar_barrido("ventanillas", [(sum(v.values()), combinado) for v, combinado in filas])
+
+
+if __name__ == "__main__":
+    main()
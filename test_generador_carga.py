@@ -0,0 +1,126 @@
+'''Pruebas del camino vectorizado de GeneradorCarga: la tasa media de cada perfil, la
+repetición con una misma semilla y que NumPy y el módulo random generen cargas con las
+mismas estadísticas. Sin NumPy instalado se saltean. Se corren con pytest.'''
+
+import math
+import statistics
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from generador_carga import GeneradorCarga
+
+N = 200_000   # Llegadas por corrida: suficientes para que las medias se estabilicen
+
+# Perfil -> parámetros; alfa 2.5 para que la Pareto tenga varianza finita y su media
+# converja, y un día corto para que la corrida abarque muchos ciclos
+PERFILES = {
+    "poisson": {},
+    "pareto": {"alfa": 2.5},
+    "rafagas": {"factor": 8.0},
+    "diurno": {"periodo": 1000.0, "amplitud": 0.9, "pico": 0.25},
+}
+
+
+def generar(perfil, usar_numpy, semilla=7, tasa=2.0, n=N):
+    generador = GeneradorCarga(tasa, perfil, semilla=semilla, usar_numpy=usar_numpy, **PERFILES[perfil])
+    return generador, generador.instantes(n)
+
+
+def huecos(instantes):
+    return np.diff(np.asarray(instantes), prepend=0.0)
+
+
+def coeficiente_variacion(valores):
+    return float(np.std(valores) / np.mean(valores))
+
+# =============================
+# TASA Y SEMILLA
+# =============================
+
+@pytest.mark.parametrize("perfil", PERFILES)
+def test_tasa_media(perfil):
+    _, instantes = generar(perfil, True)
+    assert isinstance(instantes, np.ndarray)
+    assert np.all(np.diff(instantes) >= 0)
+    assert N / instantes[-1] == pytest.approx(2.0, rel=0.05)
+
+
+@pytest.mark.parametrize("perfil", PERFILES)
+def test_misma_semilla_misma_carga(perfil):
+    _, primera = generar(perfil, True, semilla=11, n=20_000)
+    _, segunda = generar(perfil, True, semilla=11, n=20_000)
+    _, otra = generar(perfil, True, semilla=12, n=20_000)
+    assert np.array_equal(primera, segunda)
+    assert not np.array_equal(primera, otra)
+
+
+@pytest.mark.parametrize("perfil", PERFILES)
+def test_los_bloques_siguen_desde_la_ultima_llegada(perfil):
+    generador = GeneradorCarga(2.0, perfil, semilla=3, bloque=1000, usar_numpy=True, **PERFILES[perfil])
+    anterior = 0.0
+    for instantes, duraciones in generador.bloques(10_500):
+        assert duraciones is None
+        assert instantes[0] >= anterior
+        assert all(a <= b for a, b in zip(instantes, instantes[1:]))
+        anterior = instantes[-1]
+    assert generador.generados == 10_500
+    assert generador.reloj == anterior
+    espacios = generador.entre_llegadas(100)
+    assert np.all(espacios >= 0)
+    assert generador.reloj == pytest.approx(anterior + espacios.sum())
+
+# =============================
+# NUMPY CONTRA RANDOM
+# =============================
+
+@pytest.mark.parametrize("perfil", PERFILES)
+def test_numpy_y_random_dan_las_mismas_estadisticas(perfil):
+    _, vectorizado = generar(perfil, True)
+    _, puro = generar(perfil, False)
+    assert not isinstance(puro, np.ndarray)
+    a, b = huecos(vectorizado), huecos(puro)
+    assert np.mean(a) == pytest.approx(np.mean(b), rel=0.05)
+    assert coeficiente_variacion(a) == pytest.approx(coeficiente_variacion(b), rel=0.1)
+    for q in (0.5, 0.9):
+        assert np.quantile(a, q) == pytest.approx(np.quantile(b, q), rel=0.05)
+
+
+def test_rafagas_agrupan_llegadas():
+    # En ráfagas los huecos varían más que en Poisson (coeficiente de variación > 1)
+    for usar_numpy in (True, False):
+        _, instantes = generar("rafagas", usar_numpy)
+        assert coeficiente_variacion(huecos(instantes)) > 1.2
+
+
+def test_diurno_sigue_el_ciclo_en_ambos_motores():
+    # Fracción de las llegadas en cada cuarto del día: la curva coseno con pico en 0.25
+    # concentra las llegadas en la primera mitad del día
+    cuartos = {}
+    for usar_numpy in (True, False):
+        _, instantes = generar("diurno", usar_numpy)
+        fraccion = (np.asarray(instantes) % 1000.0) / 1000.0
+        cuartos[usar_numpy] = np.bincount((fraccion * 4).astype(int), minlength=4) / N
+    # Integral del peso 1 + 0.9 cos(2π(x - 0.25)) en cada cuarto (su promedio en el día es 1)
+    esperado = [0.25 + 0.9 * (math.sin(2 * math.pi * c) - math.sin(2 * math.pi * (c - 0.25))) / (2 * math.pi)
+                for c in (0, 0.25, 0.5, 0.75)]
+    for usar_numpy in (True, False):
+        assert cuartos[usar_numpy] == pytest.approx(esperado, abs=0.01)
+
+
+@pytest.mark.parametrize("servicio, media", [
+    (("constante", 4.0), 4.0),
+    (("uniforme", 7, 20), 13.5),
+    (("exponencial", 12.0), 12.0),
+    (("pareto", 12.0, 2.5), 12.0),
+])
+def test_servicios(servicio, media):
+    resultados = []
+    for usar_numpy in (True, False):
+        generador = GeneradorCarga(1.0, servicio=servicio, semilla=5, usar_numpy=usar_numpy)
+        duraciones = generador.servicios(N)
+        assert len(duraciones) == N
+        resultados.append(statistics.fmean(duraciones))
+    assert resultados[0] == pytest.approx(media, rel=0.03)
+    assert resultados[1] == pytest.approx(media, rel=0.03)
@@ -0,0 +1,315 @@
+'''Pruebas del registro persistente: operaciones que sobreviven a una caída, registros
+cortados a mitad de escritura, compactación y el reinicio de cada simulador que guarda
+su cola (impresión, call center, farmacia, microprocesador y servidor de archivos).
+Se corren con python -m unittest o con pytest.'''
+
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import Ejercicio1
+import Ejercicio2
+import Ejercicio3
+import Ejercicio4
+import Ejercicio5
+from registro_persistente import CABECERA, RegistroPersistente
+
+
+class Tarea:
+    # Elemento mínimo para probar el registro sin depender de un ejercicio
+    def __init__(self, nombre, minutos=None):
+        self.nombre = nombre
+        self.minutos = minutos
+
+
+CAMPOS_TAREA = {"nombre": "texto", "minutos": "f"}
+
+
+def caer(registro):
+    # Simula que el programa muere: se suelta el archivo sin compactar ni cerrar el registro
+    registro.archivo.close()
+
+
+def esperar(condicion, limite_s=5.0):
+    # Espera a que los hilos de un simulador cumplan la condición
+    fin = time.monotonic() + limite_s
+    while not condicion():
+        if time.monotonic() > fin:
+            raise AssertionError("La condición no se cumplió a tiempo.")
+        time.sleep(0.01)
+
+# =============================
+# REGISTRO DE OPERACIONES
+# =============================
+
+class PruebasRegistro(unittest.TestCase):
+    def setUp(self):
+        self.temporal = tempfile.TemporaryDirectory()
+        self.carpeta = self.temporal.name
+
+    def tearDown(self):
+        self.temporal.cleanup()
+
+    def abrir(self, **opciones):
+        return RegistroPersistente(self.carpeta, Tarea, CAMPOS_TAREA, **opciones)
+
+    def estado(self, registro):
+        pendientes, historial = registro.restaurar()
+        return ([t.nombre for t in pendientes], [(t.nombre, t.minutos) for t in historial])
+
+    def test_altas_y_bajas_sobreviven_a_una_caida(self):
+        registro = self.abrir()
+        tareas = [Tarea(nombre) for nombre in "abcd"]
+        for tarea in tareas:
+            registro.alta(tarea)
+        tareas[0].minutos = 3.5
+        registro.baja(tareas[0])
+        registro.baja(tareas[2], atendido=False)
+        caer(registro)
+        self.assertEqual(self.estado(self.abrir()), (["b", "d"], [("a", 3.5)]))
+
+    def test_bajas_de_elementos_restaurados(self):
+        registro = self.abrir()
+        for nombre in "ab":
+            registro.alta(Tarea(nombre))
+        caer(registro)
+        registro = self.abrir()
+        pendientes, _ = registro.restaurar()
+        registro.baja(pendientes[0])
+        registro.alta(Tarea("c"))
+        caer(registro)
+        self.assertEqual(self.estado(self.abrir()), (["b", "c"], [("a", None)]))
+
+    def test_registro_cortado_se_descarta(self):
+        registro = self.abrir()
+        for nombre in "abc":
+            registro.alta(Tarea(nombre))
+        caer(registro)
+        ruta = os.path.join(self.carpeta, "operaciones.wal")
+        valido = os.path.getsize(ruta)
+        with open(ruta, "ab") as archivo:
+            # Una cabecera que anuncia más bytes de los que llegaron a escribirse
+            archivo.write(CABECERA.pack(100, 0, 99, 1) + b"\x00" * 10)
+        registro = self.abrir()
+        self.assertEqual(os.path.getsize(ruta), valido)
+        self.assertEqual(self.estado(registro), (["a", "b", "c"], []))
+        # Lo que se escribe después del corte también se recupera
+        registro.alta(Tarea("d"))
+        caer(registro)
+        self.assertEqual(self.estado(self.abrir()), (["a", "b", "c", "d"], []))
+
+    def test_registro_con_crc_roto_se_descarta_desde_ahi(self):
+        registro = self.abrir()
+        for nombre in "abc":
+            registro.alta(Tarea(nombre))
+        caer(registro)
+        ruta = os.path.join(self.carpeta, "operaciones.wal")
+        with open(ruta, "r+b") as archivo:
+            archivo.seek(-1, os.SEEK_END)
+            archivo.write(b"\xff")   # Último byte del contenido de "c"
+        self.assertEqual(self.estado(self.abrir()), (["a", "b"], []))
+
+    def test_compactacion_automatica(self):
+        registro = self.abrir(compactar_cada=5)
+        tareas = [Tarea(str(i)) for i in range(8)]
+        for tarea in tareas:
+            registro.alta(tarea)
+        for tarea in tareas[:4]:
+            registro.baja(tarea)
+        self.assertTrue(os.path.exists(os.path.join(self.carpeta, "instantanea.bin")))
+        self.assertLess(registro.operaciones, 5)
+        caer(registro)
+        self.assertEqual(self.estado(self.abrir()),
+                         (["4", "5", "6", "7"], [(str(i), None) for i in range(4)]))
+
+    def test_caida_entre_instantanea_y_registro_no_duplica(self):
+        # Si la caída ocurre después de escribir la instantánea pero antes de vaciar el
+        # registro, las operaciones viejas se saltean por su número de secuencia
+        registro = self.abrir()
+        tareas = [Tarea(nombre) for nombre in "abc"]
+        for tarea in tareas:
+            registro.alta(tarea)
+        registro.baja(tareas[0])
+        ruta = os.path.join(self.carpeta, "operaciones.wal")
+        with open(ruta, "rb") as archivo:
+            viejo = archivo.read()
+        registro.compactar()
+        registro.baja(tareas[1])
+        caer(registro)
+        with open(ruta, "rb") as archivo:
+            nuevo = archivo.read()
+        with open(ruta, "wb") as archivo:
+            archivo.write(viejo + nuevo)
+        self.assertEqual(self.estado(self.abrir()), (["c"], [("a", None), ("b", None)]))
+
+    def test_cerrar_compacta_y_respeta_la_retencion(self):
+        registro = self.abrir(retencion=2)
+        for nombre in "abcd":
+            tarea = Tarea(nombre)
+            registro.alta(tarea)
+            registro.baja(tarea)
+        registro.cerrar()
+        self.assertEqual(os.path.getsize(os.path.join(self.carpeta, "operaciones.wal")), 0)
+        self.assertEqual(self.estado(self.abrir(retencion=2)), ([], [("c", None), ("d", None)]))
+
+# =============================
+# REINICIO DE LOS SIMULADORES
+# =============================
+
+class PruebasSimuladores(unittest.TestCase):
+    def setUp(self):
+        self.temporal = tempfile.TemporaryDirectory()
+        self.carpeta = os.path.join(self.temporal.name, "datos")
+
+    def tearDown(self):
+        self.temporal.cleanup()
+
+    def test_cola_de_impresion(self):
+        registro = RegistroPersistente(self.carpeta, Ejercicio1.Documento, Ejercicio1.CAMPOS_DOCUMENTO)
+        cola = Ejercicio1.ColaImpresion(persistencia=registro)
+        for i, paginas in enumerate((10, 4, 6)):
+            cola.agregar_documento(Ejercicio1.Documento(f"doc{i}", "ana", paginas))
+        cola.procesar_siguiente()
+        caer(registro)
+        registro = RegistroPersistente(self.carpeta, Ejercicio1.Documento, Ejercicio1.CAMPOS_DOCUMENTO)
+        cola = Ejercicio1.ColaImpresion(persistencia=registro)
+        self.assertEqual([d.nombre for d in cola.historial], ["doc0"])
+        self.assertEqual(cola.historial[0].fin_s, 30.0)
+        self.assertEqual([d.nombre for d in cola.cola], ["doc1", "doc2"])
+        # Los restaurados se siguen registrando al imprimirse
+        cola.procesar_siguiente()
+        caer(registro)
+        registro = RegistroPersistente(self.carpeta, Ejercicio1.Documento, Ejercicio1.CAMPOS_DOCUMENTO)
+        pendientes, impresos = registro.restaurar()
+        self.assertEqual([d.nombre for d in pendientes], ["doc2"])
+        self.assertEqual([d.nombre for d in impresos], ["doc0", "doc1"])
+
+    def test_cola_de_impresion_conserva_reloj_y_resumen(self):
+        registro = RegistroPersistente(self.carpeta, Ejercicio1.Documento, Ejercicio1.CAMPOS_DOCUMENTO)
+        cola = Ejercicio1.ColaImpresion(persistencia=registro)
+        for nombre in ("a", "b"):
+            cola.agregar_documento(Ejercicio1.Documento(nombre, "ana", 10))
+            cola.procesar_siguiente()
+        cola.agregar_documento(Ejercicio1.Documento("c", "beto", 5), 30)
+        antes = cola.resumen()
+        caer(registro)
+        registro = RegistroPersistente(self.carpeta, Ejercicio1.Documento, Ejercicio1.CAMPOS_DOCUMENTO)
+        cola = Ejercicio1.ColaImpresion(persistencia=registro)
+        # El documento que llegó en t=30 sigue en la cola, no como una llegada futura
+        self.assertEqual(cola.reloj_s, 60.0)
+        self.assertEqual([d.nombre for d in cola.cola], ["c"])
+        self.assertIn("c", cola.ver_documento_actual())
+        despues = cola.resumen()
+        for clave in ("documentos", "fin_s", "espera_media_s", "utilizacion"):
+            self.assertEqual(despues[clave], antes[clave])
+        cola.procesar_siguiente()
+        self.assertEqual(cola.historial[-1].espera_s, 30.0)
+        self.assertEqual(cola.resumen()["fin_s"], 75.0)
+
+    def test_call_center(self):
+        registro = RegistroPersistente(self.carpeta, Ejercicio2.Llamada, Ejercicio2.CAMPOS_LLAMADA)
+        with mock.patch.object(Ejercicio2, "DURACION_LLAMADA", (0, 0)):
+            centro = Ejercicio2.CallCenter(1, persistencia=registro)
+            for nombre in ("Ana", "Beto", "Ciro"):
+                centro.agregar_llamada(Ejercicio2.Llamada(nombre, "Consulta"))
+            centro.atender_llamada()
+            esperar(lambda: len(centro.historial) == 1)
+            centro.cerrar()
+        caer(registro)
+        registro = RegistroPersistente(self.carpeta, Ejercicio2.Llamada, Ejercicio2.CAMPOS_LLAMADA)
+        centro = Ejercicio2.CallCenter(1, persistencia=registro)
+        centro.cerrar()
+        self.assertEqual([l.nombre_cliente for l in centro.historial], ["Ana"])
+        self.assertIsNotNone(centro.historial[0].hora_salida)
+        self.assertEqual([l.nombre_cliente for l in centro.cola_llamadas], ["Beto", "Ciro"])
+
+    def test_farmacia(self):
+        registro = RegistroPersistente(self.carpeta, Ejercicio3.Paciente, Ejercicio3.CAMPOS_PACIENTE)
+        farmacia = Ejercicio3.Farmacia(duracion=(0, 0), escala_tiempo=0.001, persistencia=registro)
+        for nombre in ("Ana", "Beto"):
+            farmacia.registrar_paciente(Ejercicio3.Paciente(nombre, "Compra"))
+        esperar(lambda: len(farmacia.historial) == 2)
+        farmacia.cerrar()
+        for hilo in farmacia.hilos:
+            hilo.join()
+        # Con las ventanillas cerradas, este paciente queda esperando
+        farmacia.registrar_paciente(Ejercicio3.Paciente("Ciro", "Receta"))
+        caer(registro)
+        registro = RegistroPersistente(self.carpeta, Ejercicio3.Paciente, Ejercicio3.CAMPOS_PACIENTE)
+        farmacia = Ejercicio3.Farmacia(duracion=(0, 0), escala_tiempo=0.001, persistencia=registro)
+        esperar(lambda: len(farmacia.historial) == 3)
+        farmacia.cerrar()
+        self.assertEqual(sorted(p.nombre for p in farmacia.historial), ["Ana", "Beto", "Ciro"])
+        self.assertEqual(next(farmacia.turnos), 4)
+
+    def test_microprocesador(self):
+        registro = RegistroPersistente(self.carpeta, Ejercicio4.Proceso, Ejercicio4.CAMPOS_PROCESO)
+        cpu = Ejercicio4.Microprocesador(Ejercicio4.PlanificadorRoundRobin(10), nucleos=2, persistencia=registro)
+        for i, duracion in enumerate((30, 50, 20, 40)):
+            cpu.agregar_proceso(Ejercicio4.Proceso(f"P{i}", f"proceso{i}", duracion))
+        cpu.ejecutar_proceso()
+        caer(registro)
+        registro = RegistroPersistente(self.carpeta, Ejercicio4.Proceso, Ejercicio4.CAMPOS_PROCESO)
+        cpu = Ejercicio4.Microprocesador(Ejercicio4.PlanificadorRoundRobin(10), nucleos=2, persistencia=registro)
+        self.assertEqual([p.id_proceso for p in cpu.historial], ["P2"])
+        # Los que estaban a medio ejecutar vuelven con toda su duración
+        self.assertEqual(sorted((p.id_proceso, p.restante_ms) for n in cpu.nucleos for p in n.cola),
+                         [("P0", 30), ("P1", 50), ("P3", 40)])
+        self.assertEqual(cpu.simular()["procesos"], 4)
+        caer(registro)
+        registro = RegistroPersistente(self.carpeta, Ejercicio4.Proceso, Ejercicio4.CAMPOS_PROCESO)
+        pendientes, terminados = registro.restaurar()
+        self.assertEqual((len(pendientes), len(terminados)), (0, 4))
+
+    def test_microprocesador_conserva_reloj_y_makespan(self):
+        registro = RegistroPersistente(self.carpeta, Ejercicio4.Proceso, Ejercicio4.CAMPOS_PROCESO)
+        cpu = Ejercicio4.Microprocesador(persistencia=registro)
+        for i in range(3):
+            cpu.agregar_proceso(Ejercicio4.Proceso(f"P{i}", "largo", 100))
+        cpu.agregar_proceso(Ejercicio4.Proceso("F", "futuro", 50), 500)
+        antes = cpu.simular(hasta_ms=400)
+        caer(registro)
+        registro = RegistroPersistente(self.carpeta, Ejercicio4.Proceso, Ejercicio4.CAMPOS_PROCESO)
+        cpu = Ejercicio4.Microprocesador(persistencia=registro)
+        despues = cpu.resumen()
+        for clave in ("procesos", "reloj_ms", "makespan_ms", "throughput_por_s", "espera_media_ms"):
+            self.assertEqual(despues[clave], antes[clave])
+        # La llegada futura sigue programada en su instante y no entra antes a la cola
+        self.assertEqual(sum(len(n.cola) for n in cpu.nucleos), 0)
+        cpu.agregar_proceso(Ejercicio4.Proceso("N", "corto", 10))
+        resumen = cpu.simular()
+        self.assertEqual([p.id_proceso for p in cpu.historial][-2:], ["N", "F"])
+        self.assertEqual(cpu.historial[-2].llegada_ms, 300)
+        self.assertEqual(cpu.historial[-1].inicio_ms, 500)
+        self.assertEqual(resumen["makespan_ms"], 550)
+        self.assertAlmostEqual(resumen["throughput_por_s"], 5 * 1000.0 / 550)
+
+    def test_servidor_de_archivos_tras_una_solicitud_fallida(self):
+        raiz = os.path.join(self.temporal.name, "archivos")
+        os.makedirs(raiz)
+        with open(os.path.join(raiz, "informe.txt"), "wb") as archivo:
+            archivo.write(b"contenido")
+        registro = RegistroPersistente(self.carpeta, Ejercicio5.SolicitudAcceso, Ejercicio5.CAMPOS_SOLICITUD)
+        servidor = Ejercicio5.ServidorArchivos(raiz=raiz, persistencia=registro)
+        servidor.registrar_solicitud(Ejercicio5.SolicitudAcceso("ana", "informe.txt"))
+        servidor.registrar_solicitud(Ejercicio5.SolicitudAcceso("beto", "no_existe.txt"))
+        servidor.registrar_solicitud(Ejercicio5.SolicitudAcceso("ciro", "informe.txt", Ejercicio5.ESCRITURA))
+        servidor.atender_solicitud()
+        self.assertIn("No se pudo acceder", servidor.atender_solicitud())
+        reloj = servidor.reloj_ms
+        caer(registro)
+        registro = RegistroPersistente(self.carpeta, Ejercicio5.SolicitudAcceso, Ejercicio5.CAMPOS_SOLICITUD)
+        servidor = Ejercicio5.ServidorArchivos(raiz=raiz, persistencia=registro)
+        self.assertEqual([(s.usuario, s.bytes_servidos) for s in servidor.historial], [("ana", 9), ("beto", 0)])
+        self.assertEqual(servidor.historial[1].fin_ms, servidor.historial[1].inicio_ms)
+        self.assertEqual([s.usuario for s in servidor.cola_solicitudes], ["ciro"])
+        self.assertEqual(servidor.reloj_ms, reloj)
+        # Los números de solicitud continúan después de los restaurados
+        servidor.registrar_solicitud(Ejercicio5.SolicitudAcceso("dora", "informe.txt"))
+        self.assertEqual([s.id_solicitud for s in servidor.cola_solicitudes], [3, 4])
+
+
+if __name__ == "__main__":
+    unittest.main()